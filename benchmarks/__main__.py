@@ -0,0 +1,232 @@
+"""Run benchmarks.
+
+python -m benchmarks [--save FILE] [--compare FILE] [--threshold RATIO] [--repeat N] [NAME ...]
+"""
+
+import argparse
+import functools
+import json
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import typing as t
+
+from click.testing import CliRunner
+
+
+Setup = t.Callable[[pathlib.Path], t.Callable[[], None]]
+
+BENCHMARKS: dict[str, Setup] = {}
+
+THRESHOLD = 1.3
+
+
+def benchmark(func: Setup) -> Setup:
+    """Register a benchmark, `func` prepares a scratch directory and returns what to time."""
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def _python(*args: str) -> t.Callable[[], None]:
+    def run() -> None:
+        subprocess.run([sys.executable, *args], check=True, capture_output=True)
+
+    return run
+
+
+@benchmark
+def cli_import(_tmp: pathlib.Path) -> t.Callable[[], None]:
+    """Interpreter startup plus `import culting.cli`."""
+    return _python("-c", "import culting.cli")
+
+
+@benchmark
+def startup_version(_tmp: pathlib.Path) -> t.Callable[[], None]:
+    """`culting --version`."""
+    return _python("-m", "culting", "--version")
+
+
+@benchmark
+def startup_help(_tmp: pathlib.Path) -> t.Callable[[], None]:
+    """`culting --help`."""
+    return _python("-m", "culting", "--help")
+
+
+FORWARDED_COMMANDS = ["git", "python", "pip", "pip-compile", "pip-sync"]
+
+
+def _startup_forwarded(tmp: pathlib.Path, cmd: str) -> t.Callable[[], None]:
+    """`culting CMD --version` in a subprocess, `.venv` python and `git` fakes answering at once."""
+    for executable in (tmp / ".venv" / "bin" / "python", tmp / "bin" / "git"):
+        executable.parent.mkdir(parents=True, exist_ok=True)
+        executable.write_text("#!/bin/sh\necho 1.0\n")
+        executable.chmod(0o755)
+    (tmp / ".venv" / "pyvenv.cfg").write_text("version = 3.13.0\n")
+    (tmp / "pyproject.toml").write_text("[project]\nname = 'bench'\n")
+    env = {**os.environ, "PATH": f"{tmp / 'bin'}{os.pathsep}{os.environ['PATH']}", "CULTING_OFFLINE": "1"}
+
+    def run() -> None:
+        subprocess.run(
+            [sys.executable, "-m", "culting", cmd, "--version"],
+            check=True,
+            capture_output=True,
+            cwd=tmp,
+            env=env,
+        )
+
+    return run
+
+
+for _cmd in FORWARDED_COMMANDS:
+    BENCHMARKS[f"startup_{_cmd.replace('-', '_')}"] = functools.partial(_startup_forwarded, cmd=_cmd)
+
+
+def _forwarding(tmp: pathlib.Path, lines: int) -> t.Callable[[], None]:
+    from culting.cli import cli
+
+    venv_bin = tmp / ".venv" / "bin"
+    venv_bin.mkdir(parents=True)
+    (venv_bin / "python").symlink_to(sys.executable)
+    code = f"import sys; sys.stdout.write('{'x' * 79}\\n' * {lines})"
+
+    def run() -> None:
+        os.chdir(tmp)
+        result = CliRunner().invoke(cli, ["python", "-c", code])
+        if result.exit_code != 0:
+            raise RuntimeError(result.output)
+
+    return run
+
+
+@benchmark
+def forwarding_small(tmp: pathlib.Path) -> t.Callable[[], None]:
+    """`culting python` printing one line."""
+    return _forwarding(tmp, 1)
+
+
+@benchmark
+def forwarding_large(tmp: pathlib.Path) -> t.Callable[[], None]:
+    """`culting python` printing 100k lines."""
+    return _forwarding(tmp, 100_000)
+
+
+@benchmark
+def pyproject_dumps(_tmp: pathlib.Path) -> t.Callable[[], None]:
+    """100 `pyproject.toml` documents rendered."""
+    from culting import pyproject
+
+    def run() -> None:
+        for i in range(100):
+            pyproject.PyprojectToml(
+                pkg_name=f"project-{i}",
+                python_version="3.13",
+                authors_info=[{"name": "Bench", "email": "bench@example.com"}],
+            ).dumps()
+
+    return run
+
+
+@benchmark
+def dependencies_list_large(tmp: pathlib.Path) -> t.Callable[[], None]:
+    """`Dependencies.list_` on a 1000 requirements file."""
+    from culting.click_commands import Dependencies
+
+    lines = [f"# library {i}\npackage-{i:04d}[extra]>=1.{i},<2 ; python_version >= '3.11'" for i in range(1000)]
+    (tmp / "requirements.in").write_text("\n".join(reversed(lines)) + "\n")
+
+    def run() -> None:
+        _ = Dependencies(tmp).list_
+
+    return run
+
+
+def _new(tmp: pathlib.Path, latency: float) -> t.Callable[[], None]:
+    from culting import runner
+    from culting.click_commands import NewProject
+    from tests.runners import FakeRunner
+
+    os.environ["CULTING_OFFLINE"] = "1"
+    counter = iter(range(1_000_000))
+
+    def run() -> None:
+        with runner.use(FakeRunner(latency=latency)):
+            NewProject(tmp, project_name=f"project-{next(counter)}", python_version="3.13", src="src")
+
+    return run
+
+
+@benchmark
+def new_fake_toolchain(tmp: pathlib.Path) -> t.Callable[[], None]:
+    """`culting new` end to end with the fake toolchain."""
+    return _new(tmp, 0.0)
+
+
+@benchmark
+def new_fake_toolchain_latency(tmp: pathlib.Path) -> t.Callable[[], None]:
+    """`culting new` end to end with the fake toolchain, 20ms per command."""
+    return _new(tmp, 0.02)
+
+
+def _run(name: str, repeat: int) -> dict[str, float]:
+    environ = dict(os.environ)
+    cwd = pathlib.Path.cwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["HOME"] = str(pathlib.Path(tmp) / "home")
+        try:
+            func = BENCHMARKS[name](pathlib.Path(tmp))
+            func()
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                func()
+                times.append(time.perf_counter() - start)
+        finally:
+            os.chdir(cwd)
+            os.environ.clear()
+            os.environ.update(environ)
+    return {"median": statistics.median(times), "min": min(times), "repeat": repeat}
+
+
+def _compare(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], threshold: float) -> bool:
+    ok = True
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        # min rather than median, less sensitive to a busy machine
+        ratio = result["min"] / baseline[name]["min"]
+        regression = ratio > threshold
+        ok &= not regression
+        print(f"{name:28} {ratio:6.2f}x {'REGRESSION' if regression else 'ok'}")  # noqa: T201
+    return ok
+
+
+def main() -> None:
+    """Run benchmarks."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("names", nargs="*", metavar="NAME", help=f"Benchmarks to run: {', '.join(BENCHMARKS)}.")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--save", type=pathlib.Path, help="Write results as JSON.")
+    parser.add_argument("--compare", type=pathlib.Path, help="JSON baseline to compare to.")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Min time ratio counted as a regression.")
+    args = parser.parse_args()
+    unknown = set(args.names) - BENCHMARKS.keys()
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    results = {}
+    for name in args.names or BENCHMARKS:
+        results[name] = _run(name, args.repeat)
+        print(f"{name:28} {results[name]['median'] * 1000:9.1f} ms  (min {results[name]['min'] * 1000:.1f} ms)")  # noqa: T201
+    if args.save is not None:
+        args.save.write_text(json.dumps(results, indent=2) + "\n")
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text())
+        if not _compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
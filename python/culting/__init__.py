@@ -1,17 +1,18 @@
 """Init."""
 
-import importlib.metadata
+import hashlib
+import json
+import logging
 import os
 import pathlib
 import re
-import shutil
 import sys
+import threading
 import typing as t
 
-from pj_logging import set_logger
 
-
-logger = set_logger(name=__name__, rich_panel_log=True)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
 
 class _Version(str):
 
@@ -37,7 +38,14 @@ class _Version(str):
         return self.as_tuple[2]
 
 
-__version__: str = _Version(importlib.metadata.version(__name__))
+def __getattr__(name: str) -> t.Any: # noqa: ANN401
+    """Resolve `__version__` on first access, `importlib.metadata` is slow to import."""
+    if name == "__version__":
+        import importlib.metadata
+        globals()["__version__"] = version = _Version(importlib.metadata.version(__name__))
+        return version
+    err_msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(err_msg)
 
 os.environ["PYDANTIC_ERRORS_INCLUDE_URL"] = "0"
 os.environ["MYPY_FORCE_COLOR"] = "1"
@@ -49,11 +57,33 @@ SupportedOs = t.Literal["linux", "win32"]
 class ExecutableNotFoundError(FileNotFoundError):
     """Executable not found error."""
 
+
+def _atomic_write(path: pathlib.Path, data: str | bytes) -> None:
+    """Write through a temporary file next to `path`, so concurrent readers never see a partial file.
+
+    The temporary name is unique per process and thread, and removed if the write fails.
+    """
+    tmp_path = path.with_name(f".{path.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+    try:
+        if isinstance(data, bytes):
+            tmp_path.write_bytes(data)
+        else:
+            tmp_path.write_text(data)
+        tmp_path.replace(path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
 class PlatformInfo:
     """Platforme info."""
 
+    which_cache_size = 16
+
     def __init__(self) -> None:
         """Init."""
+        self._which_cache: dict[str, dict[str, str]] = {}
+        # executables are resolved from the task graph's threads too
+        self._which_cache_lock = threading.Lock()
         try:
             self.os: SupportedOs = self._os
             # self.python_manager = self._python_manager
@@ -81,41 +111,80 @@ class PlatformInfo:
 
     @property
     def xdg_config_dir(self) -> pathlib.Path:
-        """XDG config path."""
-        if self._os == "linux":
+        """XDG config path, created by whoever first writes into it."""
+        if self.os == "linux":
             _xdg_config_dir = pathlib.Path.home() / ".config"
-        elif self._os == "win32":
+        elif self.os == "win32":
             _xdg_config_dir = pathlib.Path.home() / "Appdata/Local"
         else:
             raise RuntimeError
-        _xdg_config_dir = _xdg_config_dir / "culting"
-        _xdg_config_dir.mkdir(parents=True, exist_ok=True)
-        return _xdg_config_dir
+        return _xdg_config_dir / "culting"
 
     @property
     def xdg_state_dir(self) -> pathlib.Path:
-        """XDG state path."""
-        if self._os == "linux":
+        """XDG state path, created by whoever first writes into it."""
+        if self.os == "linux":
             _xdg_state_dir = pathlib.Path.home() / ".local/state"
-        elif self._os == "win32":
+        elif self.os == "win32":
             _xdg_state_dir = pathlib.Path.home() / "Appdata/Local/Temp"
         else:
             raise RuntimeError
-        _xdg_state_dir = _xdg_state_dir / "culting"
-        _xdg_state_dir.mkdir(parents=True, exist_ok=True)
-        return _xdg_state_dir
+        return _xdg_state_dir / "culting"
 
     @property
     def logfile_path(self) -> pathlib.Path:
         """Logfile path."""
         return self.xdg_state_dir / "culting.log"
 
-    def _which_path(self, cmd: str | pathlib.Path) -> pathlib.Path:
-        _path = shutil.which(cmd)
-        if _path is None:
-            err_msg = f"{cmd} not found."
-            raise ExecutableNotFoundError(err_msg)
-        return pathlib.Path(_path).absolute()
+    @property
+    def which_cache_path(self) -> pathlib.Path:
+        """Resolved executables cache path."""
+        return self.xdg_state_dir / "which.json"
+
+    def _which_cache_key(self, root: pathlib.Path, runner_name: str) -> str:
+        try:
+            venv_mtime = (root / ".venv").absolute().stat().st_mtime_ns
+        except FileNotFoundError:
+            venv_mtime = 0
+        _key = f"{os.environ.get('PATH', '')}\0{venv_mtime}\0{runner_name}"
+        return hashlib.sha256(_key.encode()).hexdigest()
+
+    def _which_cache_load(self, key: str) -> dict[str, str]:
+        if not self._which_cache:
+            try:
+                with self.which_cache_path.open("r") as file:
+                    _cache = json.load(file)
+            except (OSError, ValueError):
+                _cache = {}
+            self._which_cache = _cache if isinstance(_cache, dict) else {}
+        return self._which_cache.setdefault(key, {})
+
+    def _which_cache_dump(self, key: str) -> None:
+        self._which_cache[key] = self._which_cache.pop(key)
+        _cache = dict(list(self._which_cache.items())[-self.which_cache_size:])
+        try:
+            self.which_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_write(self.which_cache_path, json.dumps(_cache))
+        except OSError:
+            logger.debug("Cannot write %s", self.which_cache_path)
+
+    def _which_path(self, cmd: str | pathlib.Path, root: pathlib.Path | None = None) -> pathlib.Path:
+        from . import runner
+
+        _runner = runner.get()
+        key = self._which_cache_key(root or pathlib.Path(), type(_runner).__name__)
+        with self._which_cache_lock:
+            paths = self._which_cache_load(key)
+            _cached = paths.get(str(cmd))
+            if _cached is not None and pathlib.Path(_cached).is_file():
+                return pathlib.Path(_cached)
+            _path = _runner.which(cmd)
+            if _path is None:
+                err_msg = f"{cmd} not found."
+                raise ExecutableNotFoundError(err_msg)
+            paths[str(cmd)] = str(pathlib.Path(_path).absolute())
+            self._which_cache_dump(key)
+            return pathlib.Path(paths[str(cmd)])
 
     @property
     def python_manager(self) -> pathlib.Path:
@@ -139,32 +208,113 @@ class PlatformInfo:
             return self._which_path("git.exe")
         raise RuntimeError
 
-    @property
-    def _venv_dir(self) -> pathlib.Path:
+    def _venv_dir(self, root: pathlib.Path) -> pathlib.Path:
         if self.os == "linux":
-            return pathlib.Path(".venv/bin").absolute()
+            return (root / ".venv/bin").absolute()
         if self.os == "win32":
-            return pathlib.Path(".venv/Scripts").absolute()
+            return (root / ".venv/Scripts").absolute()
         raise RuntimeError
 
-    @property
-    def venv_python(self) -> pathlib.Path:
-        """Venv python path."""
+    def venv_python_in(self, root: pathlib.Path) -> pathlib.Path:
+        """Venv python path of the project in `root`."""
         if self.os == "linux":
-            return self._which_path(self._venv_dir / "python")
+            return self._which_path(self._venv_dir(root) / "python", root)
         if self.os == "win32":
-            return self._which_path(self._venv_dir / "python.exe")
+            return self._which_path(self._venv_dir(root) / "python.exe", root)
         raise RuntimeError
 
+    @property
+    def venv_python(self) -> pathlib.Path:
+        """Venv python path."""
+        return self.venv_python_in(pathlib.Path())
+
 
 
 platform_info = PlatformInfo()
 
-logger = set_logger(
-    name=__name__,
-    jsonl_log_file_path=platform_info.logfile_path,
-    jsonl_log_file_size=1_000_000,
-)
 
+class _LazyHandler(logging.Handler):
+    """Build the rich panel and jsonl handlers on the first record.
 
+    `pj_logging` pulls in `rich`, and the jsonl handler creates the state dir and the log file,
+    none of which `culting --version` or `culting --help` need.
 
+    The jsonl handler is queued, written by a background thread, but in forked workers, which exit
+    without flushing.
+    """
+
+    def __init__(self) -> None:
+        """Init."""
+        super().__init__()
+        self._handlers: list[logging.Handler] | None = None
+        self._queued = True
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self) -> None:
+        self._handlers = None
+        self._queued = False
+
+    def _set_handlers(self) -> list[logging.Handler]:
+        import logging.handlers
+
+        from pj_logging import (
+            JsonlFormatter,
+            PanelHandler,
+        )
+
+        from .log_writer import (
+            BatchRotatingFileHandler,
+            QueuedHandler,
+        )
+        platform_info.xdg_state_dir.mkdir(parents=True, exist_ok=True)
+        handler_cls = BatchRotatingFileHandler if self._queued else logging.handlers.RotatingFileHandler
+        _jsonl_handler: logging.Handler = handler_cls(
+            filename=platform_info.logfile_path,
+            maxBytes=1_000_000,
+            backupCount=3,
+            delay=True,
+        )
+        _jsonl_handler.setFormatter(JsonlFormatter())
+        _jsonl_handler.set_name("jsonl")
+        _jsonl_handler.setLevel(logging.DEBUG)
+        if isinstance(_jsonl_handler, BatchRotatingFileHandler):
+            _jsonl_handler = QueuedHandler(_jsonl_handler)
+        _rich_panel_handler = PanelHandler()
+        _rich_panel_handler.set_name("panel")
+        _rich_panel_handler.setLevel(logging.INFO)
+        return [_jsonl_handler, _rich_panel_handler]
+
+    def flush(self) -> None:
+        """Wait for the queued records to be written."""
+        for handler in self._handlers or []:
+            handler.flush()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Forward the record to the real handlers."""
+        if self._handlers is None:
+            self._handlers = self._set_handlers()
+        for handler in self._handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+logger.addHandler(_LazyHandler())
+
+
+def main() -> None:
+    """Entry point, answers `--version` without importing the CLI, forwards to the daemon if opted in."""
+    if sys.argv[1:] in (["-V"], ["--version"]):
+        from . import __version__
+        print(f"culting, version {__version__}") # noqa: T201
+        return
+    if os.environ.get("CULTING_DAEMON", "") not in ("", "0"):
+        from . import daemon
+
+        if daemon.enabled():
+            returncode = daemon.forward(sys.argv[1:])
+            if returncode is not None:
+                sys.exit(returncode)
+    from .cli import cli
+
+    cli()
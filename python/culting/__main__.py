@@ -1,8 +1,8 @@
 """Main."""
 
-from .cli import cli
+from . import main
 
 
 if __name__ == "__main__":
-    cli()
+    main()
 
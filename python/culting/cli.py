@@ -1,25 +1,35 @@
 """CLI."""
 
+import os
 import pathlib
-import subprocess
+import sys
 import typing as t
 
-import rich
-import rich.align
-import rich.panel
 import rich_click as click
-from rich_click import RichContext
-from rich_click.rich_help_formatter import RichHelpFormatter
 
 from . import (
     ExecutableNotFoundError,
-    __version__,
-    click_commands,
     logger,
     platform_info,
 )
 
 
+if t.TYPE_CHECKING:
+    from rich_click import RichContext
+    from rich_click.rich_help_formatter import RichHelpFormatter
+
+    from . import click_commands
+
+
+def __getattr__(name: str) -> t.Any: # noqa: ANN401
+    """Forward `__version__`, resolved lazily by the package."""
+    if name == "__version__":
+        from . import __version__
+        return __version__
+    err_msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(err_msg)
+
+
 # click.rich_click.OPTION_GROUPS = {
 #     "culting": [
 #         {
@@ -36,6 +46,11 @@ click.rich_click.COMMAND_GROUPS = {
             "commands": [
                 "new",
                 "dependencies",
+                "cache",
+                "store",
+                "profile",
+                "stats",
+                "daemon",
             ],
         },
         {
@@ -55,7 +70,7 @@ click.rich_click.COMMAND_GROUPS = {
 
 class _CommandCustomHelp(click.RichCommand):
 
-    def format_help(self, ctx: RichContext, formatter: RichHelpFormatter) -> None:
+    def format_help(self, ctx: "RichContext", formatter: "RichHelpFormatter") -> None:
         self.format_usage(ctx, formatter)
         self.format_help_text(ctx, formatter)
         # self.format_options(ctx, formatter)
@@ -69,19 +84,51 @@ class _CommandCustomHelp(click.RichCommand):
         "show_default": True,
     },
 )
-@click.version_option(__version__, "-V", "--version")
+@click.version_option(None, "-V", "--version", package_name=__package__)
+@click.option(
+    "--stream",
+    is_flag=True,
+    envvar="CULTING_STREAM",
+    help="Stream forwarded commands output as it comes, stderr in red, instead of a panel at the end.",
+)
+@click.option(
+    "--raw",
+    is_flag=True,
+    envvar="CULTING_RAW",
+    help="Replace culting with the forwarded command, output untouched.",
+)
+@click.option(
+    "--offline",
+    is_flag=True,
+    envvar="CULTING_OFFLINE",
+    help="Skip network access, `pip` upgrades included.",
+)
 @click.pass_context
-def cli(ctx: click.Context) -> None:
+def cli(ctx: click.Context, *, stream: bool, raw: bool, offline: bool) -> None:
     """Culting, a Python projects' manager."""
+    from . import spans
+
+    ctx.ensure_object(dict).update(stream=stream, raw=raw)
+    spans.command = ctx.invoked_subcommand
+    if ctx.invoked_subcommand is not None:
+        ctx.with_resource(spans.span("command", ctx.invoked_subcommand))
+    if offline:
+        os.environ["CULTING_OFFLINE"] = "1"
     if ctx.invoked_subcommand is None:
         ctx.get_help()
 
 
+def _prompt_python_version(ctx: click.Context, _param: click.Parameter, value: str | None) -> str | None:
+    if value is None and ctx.params.get("manifest") is None:
+        return t.cast(str, click.prompt("Python version"))
+    return value
+
+
 @cli.command()
-@click.argument("project-name", type=str)
+@click.argument("project-name", type=str, required=False)
 @click.option(
     "-p", "--python-version",
-    prompt=True,
+    callback=_prompt_python_version,
     help="The python version to use for the new project.\b\n\nExample: 3.13",
 )
 @click.option(
@@ -89,12 +136,36 @@ def cli(ctx: click.Context) -> None:
     default="src",
     help="The default `src` could be an issue for multilanguage projects.",
 )
+@click.option(
+    "--from", "manifest",
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+    is_eager=True,
+    help="Create the projects listed in a TOML manifest instead, concurrently.",
+)
+@click.option(
+    "-j", "--jobs",
+    type=click.IntRange(min=1),
+    help="Projects created at once with `--from`.  [default: CPU count]",
+)
 @click.pass_context
-def new(ctx: click.Context, **kwargs: t.Unpack[click_commands.NewProjectKwargs]) -> None:
+def new(
+    ctx: click.Context,
+    manifest: pathlib.Path | None,
+    jobs: int | None,
+    **kwargs: t.Unpack["click_commands.NewProjectKwargs"],
+) -> None:
     """Create new culting project.
 
     PROJECT_NAME must be PEP 8 and PEP 423 compliant.
     """
+    from . import click_commands
+
+    if manifest is not None:
+        _new_projects(ctx, manifest, jobs)
+        return
+    if kwargs.get("project_name") is None:
+        err_msg = "Missing argument 'PROJECT_NAME'."
+        raise click.UsageError(err_msg, ctx)
     try:
         click_commands.NewProject(**kwargs)
         logger.info(f"[green]Success.[/green]\n  Run [white]cd {kwargs.get('project_name')}[/white]\n\nEnjoy coding.")
@@ -103,6 +174,28 @@ def new(ctx: click.Context, **kwargs: t.Unpack[click_commands.NewProjectKwargs])
         ctx.abort()
 
 
+def _new_projects(ctx: click.Context, manifest: pathlib.Path, jobs: int | None) -> None:
+    from . import click_commands
+
+    try:
+        reports = click_commands.new_projects(manifest, jobs=jobs)
+    except click_commands.CommandError as err:
+        logger.exception(err)
+        ctx.abort()
+    lines = [
+        f"[green]✓[/green] {report.project_name}  {report.duration:.1f}s"
+        if report.error is None
+        else f"[red]✗[/red] {report.project_name}  {report.duration:.1f}s\n    {report.error}"
+        for report in reports
+    ]
+    failed = sum(report.error is not None for report in reports)
+    lines.append(f"\n{len(reports) - failed} created, {failed} failed.")
+    if failed:
+        logger.error("\n".join(lines))
+        ctx.abort()
+    logger.info("\n".join(lines))
+
+
 # @cli.group(invoke_without_command=True)
 # @click.pass_context
 # def dependencies(ctx: click.Context) -> None:
@@ -118,19 +211,135 @@ def dependencies() -> None:
 @dependencies.command(name="list")
 def list_() -> None:
     """List libraries."""
-    logger.info(click_commands.Dependencies().list_)
+    from . import click_commands
+
+    try:
+        logger.info(click_commands.Dependencies().list_)
+    except click_commands.CommandError as err:
+        logger.error(err)
 
 
 @dependencies.command(name="add")
 @click.argument("libraries", nargs=-1)
 def add_(libraries: tuple[str, ...]) -> None:
     """Add libraries."""
+    from . import click_commands, config
+
     try:
-        click_commands.Dependencies().add(libraries)
-    except click_commands.CommandError as err:
+        added = click_commands.Dependencies().add(libraries)
+        logger.info("Added:\n" + "\n".join(f"  {line}" for line in added))
+    except (click_commands.CommandError, config.ConfigError, ExecutableNotFoundError) as err:
         logger.error(err)
 
 
+@dependencies.command(name="sync")
+@click.option("-f", "--force", is_flag=True, help="Compile and sync even if nothing changed since the last run.")
+@click.pass_context
+def sync_(ctx: click.Context, *, force: bool) -> None:
+    """Compile `requirements.lock` and sync `.venv`, skipping what is up to date."""
+    from . import click_commands, config
+
+    try:
+        click_commands.Dependencies(force=force).pip_editable_mode()
+    except (click_commands.CommandError, config.ConfigError, ExecutableNotFoundError) as err:
+        logger.exception(err)
+        ctx.abort()
+
+
+@cli.group(invoke_without_command=True)
+@click.pass_context
+def cache(ctx: click.Context) -> None:
+    """Shared `requirements.lock` resolution cache."""
+    from . import resolution_cache
+
+    if ctx.invoked_subcommand is None:
+        logger.info(resolution_cache.info())
+
+
+@cache.command(name="prune")
+@click.option("--max-size", type=int, help="Bytes to keep, least recently used entries go first.  [default: 32 MiB]")
+@click.option("--all", "all_", is_flag=True, help="Remove all entries.")
+def prune_(max_size: int | None, *, all_: bool) -> None:
+    """Prune the resolution cache."""
+    from . import resolution_cache
+
+    if all_:
+        max_size = 0
+    elif max_size is None:
+        max_size = resolution_cache.RESOLUTION_CACHE_SIZE
+    evicted = resolution_cache.prune(max_size)
+    logger.info(f"{len(evicted)} entries removed, {sum(entry.size for entry in evicted) / 1024:.1f} KiB freed.")
+
+
+@cli.group(invoke_without_command=True)
+@click.pass_context
+def store(ctx: click.Context) -> None:
+    """Shared package store of the `store` sync backend."""
+    from . import package_store
+
+    if ctx.invoked_subcommand is None:
+        logger.info(package_store.info())
+
+
+@store.command(name="gc")
+def gc_() -> None:
+    """Remove the entries no venv references anymore."""
+    from . import package_store
+
+    removed = package_store.gc()
+    logger.info(f"{len(removed)} entries removed, {sum(entry.size for entry in removed) / 1024:.1f} KiB freed.")
+
+
+@cli.command(context_settings={"ignore_unknown_options": True})
+@click.argument("culting_args", nargs=-1, type=click.UNPROCESSED)
+@click.pass_context
+def profile(ctx: click.Context, culting_args: tuple[str, ...]) -> None:
+    """Run a culting command and show where its time went.
+
+    Example: culting profile dependencies sync
+    """
+    from . import profiling
+
+    returncode, breakdown = profiling.profile(culting_args)
+    logger.info(breakdown)
+    ctx.exit(returncode)
+
+
+@cli.command()
+@click.argument("command", required=False)
+@click.option("--since", metavar="YYYY-MM", help="Leave out the months before.")
+def stats(command: str | None, since: str | None) -> None:
+    """Latency percentiles by command and step, from the log history.
+
+    COMMAND, e.g. `new`, to only show that command.
+    """
+    from . import stats as stats_
+
+    logger.info(stats_.render(stats_.rows(stats_.update(), command=command, since=since)))
+
+
+@cli.group(invoke_without_command=True)
+@click.pass_context
+def daemon(ctx: click.Context) -> None:
+    """Warm culting process serving invocations, opt in with `CULTING_DAEMON=1`."""
+    from . import daemon as daemon_
+
+    if ctx.invoked_subcommand is None:
+        status = daemon_.status()
+        if status is None:
+            logger.info("Daemon not running.")
+        else:
+            logger.info(f"Daemon running, pid {status.get('pid')}, version {status.get('version')}.")
+
+
+@daemon.command(name="stop")
+def stop_() -> None:
+    """Stop the daemon."""
+    from . import daemon as daemon_
+
+    logger.info("Daemon stopped." if daemon_.stop() else "Daemon not running.")
+
+
 forwarding_command = cli.command(
     cls=_CommandCustomHelp,
     context_settings={
@@ -140,26 +349,65 @@ forwarding_command = cli.command(
 )
 forwarding_argument = click.argument("cmd_args", nargs=-1, type=click.UNPROCESSED)
 
-def _forwarding(
-    cmd: t.Iterable[pathlib.Path | str],
-    ctx: click.Context,
-) -> None:
-    cmd_args = ctx.params.get("cmd_args", ())
-    cmd = [*cmd, *cmd_args]
-    _out = subprocess.run(
-        cmd,
-        check=False,
-        capture_output=True,
-        text=True,
-    )
-    if _out.returncode == 0:
-        msg = _out.stdout.strip()
+PANEL_MAX_LINES = 500
+
+
+def _forwarding_stream(cmd: list[pathlib.Path | str]) -> int:
+    import threading
+
+    import rich.console
+
+    from . import runner
+
+    lock = threading.Lock()
+    err_console = rich.console.Console(stderr=True, style="red", highlight=False, markup=False, soft_wrap=True)
+
+    def on_stdout(line: str) -> None:
+        with lock:
+            sys.stdout.write(line)
+            sys.stdout.flush()
+
+    def on_stderr(line: str) -> None:
+        with lock:
+            err_console.print(line, end="")
+
+    return runner.get().stream(cmd, on_stdout, on_stderr)
+
+
+def _forwarding_panel(cmd: list[pathlib.Path | str], ctx: click.Context) -> int:
+    import collections
+
+    import rich
+    import rich.panel
+    import rich.text
+
+    from . import runner, spans
+
+    out_lines: collections.deque[str] = collections.deque(maxlen=PANEL_MAX_LINES)
+    err_lines: collections.deque[str] = collections.deque(maxlen=PANEL_MAX_LINES)
+    counts = collections.Counter[str]()
+
+    def on_stdout(line: str) -> None:
+        counts["out"] += 1
+        out_lines.append(line)
+
+    def on_stderr(line: str) -> None:
+        counts["err"] += 1
+        err_lines.append(line)
+
+    returncode = runner.get().stream(cmd, on_stdout, on_stderr)
+    if returncode == 0:
+        lines, hidden = out_lines, counts["out"] - len(out_lines)
         title = "Out"
         msg_color = "white"
     else:
-        msg = _out.stderr.strip()
+        lines, hidden = err_lines, counts["err"] - len(err_lines)
         title = "Error"
         msg_color = "red"
+    msg = rich.text.Text("".join(lines).strip())
+    if hidden:
+        msg = rich.text.Text.assemble((f"... {hidden} lines hidden, use `culting --stream`\n", "dim"), msg)
+    cmd_args = ctx.params.get("cmd_args", ())
     if "-h" in cmd_args or "--help" in cmd_args or "help" in cmd_args or not cmd_args:
         ctx.get_help()
     cmd_name = ctx.command.name
@@ -169,10 +417,38 @@ def _forwarding(
         border_style=msg_color,
         title_align="left",
     )
-    rich.print(panel)
-    if _out.returncode != 0:
-        ctx.abort()
+    with spans.span("render", "panel"):
+        rich.print(panel)
+    return returncode
+
 
+def _forwarding_raw(cmd: list[pathlib.Path | str]) -> t.NoReturn:
+    sys.stdout.flush()
+    sys.stderr.flush()
+    # `os.execv` skips the exit handlers, queued log records included
+    for handler in logger.handlers:
+        handler.flush()
+    if platform_info.os == "win32":
+        # no real exec on Windows, `os.execv` would return to the shell before the child ends
+        import subprocess
+
+        sys.exit(subprocess.call(cmd))
+    args = [str(arg) for arg in cmd]
+    # replacing culting with the command is the point, not a shell-less spawn
+    os.execv(args[0], args)  # noqa: S606
+
+
+def _forwarding(
+    cmd: t.Iterable[pathlib.Path | str],
+    ctx: click.Context,
+) -> None:
+    cmd_args = ctx.params.get("cmd_args", ())
+    cmd = [*cmd, *cmd_args]
+    if (ctx.obj or {}).get("raw"):
+        _forwarding_raw(cmd)
+    returncode = _forwarding_stream(cmd) if (ctx.obj or {}).get("stream") else _forwarding_panel(cmd, ctx)
+    if returncode != 0:
+        ctx.abort()
 
 
 if platform_info.os == "linux":
@@ -199,6 +475,15 @@ elif platform_info.os == "win32":
         )
 
 
+@forwarding_command
+@forwarding_argument
+@click.pass_context
+def git(ctx: click.Context, cmd_args: t.Iterable[str]) -> None:
+    """Git."""
+    _ = cmd_args
+    _forwarding(cmd=[platform_info.git], ctx=ctx)
+
+
 @forwarding_command
 @forwarding_argument
 @click.pass_context
@@ -219,13 +504,25 @@ def pip(ctx: click.Context, cmd_args: t.Iterable[str]) -> None:
 
     Ensure to run the `pip` executable inside the virtual environment `.venv`.
     """
+    import subprocess
+
+    from . import config
+    from . import pip as pip_
+
     try:
-        cmd = [platform_info.venv_python, "-m", "pip", "install", "--upgrade", "pip", "-q"]
-        subprocess.call(cmd)
-        _ = cmd_args
-        _forwarding(cmd=[platform_info.venv_python, "-m", "pip"], ctx=ctx)
+        venv_python = platform_info.venv_python
     except ExecutableNotFoundError as err:
         logger.exception(err)
+        return
+    try:
+        pip_.upgrade()
+    except subprocess.CalledProcessError as err:
+        logger.warning(f"pip upgrade failed.\n{err.stderr.strip()}")
+    except config.ConfigError as err:
+        logger.error(err)
+        ctx.abort()
+    _ = cmd_args
+    _forwarding(cmd=[venv_python, "-m", "pip"], ctx=ctx)
 
 
 @forwarding_command
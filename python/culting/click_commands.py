@@ -1,17 +1,35 @@
 """Click commands."""
 
-import os
+import concurrent.futures
+import hashlib
 import pathlib
 import re
+import shutil
 import subprocess
+import tempfile
+import time
+import tomllib
 import typing as t
-import urllib.request
-
-import tomlkit as toml
 
 from . import (
+    _atomic_write,
+    config,
+    distributions,
+    file_links,
+    git,
+    logger,
+    package_store,
+    pip,
     platform_info,
     pyproject,
+    requirements,
+    resolution_cache,
+    runner,
+    seed_venv,
+    spans,
+    task_graph,
+    template_cache,
+    wheelhouse,
 )
 
 
@@ -19,8 +37,20 @@ class CommandError(RuntimeError):
     """Command error."""
 
 
-def _subprocess_run(cmd: list[pathlib.Path | str]) -> str:
-    _out = subprocess.run(cmd, check=False, capture_output=True, text=True)
+def _fingerprint(root: pathlib.Path, *paths: str) -> str:
+    _hash = hashlib.sha256()
+    for path in paths:
+        _hash.update(f"{path}\0".encode())
+        try:
+            _hash.update((root / path).read_bytes())
+        except FileNotFoundError:
+            _hash.update(b"\0missing")
+        _hash.update(b"\0")
+    return _hash.hexdigest()
+
+
+def _subprocess_run(cmd: list[pathlib.Path | str], cwd: pathlib.Path | None = None) -> str:
+    _out = runner.get().run(cmd, cwd)
     if _out.returncode != 0:
         raise CommandError(_out.stderr.strip())
     return _out.stdout.strip()
@@ -39,16 +69,29 @@ class NewProject:
 
     gitignore_url = "https://github.com/github/gitignore/raw/refs/heads/main/Python.gitignore"
 
-    def __init__(self, **kwargs: t.Unpack[NewProjectKwargs]) -> None:
-        """Init."""
+    def __init__(self, root: pathlib.Path | None = None, **kwargs: t.Unpack[NewProjectKwargs]) -> None:
+        """Init, the project is created inside `root`, by default the current directory."""
         self.python_version = kwargs.get("python_version")
         self.src = kwargs.get("src")
         self.project_name = kwargs.get("project_name")
+        self.root = root or pathlib.Path()
         self._set_dir()
-        self._set_python()
-        self._init_git()
-        self._set_files()
-        self._init_venv()
+        graph = task_graph.TaskGraph()
+        graph.add("set_python", self._set_python)
+        graph.add("init_git", self._init_git)
+        graph.add("fetch_gitignore", self._fetch_gitignore)
+        graph.add("init_venv", self._init_venv, after=["set_python"])
+        graph.add("set_files", self._set_files, after=["init_git", "fetch_gitignore"])
+        graph.add("install", self._install, after=["init_venv", "set_files"])
+        try:
+            graph.run()
+        except BaseException:
+            self._rollback()
+            raise
+        self.timings = graph.timings
+
+    def _rollback(self) -> None:
+        shutil.rmtree(self.project_dir, ignore_errors=True)
 
     def _set_dir(self) -> None:
         project_name_re = re.match(r"[a-z][a-z0-9-_]+[a-z0-9]$", self.project_name)
@@ -58,10 +101,9 @@ class NewProject:
                 "\n  [cyan]PROJECT_NAME[/cyan] must be PEP 8 and PEP 423 compliant."
             )
             raise CommandError(err_msg)
-        self.project_dir = pathlib.Path(self.project_name).absolute()
+        self.project_dir = (self.root / self.project_name).absolute()
         try:
             self.project_dir.mkdir()
-            os.chdir(self.project_dir)
         except FileExistsError as err:
             err_msg = f"Directory already exists: '{self.project_name}'"
             raise CommandError(err_msg) from err
@@ -78,16 +120,17 @@ class NewProject:
             err_msg = f"Invalid python version: '{self.python_version}'"
             raise CommandError(err_msg)
         if platform_info.os == "linux":
-            _subprocess_run([platform_info.python_manager, "local", self.python_version])
+            _subprocess_run([platform_info.python_manager, "local", self.python_version], cwd=self.project_dir)
         else:
             raise NotImplementedError
 
+    def _fetch_gitignore(self) -> None:
+        self.gitignore = template_cache.fetch(self.gitignore_url, "Python.gitignore", root=self.project_dir)
+
     def _set_files(self) -> None:
         (self.project_dir / "LICENSE").touch()
         (self.project_dir / "requirements.in").touch()
-        with urllib.request.urlopen(self.gitignore_url) as response: # noqa: S310
-            _gitignore_bytes = response.read()
-            (self.project_dir / ".gitignore").write_text(_gitignore_bytes.decode())
+        (self.project_dir / ".gitignore").write_text(self.gitignore)
         tests_dir = (self.project_dir / "tests")
         tests_dir.mkdir()
         (tests_dir / "__init__.py").touch()
@@ -102,87 +145,365 @@ class NewProject:
             authors_info=[{"name": self.git_name, "email": self.git_email}],
         )
         with (self.project_dir / "pyproject.toml").open("w") as p:
-            p.write(toml.dumps(_pyproject))
+            p.write(_pyproject.dumps())
 
     def _init_git(self) -> None:
         (self.project_dir / "README.md").write_text(f"# {self.project_name}")
-        _subprocess_run([platform_info.git, "init", "."])
-        _subprocess_run([platform_info.git, "add", "README.md"])
-        _subprocess_run([platform_info.git, "commit", "-m", "'Add README.md'"])
-        _subprocess_run([platform_info.git, "tag", "-a", "v0.1.0", "-m", "Release version 0.1.0"])
-        self.git_name = _subprocess_run([platform_info.git, "config", "user.name"])
-        self.git_email = _subprocess_run([platform_info.git, "config", "user.email"])
+        if git.in_process():
+            try:
+                self.git_name, self.git_email = git.init(
+                    self.project_dir,
+                    "README.md",
+                    "'Add README.md'",
+                    "v0.1.0",
+                    "Release version 0.1.0",
+                )
+            except git.GitError as err:
+                raise CommandError(str(err)) from err
+            return
+        _subprocess_run([platform_info.git, "init", "."], cwd=self.project_dir)
+        _subprocess_run([platform_info.git, "add", "README.md"], cwd=self.project_dir)
+        _subprocess_run([platform_info.git, "commit", "-m", "'Add README.md'"], cwd=self.project_dir)
+        _subprocess_run(
+            [platform_info.git, "tag", "-a", "v0.1.0", "-m", "Release version 0.1.0"],
+            cwd=self.project_dir,
+        )
+        self.git_name = _subprocess_run([platform_info.git, "config", "user.name"], cwd=self.project_dir)
+        self.git_email = _subprocess_run([platform_info.git, "config", "user.email"], cwd=self.project_dir)
 
     def _init_venv(self) -> None:
-        if platform_info.os == "linux":
-            _subprocess_run(["python", "-m", "venv", ".venv"])
-        else:
+        if platform_info.os != "linux":
             raise NotADirectoryError
-        _subprocess_run([platform_info.venv_python, "-m", "pip", "install", "pip-tools"])
-        Dependencies().pip_editable_mode()
+        _interpreter = seed_venv.interpreter(self.project_dir)
+        if _interpreter is not None:
+            try:
+                seed_venv.clone(seed_venv.ensure(_interpreter), self.project_dir / ".venv")
+            except seed_venv.SeedError as err:
+                raise CommandError(str(err)) from err
+            return
+        _subprocess_run(["python", "-m", "venv", ".venv"], cwd=self.project_dir)
+        _subprocess_run(
+            [platform_info.venv_python_in(self.project_dir), "-m", "pip", "install", "pip-tools"],
+            cwd=self.project_dir,
+        )
+
+    def _install(self) -> None:
+        Dependencies(self.project_dir).pip_editable_mode()
 
 
 
+class NewProjectReport(t.NamedTuple):
+    """New project outcome, `error` is `None` on success."""
+
+    project_name: str
+    error: str | None
+    duration: float
+
+
+def _new_project(root: pathlib.Path, kwargs: NewProjectKwargs) -> NewProjectReport:
+    start = time.perf_counter()
+    error = None
+    try:
+        NewProject(root, **kwargs)
+    except Exception as err: # noqa: BLE001
+        error = str(err) or type(err).__name__
+    return NewProjectReport(kwargs["project_name"], error, time.perf_counter() - start)
+
+
+def new_projects(
+    manifest_path: pathlib.Path,
+    root: pathlib.Path | None = None,
+    jobs: int | None = None,
+) -> list[NewProjectReport]:
+    """Create the projects listed in a TOML manifest inside `root`, `jobs` at a time, each in its own process.
+
+    Top level `python-version` and `src` are defaults for the `[[project]]` tables, which need a `name`.
+    """
+    try:
+        with manifest_path.open("rb") as file:
+            manifest = tomllib.load(file)
+    except (OSError, tomllib.TOMLDecodeError) as err:
+        raise CommandError(err) from err
+    projects: list[NewProjectKwargs] = []
+    for project in manifest.get("project", []):
+        python_version = project.get("python-version", manifest.get("python-version"))
+        if "name" not in project or python_version is None:
+            err_msg = f"Manifest projects need `name` and `python-version`: {project}"
+            raise CommandError(err_msg)
+        projects.append({
+            "project_name": project["name"],
+            "python_version": str(python_version),
+            "src": project.get("src", manifest.get("src", "src")),
+        })
+    names = [project["project_name"] for project in projects]
+    if len(set(names)) != len(names):
+        err_msg = f"Duplicate project names in {manifest_path}"
+        raise CommandError(err_msg)
+    root = (root or pathlib.Path()).absolute()
+    start = time.perf_counter()
+    reports = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_new_project, root, project) for project in projects]
+        for project, future in zip(projects, futures, strict=True):
+            try:
+                reports.append(future.result())
+            except concurrent.futures.process.BrokenProcessPool as err:
+                # a worker died, the projects it and the pending ones were on fail with it
+                reports.append(NewProjectReport(project["project_name"], str(err), time.perf_counter() - start))
+    return reports
+
+
 class Dependencies:
-    """Dependencies."""
-
-    def add(self, libraries: tuple[str, ...]) -> None:
-        """Add."""
-        # _list_re = [re.match(r"(\w+)(.*)$", li).group(1) for li in self.list_]
-        # print(_list_re)
-        for library in libraries:
-            library_re = re.match(r"([\w_-]+).*$", library)
-            if library_re is None:
-                raise CommandError
-            print(library_re.group(1))
+    """Dependencies.
 
-    def pip_editable_mode(self) -> None:
-        """Pip editable mode."""
-        self._pip_sync()
-        _subprocess_run([platform_info.venv_python, "-m", "pip", "install", "-e", ".[dev]"])
+    Compile and sync are skipped when their inputs match the fingerprints stored by the last run,
+    `compile_fingerprint_path` next to `requirements.lock` and `sync_fingerprint_path` inside `.venv`.
+    """
+
+    def __init__(self, root: pathlib.Path | None = None, *, force: bool = False) -> None:
+        """Init, `root` defaults to the current project, `force` ignores the stored fingerprints."""
+        self.root = root or pathlib.Path()
+        self.force = force
+        self.requirements_in_path = self.root / "requirements.in"
+        self.requirements_lock_path = self.root / "requirements.lock"
+        self.compile_fingerprint_path = self.root / "requirements.lock.sha256"
+        self.sync_fingerprint_path = self.root / ".venv/culting-sync.sha256"
 
     @property
-    def list_(self) -> list[str]:
-        """List."""
-        with pathlib.Path("requirements.in").open("r") as r:
-            requirements = r.read()
-        requirements = sorted(requirements.splitlines())
-        with pathlib.Path("requirements.in").open("w") as r:
-            r.write("\n".join(requirements) + "\n")
-        self._dup_libraries(requirements)
-        return requirements
-
-    def _dup_libraries(self, libs: list[str]) -> list[str]:
-        lib_tuples = []
-        for lib in libs:
-            lib_re = re.match(r"(\w+)([~=><]*.*)", lib)
-            if lib_re is None:
-                raise CommandError
-            lib_tuples.append(lib_re.groups())
-        lib_names = [li[0] for li in lib_tuples]
-        return ["".join(lib_tuple) for lib_tuple in lib_tuples if lib_names.count(lib_tuple[0]) > 1]
+    def _venv_python(self) -> pathlib.Path:
+        return platform_info.venv_python_in(self.root)
+
+    def _up_to_date(self, fingerprint_path: pathlib.Path, fingerprint: str) -> bool:
+        if self.force:
+            return False
+        try:
+            return fingerprint_path.read_text().strip() == fingerprint
+        except FileNotFoundError:
+            return False
+
+    @property
+    def _compile_fingerprint(self) -> str:
+        return _fingerprint(self.root, "requirements.in", "pyproject.toml", ".venv/pyvenv.cfg")
+
+    @property
+    def _sync_fingerprint(self) -> str:
+        return _fingerprint(self.root, "requirements.lock", "pyproject.toml", ".venv/pyvenv.cfg")
+
+    def add(self, libraries: tuple[str, ...]) -> list[str]:
+        """Add libraries to `requirements.in`, then compile and sync once for all of them.
+
+        On failure `requirements.in` and `requirements.lock` are restored.
+        """
+        try:
+            requirements_file = requirements.RequirementsFile(self.requirements_in_path)
+            added = [requirements_file.add(library).line for library in libraries]
+        except requirements.RequirementError as err:
+            raise CommandError(err) from err
+        backup = {
+            path: path.read_bytes() if path.is_file() else None
+            for path in (self.requirements_in_path, self.requirements_lock_path, self.compile_fingerprint_path)
+        }
+        requirements_file.write()
+        try:
+            self.pip_editable_mode()
+        except BaseException:
+            for path, content in backup.items():
+                if content is None:
+                    path.unlink(missing_ok=True)
+                else:
+                    path.write_bytes(content)
+            raise
+        return added
 
+    def pip_editable_mode(self) -> None:
+        """Pip editable mode.
 
+        `.venv` is compared with `requirements.lock` on every run, in process, so drift such as a manual
+        `pip uninstall` is repaired. pip-sync, for locks that are not only pins, and the editable install
+        only run when their inputs changed, or the project is not installed anymore.
+        """
+        self._pip_compile()
+        fingerprint = self._sync_fingerprint
+        up_to_date = self._up_to_date(self.sync_fingerprint_path, fingerprint)
+        pins = self._sync_pins()
+        if up_to_date and pins is None:
+            logger.debug("pip sync skipped, environment up to date")
+            return
+        self._pip_sync(pins)
+        if up_to_date and self._project_installed():
+            return
+        with spans.span("step", "pip_install_editable"):
+            _subprocess_run([self._venv_python, "-m", "pip", "install", "-e", ".[dev]"], cwd=self.root)
+        _atomic_write(self.sync_fingerprint_path, fingerprint)
+
+    @property
+    def list_(self) -> list[str]:
+        """List, sorting `requirements.in` if needed."""
+        try:
+            requirements_file = requirements.RequirementsFile(self.requirements_in_path)
+        except requirements.RequirementError as err:
+            raise CommandError(err) from err
+        requirements_file.sort()
+        requirements_file.write()
+        for name, lines in requirements_file.duplicates().items():
+            logger.warning(f"{name} listed more than once:\n" + "\n".join(f"  {line.line}" for line in lines))
+        return [line.line for line in requirements_file.requirements]
 
     def _pip_upgrade(self) -> None:
-        _subprocess_run([platform_info.venv_python, "-m", "pip", "install", "--upgrade", "pip"])
+        try:
+            with spans.span("step", "pip_upgrade"):
+                pip.upgrade(self.root)
+        except subprocess.CalledProcessError as err:
+            raise CommandError(err.stderr.strip()) from err
 
     def _pip_compile(self) -> None:
-        self._pip_upgrade()
-        _subprocess_run([
-            platform_info.venv_python,
-            "-m",
-            "piptools",
-            "compile",
-            "-o",
-            "requirements.lock",
-            "requirements.in",
-            "--no-strip-extras",
-        ])
-
-    def _pip_sync(self) -> None:
-        self._pip_compile()
-        _subprocess_run([platform_info.venv_python, "-m", "piptools", "sync", "requirements.lock"])
+        fingerprint = self._compile_fingerprint
+        if self.requirements_lock_path.is_file() and self._up_to_date(self.compile_fingerprint_path, fingerprint):
+            logger.debug("pip compile skipped, requirements.lock up to date")
+            return
+        resolution_key = resolution_cache.key(self.requirements_in_path, self.root / ".venv/pyvenv.cfg")
+        cached = None if self.force or resolution_key is None else resolution_cache.get(resolution_key)
+        if cached is not None:
+            logger.debug("pip compile skipped, requirements.lock from the resolution cache")
+            self.requirements_lock_path.write_text(cached)
+        else:
+            self._pip_upgrade()
+            with spans.span("step", "pip_compile"):
+                _subprocess_run([
+                    self._venv_python,
+                    "-m",
+                    "piptools",
+                    "compile",
+                    "-o",
+                    "requirements.lock",
+                    "requirements.in",
+                    "--no-strip-extras",
+                ], cwd=self.root)
+            if resolution_key is not None:
+                resolution_cache.put(resolution_key, self.requirements_lock_path.read_text())
+        _atomic_write(self.compile_fingerprint_path, fingerprint)
+
+    def _project_installed(self) -> bool:
+        root_url = self.root.absolute().as_uri()
+        return any(
+            distribution.editable_url == root_url
+            for distribution in distributions.installed(self.root / ".venv").values()
+        )
+
+    def _sync_pins(self) -> list[requirements.Pin] | None:
+        """Pins to sync `.venv` to in process, `None` if it is left to pip-sync."""
+        pins = requirements.pins(self.requirements_lock_path)
+        if pins is None:
+            logger.debug("requirements.lock is not only pins, synced by pip-sync")
+        elif distributions.legacy(self.root / ".venv"):
+            logger.debug(".venv has .egg-info installs, synced by pip-sync")
+            return None
+        return pins
+
+    def _pip_sync(self, pins: list[requirements.Pin] | None) -> None:
+        if pins is not None and config.load(self.root / "pyproject.toml").sync_backend != "store":
+            self._delta_sync(pins)
+            return
+        if pins is not None and platform_info.os == "linux":
+            self._store_sync(pins)
+            return
+        with spans.span("step", "pip_sync"):
+            _subprocess_run([self._venv_python, "-m", "piptools", "sync", "requirements.lock"], cwd=self.root)
+
+    def _delta_sync(self, pins: list[requirements.Pin]) -> None:
+        """Install and uninstall only what differs from `requirements.lock`, as read from `.dist-info` dirs."""
+        with spans.span("step", "pip_sync"):
+            delta = distributions.delta(distributions.installed(self.root / ".venv"), pins)
+            if not delta:
+                logger.debug("pip sync skipped, .venv matches requirements.lock")
+                return
+            upgraded = {pin.name for pin in delta.install}
+            # `pip install` replaces the other versions itself
+            removed = [distribution.name for distribution in delta.remove if distribution.name not in upgraded]
+            if removed:
+                self._pip_uninstall(removed)
+            if delta.install:
+                self._pip_install(delta.install)
+        logger.debug(f"pip sync: {len(delta.install)} installed, {len(removed)} removed")
+
+    @staticmethod
+    def _write_pins(pins: list[requirements.Pin], requirements_path: pathlib.Path) -> pathlib.Path:
+        requirements_path.write_text("".join(f"{pin.line}\n" for pin in pins))
+        return requirements_path
+
+    def _prefetch(self, pins: list[requirements.Pin]) -> dict[str, pathlib.Path]:
+        """Wheels of the pins in the shared wheelhouse, by name, downloaded concurrently if missing."""
+        tags = wheelhouse.supported_tags(self.root / ".venv", self._venv_python)
+        index = None if tags is None else wheelhouse.pip_index(self._venv_python, self.root)
+        if tags is None or index is None:
+            return {}
+        try:
+            with spans.span("step", "wheel_prefetch"):
+                return wheelhouse.prefetch(pins, tags, index, offline=config.offline(self.root / "pyproject.toml"))
+        except wheelhouse.WheelhouseError as err:
+            raise CommandError(err) from err
+
+    def _pip_install(self, pins: list[requirements.Pin]) -> None:
+        wheels = self._prefetch(pins)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            prefetched = [pin for pin in pins if pin.name in wheels]
+            if prefetched:
+                _subprocess_run([
+                    self._venv_python,
+                    "-m",
+                    "pip",
+                    "install",
+                    "--no-deps",
+                    "--no-index",
+                    "--find-links",
+                    wheelhouse.wheelhouse_dir(),
+                    "-r",
+                    self._write_pins(prefetched, pathlib.Path(tmp_dir) / "prefetched.txt"),
+                ], cwd=self.root)
+            rest = [pin for pin in pins if pin.name not in wheels]
+            if rest:
+                _subprocess_run([
+                    self._venv_python,
+                    "-m",
+                    "pip",
+                    "install",
+                    "--no-deps",
+                    "-r",
+                    self._write_pins(rest, pathlib.Path(tmp_dir) / "requirements.txt"),
+                ], cwd=self.root)
+
+    def _pip_wheel(self, pins: list[requirements.Pin], wheel_dir: pathlib.Path) -> None:
+        wheels = self._prefetch(pins)
+        link = file_links.Linker()
+        for path in wheels.values():
+            link(path, wheel_dir / path.name)
+        rest = [pin for pin in pins if pin.name not in wheels]
+        if not rest:
+            return
+        requirements_path = self._write_pins(rest, wheel_dir / "requirements.txt")
+        with spans.span("step", "pip_wheel"):
+            _subprocess_run(
+                [self._venv_python, "-m", "pip", "wheel", "--no-deps", "-w", wheel_dir, "-r", requirements_path],
+                cwd=self.root,
+            )
+
+    def _pip_uninstall(self, names: list[str]) -> None:
+        with spans.span("step", "pip_uninstall"):
+            _subprocess_run([self._venv_python, "-m", "pip", "uninstall", "-y", *names], cwd=self.root)
+
+    def _store_sync(self, pins: list[requirements.Pin]) -> None:
+        try:
+            with spans.span("step", "store_sync"):
+                delta = package_store.sync(
+                    self.root / ".venv",
+                    pins,
+                    self._pip_wheel,
+                    self._pip_uninstall,
+                    self._pip_install,
+                )
+        except package_store.StoreError as err:
+            raise CommandError(err) from err
+        logger.debug(f"store sync: {len(delta.install)} installed, {len(delta.remove)} removed")
 
 
 
@@ -0,0 +1,79 @@
+"""Project config.
+
+`[tool.culting]` read with `tomllib`, validated, and cached until `pyproject.toml` changes, by mtime
+and size. Read only: culting never edits an existing `pyproject.toml`, the `tomlkit` documents
+`pyproject` renders for new projects are the only ones it writes.
+"""
+
+import os
+import pathlib
+import threading
+import tomllib
+import typing as t
+
+import pydantic
+
+
+class ConfigError(ValueError):
+    """Invalid `[tool.culting]`."""
+
+
+class CultingConfig(pydantic.BaseModel):
+    """`[tool.culting]` settings, kebab-case in `pyproject.toml`."""
+
+    model_config = pydantic.ConfigDict(
+        alias_generator=lambda name: name.replace("_", "-"),
+        populate_by_name=True,
+        extra="forbid",
+        frozen=True,
+    )
+
+    offline: bool = False
+    """Skip network access."""
+    pip_upgrade_ttl: int | None = pydantic.Field(default=None, ge=0)
+    """Seconds between `pip` upgrades, culting's default if unset."""
+    sync_backend: t.Literal["pip-sync", "store"] = "pip-sync"
+    """How `.venv` is synced to `requirements.lock`, `store` links wheels unpacked once per user."""
+
+
+_cache: dict[pathlib.Path, tuple[tuple[int, int], CultingConfig]] = {}
+_lock = threading.Lock()
+
+
+def _validate(table: dict[str, t.Any], path: pathlib.Path) -> CultingConfig:
+    try:
+        return CultingConfig.model_validate(table)
+    except pydantic.ValidationError as err:
+        err_msg = f"Invalid [tool.culting] in {path}:\n{err}"
+        raise ConfigError(err_msg) from err
+
+
+def load(pyproject_path: pathlib.Path | str = "pyproject.toml") -> CultingConfig:
+    """Return the `[tool.culting]` settings, defaults if there is no such table or file."""
+    path = pathlib.Path(pyproject_path).absolute()
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return CultingConfig()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    try:
+        with path.open("rb") as file:
+            _pyproject = tomllib.load(file)
+    except tomllib.TOMLDecodeError as err:
+        err_msg = f"Invalid {path}: {err}"
+        raise ConfigError(err_msg) from err
+    _config = _validate(_pyproject.get("tool", {}).get("culting", {}), path)
+    with _lock:
+        _cache[path] = (stamp, _config)
+    return _config
+
+
+def offline(pyproject_path: pathlib.Path | str = "pyproject.toml") -> bool:
+    """Offline mode, from `culting --offline`, `CULTING_OFFLINE` or `[tool.culting] offline`."""
+    if os.environ.get("CULTING_OFFLINE", "") not in ("", "0"):
+        return True
+    return load(pyproject_path).offline
@@ -0,0 +1,319 @@
+"""Daemon.
+
+Opt-in with `CULTING_DAEMON=1`: a warm culting process per user and interpreter, listening on a Unix
+socket in the XDG state dir, forks a child per invocation. The client hands over argv, cwd, env and
+its stdin, stdout and stderr file descriptors, so the child writes straight to the client's terminal,
+and gets back the child pid, to forward Ctrl-C, then the exit code.
+
+The daemon exits after `IDLE_TIMEOUT` seconds without a request, or when the installed culting
+version is not its own anymore, the client then runs the command itself and starts a new one.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import pathlib
+import signal
+import socket
+import sys
+import typing as t
+
+from . import platform_info
+
+
+IDLE_TIMEOUT = 900
+RECEIVE_TIMEOUT = 5
+_MAX_MESSAGE = 1024 * 1024
+
+
+class _Response(t.TypedDict, total=False):
+    pid: int
+    exit: int
+    restart: bool
+    version: str
+
+
+def socket_path() -> pathlib.Path:
+    """Socket path, one daemon per interpreter."""
+    interpreter = hashlib.sha256(sys.executable.encode()).hexdigest()[:12]
+    return platform_info.xdg_state_dir / f"daemon-{interpreter}.sock"
+
+
+def enabled() -> bool:
+    """Whether invocations go through the daemon, opted in with `CULTING_DAEMON`."""
+    return os.environ.get("CULTING_DAEMON", "") not in ("", "0") and hasattr(socket, "AF_UNIX")
+
+
+def _connect() -> socket.socket | None:
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(str(socket_path()))
+    except (FileNotFoundError, ConnectionRefusedError):
+        client.close()
+        return None
+    return client
+
+
+def _request(client: socket.socket, request: dict[str, t.Any], fds: t.Sequence[int] = ()) -> t.Iterator[_Response]:
+    socket.send_fds(client, [json.dumps(request).encode() + b"\n"], list(fds))
+    with client.makefile("rb") as responses:
+        for line in responses:
+            yield json.loads(line)
+
+
+def _stdio_fds() -> list[int]:
+    fds = []
+    for fd in (0, 1, 2):
+        try:
+            os.fstat(fd)
+        except OSError:
+            fd = os.open(os.devnull, os.O_RDWR)  # noqa: PLW2901
+        fds.append(fd)
+    return fds
+
+
+def spawn() -> None:
+    """Start the daemon in the background."""
+    import subprocess
+
+    subprocess.Popen(
+        [sys.executable, "-m", "culting.daemon"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        cwd=pathlib.Path.home(),
+        start_new_session=True,
+    )
+
+
+def forward(argv: list[str]) -> int | None:
+    """Run `culting ARGV` in the daemon, return its exit code, `None` if the caller should run it.
+
+    A missing daemon is started for the next invocations. Once the request is sent, Ctrl-C goes to the
+    process group of the child running it, and the command is never run by the caller too.
+    """
+    client = _connect()
+    if client is None:
+        spawn()
+        return None
+    pid: int | None = None
+    interrupted = False
+
+    def _interrupt(_signum: int, _frame: object) -> None:
+        nonlocal interrupted
+        if pid is None:
+            interrupted = True
+        else:
+            os.killpg(pid, signal.SIGINT)
+
+    request = {"command": "run", "argv": argv, "cwd": str(pathlib.Path.cwd()), "env": dict(os.environ)}
+    # a handler that does not raise, so reads are resumed rather than abandoned mid-response
+    previous_handler = signal.signal(signal.SIGINT, _interrupt)
+    try:
+        with client, client.makefile("rb") as responses:
+            socket.send_fds(client, [json.dumps(request).encode() + b"\n"], _stdio_fds())
+            while line := responses.readline():
+                response: _Response = json.loads(line)
+                if response.get("restart"):
+                    spawn()
+                    return None
+                if "pid" in response:
+                    pid = response["pid"]
+                    if interrupted:
+                        os.killpg(pid, signal.SIGINT)
+                if "exit" in response:
+                    return response["exit"]
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+    # the daemon or the child died without reporting
+    return 1
+
+
+def status() -> _Response | None:
+    """Daemon pid and version, `None` if it is not running."""
+    client = _connect()
+    if client is None:
+        return None
+    with client:
+        return next(_request(client, {"command": "status"}), None)
+
+
+def stop() -> bool:
+    """Stop the daemon, return whether it was running."""
+    client = _connect()
+    if client is None:
+        return False
+    with client:
+        next(_request(client, {"command": "stop"}), None)
+    return True
+
+
+def _version() -> str:
+    import importlib.metadata
+
+    return importlib.metadata.version(__package__ or "culting")
+
+
+def _run(conn: socket.socket, request: dict[str, t.Any], fds: list[int]) -> t.NoReturn:
+    """Child side: become the client's process, run the command, report the exit code."""
+    code = 1
+    try:
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        sys.stdin = open(0, closefd=False)  # noqa: SIM115
+        sys.stdout = open(1, "w", buffering=1, closefd=False)  # noqa: SIM115
+        sys.stderr = open(2, "w", buffering=1, closefd=False)  # noqa: SIM115
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        sys.argv = ["culting", *request["argv"]]
+        # Ctrl-C reaches the command and what it runs, as a terminal's foreground process group would
+        os.setpgid(0, 0)
+        conn.sendall(json.dumps({"pid": os.getpid()}).encode() + b"\n")
+        from .cli import cli
+
+        try:
+            cli.main(args=request["argv"], prog_name="culting")
+        except SystemExit as err:
+            code = err.code if isinstance(err.code, int) else int(err.code is not None)
+        else:
+            code = 0
+    except BaseException:  # noqa: BLE001
+        # on the client's stderr, as a direct run would print it
+        import traceback
+
+        traceback.print_exc()
+    finally:
+        import logging
+
+        with contextlib.suppress(OSError):
+            sys.stdout.flush()
+            sys.stderr.flush()
+        logging.shutdown()
+        with contextlib.suppress(OSError):
+            conn.sendall(json.dumps({"exit": code}).encode() + b"\n")
+        os._exit(code)
+
+
+def _receive(conn: socket.socket) -> tuple[dict[str, t.Any], list[int]]:
+    """Read a request and the file descriptors sent along, raise `OSError` or `ValueError` on a bad one."""
+    message, fds, _, _ = socket.recv_fds(conn, _MAX_MESSAGE, 3)
+    try:
+        while message and not message.endswith(b"\n"):
+            chunk = conn.recv(_MAX_MESSAGE)
+            if not chunk:
+                break
+            message += chunk
+        request = json.loads(message)
+        if not isinstance(request, dict):
+            err_msg = f"Invalid request: {message!r}"
+            raise ValueError(err_msg)  # noqa: TRY004
+    except:
+        for fd in fds:
+            os.close(fd)
+        raise
+    return request, fds
+
+
+def _bind(path: pathlib.Path) -> socket.socket | None:
+    """Return a listening socket, `None` if another daemon already listens."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        probe = _connect()
+        if probe is not None:
+            probe.close()
+            return None
+        path.unlink(missing_ok=True)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o077)
+    try:
+        server.bind(str(path))
+    finally:
+        os.umask(old_umask)
+    server.listen()
+    return server
+
+
+def _reply(conn: socket.socket, response: _Response) -> None:
+    # a client that hung up does not get its answer
+    with contextlib.suppress(OSError):
+        conn.sendall(json.dumps(response).encode() + b"\n")
+
+
+def _answer(
+    conn: socket.socket,
+    request: dict[str, t.Any],
+    fds: list[int],
+    server: socket.socket,
+    version: str,
+) -> bool:
+    """Answer a request, forking a child to run a command, return whether to stop serving."""
+    command = request.get("command")
+    if command == "status":
+        _reply(conn, {"pid": os.getpid(), "version": version})
+    elif command == "stop":
+        _reply(conn, {})
+        return True
+    elif _version() != version:
+        server.close()
+        socket_path().unlink(missing_ok=True)
+        _reply(conn, {"restart": True})
+        return True
+    elif command == "run" and os.fork() == 0:
+        server.close()
+        _run(conn, request, fds)
+    return False
+
+
+def serve(idle_timeout: float = IDLE_TIMEOUT) -> None:
+    """Serve until idle for `idle_timeout` seconds, stopped, or the installed version changes."""
+    # what commands import, before any fork, no thread or console started
+    import pj_logging  # noqa: F401
+    import rich.console
+    import rich.panel
+    import rich.pretty
+    import rich.text  # noqa: F401
+    import rich_click.rich_help_formatter  # noqa: F401
+
+    from . import cli, click_commands, config  # noqa: F401
+
+    version = _version()
+    path = socket_path()
+    server = _bind(path)
+    if server is None:
+        return
+    # children are not waited for, they report to their client
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    server.settimeout(idle_timeout)
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except TimeoutError:
+                return
+            with conn:
+                conn.settimeout(RECEIVE_TIMEOUT)
+                try:
+                    request, fds = _receive(conn)
+                except (OSError, ValueError):
+                    # a client that hung up, stalled or sent garbage, not a reason to stop serving
+                    continue
+                conn.settimeout(None)
+                try:
+                    if _answer(conn, request, fds, server, version):
+                        return
+                finally:
+                    for fd in fds:
+                        os.close(fd)
+    finally:
+        server.close()
+        with contextlib.suppress(FileNotFoundError):
+            if path.exists() and _connect() is None:
+                path.unlink()
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,194 @@
+"""Distributions.
+
+What a venv has installed, from the `.dist-info` dir names of its `site-packages`, without running
+its interpreter, and the delta to a lock file's pins. Legacy `.egg-info`, `.egg-link` and `.egg`
+installs are not read, `legacy` tells whether a venv has any.
+"""
+
+import hashlib
+import json
+import pathlib
+import re
+import typing as t
+
+from . import platform_info, requirements
+
+
+_NAME_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*")
+_EXTRAS_RE = re.compile(r"\[([^\]]*)\]")
+_MARKER_EXTRA_RE = re.compile(r"""extra\s*==\s*["']([^"']+)["']""")
+
+_LEGACY_SUFFIXES = (".egg-info", ".egg-link", ".egg")
+
+IGNORED: frozenset[str] = frozenset({"pip", "pip-tools", "pip-review", "pkg-resources", "setuptools", "wheel"})
+"""Never removed, as `pip-sync` does."""
+
+
+class Distribution(t.NamedTuple):
+    """Installed distribution."""
+
+    name: str
+    version: str
+    path: pathlib.Path
+    """`.dist-info` dir."""
+
+    @property
+    def installer(self) -> str:
+        """Tool that installed it, empty if unknown."""
+        try:
+            return (self.path / "INSTALLER").read_text().strip()
+        except FileNotFoundError:
+            return ""
+
+    @property
+    def editable_url(self) -> str | None:
+        """URL of the project dir of an editable install, `None` for other installs."""
+        try:
+            direct_url = json.loads((self.path / "direct_url.json").read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+        if not isinstance(direct_url, dict) or not direct_url.get("dir_info", {}).get("editable"):
+            return None
+        return str(direct_url.get("url", ""))
+
+    @property
+    def editable(self) -> bool:
+        """Whether it is an editable install."""
+        return self.editable_url is not None
+
+    def _metadata(self, field: str) -> list[str]:
+        try:
+            text = (self.path / "METADATA").read_text(errors="replace")
+        except FileNotFoundError:
+            return []
+        headers = text.split("\n\n", 1)[0]
+        return [line.split(":", 1)[1].strip() for line in headers.splitlines() if line.startswith(f"{field}:")]
+
+    def requires(self, extras: t.Iterable[str] = ()) -> dict[str, set[str]]:
+        """Return the required names, with their extras, markers ignored but `extra ==` ones."""
+        extras = {requirements.normalize_name(extra) for extra in extras}
+        required: dict[str, set[str]] = {}
+        for line in self._metadata("Requires-Dist"):
+            requirement, _, marker = line.partition(";")
+            marker_extras = {requirements.normalize_name(extra) for extra in _MARKER_EXTRA_RE.findall(marker)}
+            name = _NAME_RE.match(requirement.strip())
+            if name is None or (marker_extras and not marker_extras & extras):
+                continue
+            requirement_extras = _EXTRAS_RE.search(requirement)
+            required.setdefault(requirements.normalize_name(name.group()), set()).update(
+                requirements.normalize_name(extra.strip())
+                for extra in (requirement_extras.group(1).split(",") if requirement_extras else ())
+                if extra.strip()
+            )
+        return required
+
+    @property
+    def provides_extras(self) -> list[str]:
+        """Extras it declares."""
+        return self._metadata("Provides-Extra")
+
+
+class Delta(t.NamedTuple):
+    """What syncing a venv to a lock file changes."""
+
+    install: list[requirements.Pin]
+    remove: list[Distribution]
+    """Not pinned, or pinned at another version."""
+
+    def __bool__(self) -> bool:
+        """Whether there is anything to do."""
+        return bool(self.install or self.remove)
+
+
+def site_packages(venv_dir: pathlib.Path) -> pathlib.Path | None:
+    """`site-packages` of the venv, `None` if there is none."""
+    if platform_info.os == "win32":
+        candidates = [venv_dir / "Lib/site-packages"]
+    else:
+        candidates = sorted(venv_dir.glob("lib/python*/site-packages"))
+    return next((path for path in candidates if path.is_dir()), None)
+
+
+def interpreter_key(venv_dir: pathlib.Path) -> str:
+    """Key of the venv's interpreter, from `pyvenv.cfg`, shared by venvs of the same interpreter."""
+    cfg = dict(
+        line.split("=", 1) for line in (venv_dir / "pyvenv.cfg").read_text().splitlines() if "=" in line
+    )
+    identity = [cfg.get(key, "").strip() for key in ("home", "version", "version_info", "implementation")]
+    return hashlib.sha256(json.dumps([*identity, platform_info.os]).encode()).hexdigest()[:16]
+
+
+def installed(venv_dir: pathlib.Path) -> dict[str, Distribution]:
+    """Installed distributions by normalized name."""
+    _site_packages = site_packages(venv_dir)
+    if _site_packages is None:
+        return {}
+    distributions = {}
+    for path in _site_packages.iterdir():
+        if path.suffix != ".dist-info" or not path.is_dir():
+            continue
+        # `{name}-{version}.dist-info`, `-` escaped in the name, never found in the version
+        name, _, version = path.name.removesuffix(".dist-info").rpartition("-")
+        if name:
+            distributions[requirements.normalize_name(name)] = Distribution(
+                requirements.normalize_name(name),
+                version,
+                path,
+            )
+    return distributions
+
+
+def legacy(venv_dir: pathlib.Path) -> bool:
+    """Whether the venv has `.egg-info`, `.egg-link` or `.egg` installs, which `installed` misses."""
+    _site_packages = site_packages(venv_dir)
+    return _site_packages is not None and any(
+        path.suffix in _LEGACY_SUFFIXES for path in _site_packages.iterdir()
+    )
+
+
+def _editable_closure(_installed: dict[str, Distribution]) -> set[str]:
+    """Editable installs, with all their extras, and what they require, transitively."""
+    pending = [
+        (distribution.name, set(distribution.provides_extras))
+        for distribution in _installed.values()
+        if distribution.editable
+    ]
+    seen: dict[str, set[str]] = {}
+    while pending:
+        name, extras = pending.pop()
+        if name not in _installed or (name in seen and extras <= seen[name]):
+            continue
+        seen.setdefault(name, set()).update(extras)
+        pending.extend(_installed[name].requires(seen[name]).items())
+    return set(seen)
+
+
+def delta(_installed: dict[str, Distribution], pins: t.Iterable[requirements.Pin]) -> Delta:
+    """Delta from the installed distributions to the pins.
+
+    Editable installs and what they require are left alone, but pinned at another version: the
+    project's `dev` tools are not in `requirements.lock`, removing them would only have its editable
+    install put them back.
+    """
+    install = []
+    pinned = set()
+    for pin in pins:
+        pinned.add(pin.name)
+        distribution = _installed.get(pin.name)
+        if distribution is None or distribution.version != pin.version:
+            install.append(pin)
+    upgraded = {pin.name for pin in install}
+    kept = IGNORED | pinned | _editable_closure(_installed)
+    remove = [
+        distribution for name, distribution in _installed.items() if name in upgraded or name not in kept
+    ]
+    return Delta(install, remove)
+
+
+def wheel_name(filename: str) -> tuple[str, str]:
+    """Return the normalized name and version of a wheel file name."""
+    parts = filename.removesuffix(".whl").split("-")
+    if len(parts) not in (5, 6):
+        err_msg = f"Invalid wheel file name {filename}."
+        raise ValueError(err_msg)
+    return requirements.normalize_name(parts[0]), parts[1]
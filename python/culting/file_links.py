@@ -0,0 +1,49 @@
+"""File links.
+
+Files shared between the XDG state dir and projects' `.venv`: reflinked, else hardlinked, else copied.
+"""
+
+import os
+import pathlib
+import shutil
+
+from . import platform_info
+
+
+_FICLONE = 0x40049409
+
+
+class Linker:
+    """Reflink, else hardlink, else copy, dropping what the filesystem does not support."""
+
+    def __init__(self, *, reflink: bool = True) -> None:
+        """Init, `reflink=False` to share the inodes themselves."""
+        self.reflink = reflink and platform_info.os == "linux"
+        self.hardlink = True
+
+    def __call__(self, src: pathlib.Path, dst: pathlib.Path) -> None:
+        """Link `src` to `dst`, which must not exist."""
+        if self.reflink and self._reflink(src, dst):
+            return
+        if self.hardlink:
+            try:
+                os.link(src, dst)
+            except OSError:
+                self.hardlink = False
+            else:
+                return
+        shutil.copy2(src, dst)
+
+    def _reflink(self, src: pathlib.Path, dst: pathlib.Path) -> bool:
+        import fcntl
+
+        with src.open("rb") as src_file, dst.open("wb") as dst_file:
+            try:
+                fcntl.ioctl(dst_file.fileno(), _FICLONE, src_file.fileno())
+            except OSError:
+                self.reflink = False
+        if not self.reflink:
+            dst.unlink()
+            return False
+        shutil.copystat(src, dst)
+        return True
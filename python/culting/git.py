@@ -0,0 +1,65 @@
+"""Git.
+
+New projects' repository set up in process with `pygit2`, one library load instead of a `git`
+subprocess per step. Optional, without it, or with a fake runner standing in for `git`, callers
+run `git` as before.
+"""
+
+import functools
+import importlib.util
+import pathlib
+import typing as t
+
+from . import runner
+
+
+class GitError(RuntimeError):
+    """Git error."""
+
+
+class Identity(t.NamedTuple):
+    """Committer identity, from the git config."""
+
+    name: str
+    email: str
+
+
+@functools.cache
+def _pygit2_installed() -> bool:
+    return importlib.util.find_spec("pygit2") is not None
+
+
+def in_process() -> bool:
+    """Whether `init` can be used: `pygit2` installed and commands really run."""
+    return type(runner.get()) is runner.Runner and _pygit2_installed()
+
+
+def init(
+    project_dir: pathlib.Path,
+    path: str,
+    message: str,
+    tag: str,
+    tag_message: str,
+) -> Identity:
+    """Init the repository, commit `path` and tag the commit with an annotated tag.
+
+    Same as `git init`, `git add`, `git commit -m`, `git tag -a -m`, return the identity used.
+    """
+    import pygit2
+
+    try:
+        repo = pygit2.init_repository(str(project_dir))
+        try:
+            signature = repo.default_signature
+        except KeyError as err:
+            err_msg = "Author identity unknown, set git config user.name and user.email."
+            raise GitError(err_msg) from err
+        repo.index.add(path)
+        repo.index.write()
+        tree = repo.index.write_tree()
+        # `git` ends messages with a newline, `libgit2` takes them as they are
+        commit = repo.create_commit("HEAD", signature, signature, f"{message}\n", tree, [])
+        repo.create_tag(tag, commit, repo[commit].type, signature, f"{tag_message}\n")
+    except pygit2.GitError as err:
+        raise GitError(str(err)) from err
+    return Identity(signature.name, signature.email)
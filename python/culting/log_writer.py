@@ -0,0 +1,79 @@
+"""Log writer.
+
+The JSONL log file is written by a background thread: records are handed over through a queue, so
+neither the write nor the rotation is on the command's critical path, and a burst of records is one
+flush.
+"""
+
+import copy
+import logging
+import logging.handlers
+import os
+import queue
+
+
+class BatchRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler flushing only on `flush_batch`, not after every record."""
+
+    def flush(self) -> None:
+        """Leave it to `flush_batch`."""
+
+    def flush_batch(self) -> None:
+        """Flush the records written so far."""
+        super().flush()
+
+
+class _Listener(logging.handlers.QueueListener):
+
+    def __init__(self, records: "queue.Queue[logging.LogRecord]", handler: logging.Handler) -> None:
+        super().__init__(records, handler, respect_handler_level=True)
+        self.records = records
+
+    def handle(self, record: logging.LogRecord) -> None:
+        super().handle(record)
+        if self.records.empty():
+            for handler in self.handlers:
+                if isinstance(handler, BatchRotatingFileHandler):
+                    handler.flush_batch()
+
+
+class QueuedHandler(logging.handlers.QueueHandler):
+    """Hands records over to `handler`, written by a background thread.
+
+    `flush` waits for the queued records to be written, `close`, called by `logging.shutdown` at
+    exit, does too and stops the thread.
+    """
+
+    def __init__(self, handler: BatchRotatingFileHandler) -> None:
+        """Init."""
+        self._records: queue.Queue[logging.LogRecord] = queue.Queue()
+        super().__init__(self._records)
+        self.handler = handler
+        self._pid = os.getpid()
+        self._listener = _Listener(self._records, handler)
+        self._listener.start()
+        self._running = True
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Copy of the record with the message merged, extra fields and exception info left to the formatter."""
+        record = copy.copy(record)
+        record.message = record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def _owned(self) -> bool:
+        # a forked child has the queue but not the thread
+        return self._running and os.getpid() == self._pid
+
+    def flush(self) -> None:
+        """Wait for the queued records to be written."""
+        if self._owned():
+            self._records.join()
+
+    def close(self) -> None:
+        """Write the queued records and stop the thread."""
+        if self._owned():
+            self._running = False
+            self._listener.stop()
+            self.handler.close()
+        super().close()
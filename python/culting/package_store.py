@@ -0,0 +1,433 @@
+"""Package store.
+
+Opt-in sync backend, `[tool.culting] sync-backend = "store"`: each wheel is unpacked once, into an
+entry named after it, that is after its name, version and tag, of a store in the XDG state dir.
+Its files are then hardlinked into every venv installing it, only `RECORD`, `INSTALLER`, scripts and
+console-script launchers, which name the venv, are written per venv. Store files are read-only, as
+the seed venv's are, and for the same reason, see `seed_venv`.
+
+Entries are referenced by a file per venv under `refs/<entry>/`. `gc` drops the references of venvs
+that do not share the entry's files anymore, then entries left without any, which the venvs still
+holding hardlinks keep on disk until they drop them too. Syncs hold a shared lock on the store, `gc`
+an exclusive one, so an entry is not removed between its reference and its links.
+
+Which entry a pin resolves to depends on the interpreter, it is recorded by interpreter, under
+`interpreters/`, once `pip` has picked a wheel for it. The sha256 of the wheel an entry was unpacked
+from is kept next to it, and checked against the lock's hashes before linking. Pins without a wheel,
+or whose wheel does not match the lock's hashes, as one built from an sdist never does, are left to
+`pip`, which checks the hashes itself.
+"""
+
+import contextlib
+import errno
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import typing as t
+import zipfile
+
+from . import _atomic_write, distributions, file_links, platform_info, requirements
+
+
+try:
+    import fcntl
+except ImportError:  # win32
+    fcntl = None  # type: ignore[assignment]
+
+
+INSTALLER = "culting"
+
+_PER_VENV = frozenset({"RECORD", "INSTALLER", "REQUESTED", "direct_url.json"})
+_LAUNCHER = """#!{python}
+import sys
+from {module} import {head}
+if __name__ == "__main__":
+    sys.exit({call}())
+"""
+
+
+class StoreError(RuntimeError):
+    """Package store error."""
+
+
+class Entry(t.NamedTuple):
+    """Store entry."""
+
+    name: str
+    size: int
+    refs: int
+
+
+def store_dir() -> pathlib.Path:
+    """Store dir."""
+    return platform_info.xdg_state_dir / "store"
+
+
+def _entries_dir() -> pathlib.Path:
+    return store_dir() / "entries"
+
+
+def _refs_dir(entry: str) -> pathlib.Path:
+    return store_dir() / "refs" / entry
+
+
+def _sha256_path(entry: str) -> pathlib.Path:
+    return _entries_dir() / f"{entry}.sha256"
+
+
+def _entry_sha256(entry: str) -> str | None:
+    try:
+        return _sha256_path(entry).read_text().strip()
+    except FileNotFoundError:
+        return None
+
+
+@contextlib.contextmanager
+def _locked(*, exclusive: bool = False) -> t.Iterator[None]:
+    """Hold the store lock, shared by syncs, exclusive for `gc`."""
+    store_dir().mkdir(parents=True, exist_ok=True)
+    with (store_dir() / ".lock").open("a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+
+
+def _venv_key(venv_dir: pathlib.Path) -> str:
+    return hashlib.sha256(str(venv_dir.absolute()).encode()).hexdigest()[:16]
+
+
+def _entry_path(name: str) -> pathlib.PurePosixPath:
+    """Path in the entry of a wheel member, `purelib` and `platlib` merged into the root."""
+    path = pathlib.PurePosixPath(name)
+    if path.is_absolute() or ".." in path.parts:
+        err_msg = f"Unsafe path in wheel: {name}"
+        raise StoreError(err_msg)
+    data = len(path.parts) > 2 and path.parts[0].endswith(".data")  # noqa: PLR2004
+    if data and path.parts[1] in ("purelib", "platlib"):
+        return pathlib.PurePosixPath(*path.parts[2:])
+    return path
+
+
+def import_wheel(wheel: pathlib.Path) -> str:
+    """Unpack `wheel` into the store unless it already is, return its entry.
+
+    Raise `StoreError` if the entry was unpacked from another wheel of the same name.
+    """
+    entry = wheel.name.removesuffix(".whl")
+    entry_dir = _entries_dir() / entry
+    with wheel.open("rb") as file:
+        digest = hashlib.file_digest(file, "sha256").hexdigest()
+    if not entry_dir.is_dir():
+        _unpack(wheel, entry, digest)
+    if _entry_sha256(entry) != digest:
+        err_msg = f"{wheel.name} sha256 {digest} is not the one {entry} was unpacked from."
+        raise StoreError(err_msg)
+    return entry
+
+
+def _unpack(wheel: pathlib.Path, entry: str, digest: str) -> None:
+    entry_dir = _entries_dir() / entry
+    _entries_dir().mkdir(parents=True, exist_ok=True)
+    tmp_dir = _entries_dir() / f"{entry}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    try:
+        with zipfile.ZipFile(wheel) as zip_file:
+            for info in zip_file.infolist():
+                if info.is_dir():
+                    continue
+                path = tmp_dir / _entry_path(info.filename)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with zip_file.open(info) as src, path.open("wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                path.chmod(0o555 if (info.external_attr >> 16) & 0o111 else 0o444)
+        # recorded first, an entry is never there without it
+        _atomic_write(_sha256_path(entry), f"{digest}\n")
+        try:
+            tmp_dir.rename(entry_dir)
+        except OSError as err:
+            # unpacked concurrently by another process
+            if err.errno not in (errno.EEXIST, errno.ENOTEMPTY):
+                raise
+    except (OSError, zipfile.BadZipFile) as err:
+        err_msg = f"Cannot unpack {wheel.name}: {err}"
+        raise StoreError(err_msg) from err
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _dist_info(entry_dir: pathlib.Path) -> pathlib.Path:
+    try:
+        return next(entry_dir.glob("*.dist-info"))
+    except StopIteration:
+        err_msg = f"No .dist-info in {entry_dir.name}."
+        raise StoreError(err_msg) from None
+
+
+def _venv_paths(venv_dir: pathlib.Path) -> tuple[pathlib.Path, pathlib.Path]:
+    site_packages = distributions.site_packages(venv_dir)
+    if site_packages is None:
+        err_msg = f"No site-packages in {venv_dir}."
+        raise StoreError(err_msg)
+    return site_packages, venv_dir / ("Scripts" if platform_info.os == "win32" else "bin")
+
+
+def _replace(dst: pathlib.Path) -> None:
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    dst.unlink(missing_ok=True)
+
+
+def _console_scripts(dist_info: pathlib.Path, bin_dir: pathlib.Path, python: pathlib.Path) -> list[pathlib.Path]:
+    import configparser
+
+    entry_points = configparser.ConfigParser(delimiters=("=",), interpolation=None)
+    entry_points.optionxform = str  # type: ignore[assignment, method-assign]
+    with contextlib.suppress(FileNotFoundError):
+        entry_points.read_string((dist_info / "entry_points.txt").read_text())
+    scripts = []
+    for section in ("console_scripts", "gui_scripts"):
+        if not entry_points.has_section(section):
+            continue
+        for name, value in entry_points.items(section):
+            module, _, call = value.split("[")[0].strip().partition(":")
+            if not call:
+                continue
+            script = bin_dir / name
+            _replace(script)
+            script.write_text(_LAUNCHER.format(python=python, module=module, head=call.split(".")[0], call=call))
+            script.chmod(0o755)
+            scripts.append(script)
+    return scripts
+
+
+def link(entry: str, venv_dir: pathlib.Path, linker: file_links.Linker | None = None) -> distributions.Distribution:
+    """Install an entry into the venv, as `pip` would have installed its wheel."""
+    entry_dir = _entries_dir() / entry
+    site_packages, bin_dir = _venv_paths(venv_dir)
+    python = bin_dir.absolute() / ("python.exe" if platform_info.os == "win32" else "python")
+    refs_dir = _refs_dir(entry)
+    refs_dir.mkdir(parents=True, exist_ok=True)
+    # referenced before linking, for `gc` not to remove it meanwhile
+    _atomic_write(refs_dir / _venv_key(venv_dir), str(venv_dir.absolute()))
+    dist_info = site_packages / _dist_info(entry_dir).name
+    _link = linker or file_links.Linker(reflink=False)
+    installed = []
+    for dirpath, _, filenames in os.walk(entry_dir):
+        for filename in filenames:
+            src = pathlib.Path(dirpath) / filename
+            parts = src.relative_to(entry_dir).parts
+            if parts[0].endswith(".data") and parts[1] == "scripts":
+                dst = bin_dir.joinpath(*parts[2:])
+                _replace(dst)
+                content = src.read_bytes()
+                if content.startswith((b"#!python\n", b"#!pythonw\n")):
+                    content = f"#!{python}\n".encode() + content.split(b"\n", 1)[1]
+                dst.write_bytes(content)
+                dst.chmod(0o755)
+            elif parts[0].endswith(".data") and parts[1] == "data":
+                dst = venv_dir.joinpath(*parts[2:])
+                _replace(dst)
+                _link(src, dst)
+            elif parts[0].endswith(".data") or (parts[0] == dist_info.name and parts[-1] in _PER_VENV):
+                # headers, never needed by a venv, and what is written per venv
+                continue
+            else:
+                dst = site_packages.joinpath(*parts)
+                _replace(dst)
+                _link(src, dst)
+            installed.append(dst)
+    installed.extend(_console_scripts(dist_info, bin_dir, python))
+    (dist_info / "INSTALLER").write_text(f"{INSTALLER}\n")
+    installed.append(dist_info / "INSTALLER")
+    record = [f"{os.path.relpath(path, site_packages)},," for path in installed]
+    record.append(f"{dist_info.name}/RECORD,,")
+    (dist_info / "RECORD").write_text("\n".join(record) + "\n")
+    name, version = distributions.wheel_name(f"{entry}.whl")
+    return distributions.Distribution(name, version, dist_info)
+
+
+def unlink(distribution: distributions.Distribution) -> None:
+    """Uninstall a distribution by its `RECORD`, with the bytecode of its modules."""
+    site_packages = distribution.path.parent
+    dirs = {distribution.path}
+    for line in (distribution.path / "RECORD").read_text().splitlines():
+        if not line.strip():
+            continue
+        path = pathlib.Path(os.path.normpath(site_packages / line.rsplit(",", 2)[0]))
+        path.unlink(missing_ok=True)
+        dirs.add(path.parent)
+        if path.suffix == ".py":
+            for pyc in path.parent.glob(f"__pycache__/{path.stem}.*.pyc"):
+                pyc.unlink()
+            dirs.add(path.parent / "__pycache__")
+    shutil.rmtree(distribution.path, ignore_errors=True)
+    # deepest first, dirs still holding other distributions' files stay
+    for _dir in sorted(dirs, key=lambda path: len(path.parts), reverse=True):
+        while _dir not in (site_packages, site_packages.parent) and _dir.is_relative_to(site_packages):
+            try:
+                _dir.rmdir()
+            except OSError:
+                break
+            _dir = _dir.parent
+
+
+def _load_index(path: pathlib.Path) -> dict[str, str]:
+    try:
+        index = json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+    if not isinstance(index, dict):
+        return {}
+    return {key: value for key, value in index.items() if isinstance(value, str)}
+
+
+def _dump_index(path: pathlib.Path, index: dict[str, str]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _atomic_write(path, json.dumps(index, indent=2, sort_keys=True))
+
+
+def _digest_matches(digest: str | None, pin: requirements.Pin) -> bool:
+    """Whether the sha256 is one of the lock's hashes, if any."""
+    locked = {_hash.removeprefix("sha256:") for _hash in pin.hashes if _hash.startswith("sha256:")}
+    return not locked or digest in locked
+
+
+def _matches(entry: str | None, pin: requirements.Pin) -> bool:
+    """Whether the entry is in the store, unpacked from a wheel matching the lock's hashes, if any."""
+    return entry is not None and (_entries_dir() / entry).is_dir() and _digest_matches(_entry_sha256(entry), pin)
+
+
+def sync(
+    venv_dir: pathlib.Path,
+    pins: list[requirements.Pin],
+    fetch: t.Callable[[list[requirements.Pin], pathlib.Path], None],
+    uninstall: t.Callable[[list[str]], None],
+    install: t.Callable[[list[requirements.Pin]], None],
+) -> distributions.Delta:
+    """Sync the venv to the pins, return what changed.
+
+    `fetch(pins, wheelhouse)` puts a wheel per pin missing from the store in `wheelhouse`,
+    `uninstall(names)` removes distributions not installed from the store, `install(pins)` installs
+    the pins left to `pip`.
+    """
+    delta = distributions.delta(distributions.installed(venv_dir), pins)
+    if not delta:
+        return delta
+    with _locked():
+        _sync(venv_dir, delta, fetch, uninstall, install)
+    return delta
+
+
+def _fetch_entries(
+    pins: list[requirements.Pin],
+    fetch: t.Callable[[list[requirements.Pin], pathlib.Path], None],
+) -> dict[str, str]:
+    """Fetch the pins' wheels into the store, return their entries, those not matching the lock's hashes left out."""
+    store_dir().mkdir(parents=True, exist_ok=True)
+    by_name = {pin.name: pin for pin in pins}
+    fetched = {}
+    with tempfile.TemporaryDirectory(dir=store_dir()) as wheelhouse:
+        fetch(pins, pathlib.Path(wheelhouse))
+        for wheel in pathlib.Path(wheelhouse).glob("*.whl"):
+            pin = by_name.get(distributions.wheel_name(wheel.name)[0])
+            if pin is None:
+                continue
+            with wheel.open("rb") as file:
+                digest = hashlib.file_digest(file, "sha256").hexdigest()
+            if _digest_matches(digest, pin):
+                fetched[f"{pin.name}=={pin.version}"] = import_wheel(wheel)
+    return fetched
+
+
+def _sync(
+    venv_dir: pathlib.Path,
+    delta: distributions.Delta,
+    fetch: t.Callable[[list[requirements.Pin], pathlib.Path], None],
+    uninstall: t.Callable[[list[str]], None],
+    install: t.Callable[[list[requirements.Pin]], None],
+) -> None:
+    index_path = store_dir() / "interpreters" / f"{distributions.interpreter_key(venv_dir)}.json"
+    index = _load_index(index_path)
+    missing = [pin for pin in delta.install if not _matches(index.get(f"{pin.name}=={pin.version}"), pin)]
+    if missing:
+        index.update(_fetch_entries(missing, fetch))
+        _dump_index(index_path, index)
+    foreign = [distribution.name for distribution in delta.remove if distribution.installer != INSTALLER]
+    if foreign:
+        uninstall(foreign)
+    for distribution in delta.remove:
+        if distribution.installer == INSTALLER:
+            unlink(distribution)
+    linker = file_links.Linker(reflink=False)
+    left = []
+    for pin in delta.install:
+        entry = index.get(f"{pin.name}=={pin.version}")
+        if entry is None or not _matches(entry, pin):
+            left.append(pin)
+            continue
+        link(entry, venv_dir, linker)
+    if left:
+        install(left)
+
+
+def _live(ref: pathlib.Path, entry_dir: pathlib.Path) -> bool:
+    """Whether the referencing venv still shares the entry's files."""
+    dist_info = _dist_info(entry_dir)
+    site_packages = distributions.site_packages(pathlib.Path(ref.read_text()))
+    if site_packages is None:
+        return False
+    try:
+        return (site_packages / dist_info.name / "METADATA").samefile(dist_info / "METADATA")
+    except OSError:
+        return False
+
+
+def entries() -> list[Entry]:
+    """Store entries."""
+    if not _entries_dir().is_dir():
+        return []
+    _entries = []
+    for entry_dir in sorted(_entries_dir().iterdir()):
+        if ".tmp-" in entry_dir.name or not entry_dir.is_dir():
+            continue
+        size = sum(path.stat().st_size for path in entry_dir.rglob("*") if path.is_file())
+        refs_dir = _refs_dir(entry_dir.name)
+        refs = len(list(refs_dir.iterdir())) if refs_dir.is_dir() else 0
+        _entries.append(Entry(entry_dir.name, size, refs))
+    return _entries
+
+
+def gc() -> list[Entry]:
+    """Drop stale references, then remove the entries left without any, return them."""
+    with _locked(exclusive=True):
+        return _gc()
+
+
+def _gc() -> list[Entry]:
+    removed = []
+    for entry in entries():
+        entry_dir = _entries_dir() / entry.name
+        refs_dir = _refs_dir(entry.name)
+        live = 0
+        for ref in refs_dir.iterdir() if refs_dir.is_dir() else ():
+            if _live(ref, entry_dir):
+                live += 1
+            else:
+                ref.unlink(missing_ok=True)
+        if not live:
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            shutil.rmtree(refs_dir, ignore_errors=True)
+            _sha256_path(entry.name).unlink(missing_ok=True)
+            removed.append(entry._replace(refs=0))
+    return removed
+
+
+def info() -> str:
+    """Store summary."""
+    _entries = entries()
+    size = sum(entry.size for entry in _entries)
+    lines = [f"{store_dir()}", f"{len(_entries)} entries, {size / 1024 / 1024:.1f} MiB"]
+    lines.extend(f"  {entry.name}  {entry.size / 1024:8.1f} KiB  {entry.refs} refs" for entry in _entries)
+    return "\n".join(lines)
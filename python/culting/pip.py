@@ -0,0 +1,52 @@
+"""Pip."""
+
+import pathlib
+import subprocess
+import time
+
+from . import (
+    config,
+    logger,
+    platform_info,
+    runner,
+)
+
+
+PIP_UPGRADE_TTL = 86_400
+
+
+def upgrade_stamp_path(root: pathlib.Path | None = None) -> pathlib.Path:
+    """Last successful `pip` upgrade stamp, inside `.venv` so a new venv starts over."""
+    return ((root or pathlib.Path()) / ".venv/culting-pip-upgrade").absolute()
+
+
+def upgrade_due(root: pathlib.Path | None = None) -> bool:
+    """Whether `pip` should be upgraded, `[tool.culting] pip-upgrade-ttl` seconds after the last one."""
+    pyproject_path = (root or pathlib.Path()) / "pyproject.toml"
+    if config.offline(pyproject_path):
+        return False
+    ttl = config.load(pyproject_path).pip_upgrade_ttl
+    if ttl is None:
+        ttl = PIP_UPGRADE_TTL
+    try:
+        last_upgrade = upgrade_stamp_path(root).stat().st_mtime
+    except FileNotFoundError:
+        return True
+    return time.time() - last_upgrade >= ttl
+
+
+def upgrade(root: pathlib.Path | None = None) -> None:
+    """Upgrade `pip` inside the `.venv` of the project in `root`, by default the current one, when due.
+
+    Raises `subprocess.CalledProcessError` on failure, the stamp is left untouched.
+    """
+    root = root or pathlib.Path()
+    if not upgrade_due(root):
+        logger.debug("pip upgrade skipped")
+        return
+    venv_python = platform_info.venv_python_in(root)
+    cmd: list[pathlib.Path | str] = [venv_python, "-m", "pip", "install", "--upgrade", "pip", "-q"]
+    _out = runner.get().run(cmd, root)
+    if _out.returncode != 0:
+        raise subprocess.CalledProcessError(_out.returncode, cmd, _out.stdout, _out.stderr)
+    upgrade_stamp_path(root).touch()
@@ -0,0 +1,118 @@
+"""Profiling.
+
+`culting profile` runs a culting command in a child interpreter with `-X importtime` and the spans
+written to a temporary file, then breaks its wall time down by category. Spans running concurrently
+count once per category, time they share across categories is reported as `overlap`.
+"""
+
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+import typing as t
+
+
+BAR_WIDTH = 40
+CATEGORIES = ("import", "subprocess", "network", "render")
+
+
+class Breakdown(t.NamedTuple):
+    """Where the time of a command went, in seconds."""
+
+    wall: float
+    categories: dict[str, float]
+    steps: list[tuple[str, float]]
+    overlap: float = 0.0
+
+    @property
+    def other(self) -> float:
+        """Wall time no category accounts for, interpreter startup and culting itself."""
+        return max(self.wall - sum(self.categories.values()) + self.overlap, 0.0)
+
+    def render(self) -> str:
+        """Flame-style bars, rich markup."""
+        rows = [*self.categories.items(), ("other", self.other)]
+        if self.overlap:
+            rows.append(("overlap", self.overlap))
+        width = max(len(name) for name, _ in [*rows, *self.steps])
+        lines = [f"[bold]wall[/bold]{' ' * (width - 4)}  {self.wall:7.3f}s"]
+        lines.extend(f"{name:<{width}}  {duration:7.3f}s  {self._bar(duration)}" for name, duration in rows)
+        if self.steps:
+            lines.append("\n[bold]steps[/bold]")
+            lines.extend(f"{name:<{width}}  {duration:7.3f}s  {self._bar(duration)}" for name, duration in self.steps)
+        return "\n".join(lines)
+
+    def _bar(self, duration: float) -> str:
+        share = duration / self.wall if self.wall else 0.0
+        return f"[cyan]{'█' * round(min(share, 1.0) * BAR_WIDTH)}[/cyan] {share:.0%}"
+
+
+def import_time(line: str) -> float | None:
+    """Cumulative seconds of a top-level `-X importtime` line, `None` for other lines."""
+    if not line.startswith("import time:") or line.count("|") != 2:  # noqa: PLR2004
+        return None
+    _, cumulative, name = line.split("|")
+    # nested imports are indented further than the single space after the `|`
+    if not cumulative.strip().isdigit() or name[1:2].isspace():
+        return None
+    return int(cumulative) / 1_000_000
+
+
+def _union(intervals: t.Iterable[tuple[float, float]]) -> float:
+    """Length of the union of `(start, end)` intervals."""
+    total = 0.0
+    covered_end = float("-inf")
+    for start, end in sorted(intervals):
+        total += max(end - max(start, covered_end), 0.0)
+        covered_end = max(covered_end, end)
+    return total
+
+
+def breakdown(wall: float, imports: float, spans: t.Iterable[dict[str, t.Any]]) -> Breakdown:
+    """Time the spans of each category cover, steps in the order they ended."""
+    intervals: dict[str, list[tuple[float, float]]] = {category: [] for category in CATEGORIES[1:]}
+    steps: list[tuple[str, float]] = []
+    for span in spans:
+        if span["category"] == "step":
+            steps.append((span["name"], span["duration"]))
+        elif span["category"] in intervals:
+            intervals[span["category"]].append((span["start"], span["start"] + span["duration"]))
+    categories = {"import": imports, **{category: _union(_intervals) for category, _intervals in intervals.items()}}
+    covered = _union(interval for _intervals in intervals.values() for interval in _intervals)
+    overlap = sum(categories.values()) - imports - covered
+    return Breakdown(wall, categories, steps, overlap if overlap > 1e-9 else 0.0)  # noqa: PLR2004
+
+
+def profile(args: t.Sequence[str]) -> tuple[int, str]:
+    """Run `culting ARGS`, return its exit code and the rendered breakdown.
+
+    Its stdout is left alone, its stderr passed through without the import times.
+    """
+    imports = 0.0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        spans_path = pathlib.Path(tmp_dir) / "spans.jsonl"
+        env = {**os.environ, "CULTING_SPANS_FILE": str(spans_path)}
+        # profile the command, not a warm daemon
+        env.pop("CULTING_DAEMON", None)
+        start = time.perf_counter()
+        with subprocess.Popen(
+            [sys.executable, "-X", "importtime", "-m", "culting", *args],
+            stderr=subprocess.PIPE,
+            text=True,
+            env=env,
+        ) as proc:
+            if proc.stderr is None:
+                raise RuntimeError
+            for line in proc.stderr:
+                seconds = import_time(line)
+                if seconds is not None:
+                    imports += seconds
+                elif not line.startswith("import time:"):
+                    sys.stderr.write(line)
+            returncode = proc.wait()
+        wall = time.perf_counter() - start
+        spans = [json.loads(line) for line in spans_path.read_text().splitlines()] if spans_path.is_file() else []
+    return returncode, breakdown(wall, imports, spans).render()
@@ -1,5 +1,7 @@
 """Pyproject."""
 
+import functools
+import re
 import typing as t
 
 import tomlkit as toml
@@ -25,76 +27,90 @@ class ProjectType:
 
 
 class PyprojectToml:
-    """Pyproject toml document."""
+    """Pyproject toml renderer.
+
+    `dumps` fills a template made once per OS out of a placeholders document, rendering only the
+    project's own fields, as `document` would. Instances keep their fields to themselves, so they
+    render concurrently.
+    """
 
     venv_name = ".venv"
 
-    def __new__(
-        cls,
+    def __init__(
+        self,
         pkg_name: str,
         python_version: str,
         authors_info: t.Iterable[AuthorInfo],
         src: str = "src",
-    ) -> toml.TOMLDocument:
+        os_: SupportedOs | None = None,
+    ) -> None:
+        """Init."""
+        self.pkg_name = pkg_name
+        self.python_version = python_version
+        self.authors_info = list(authors_info)
+        self.src = src
+        self.os = os_ or platform_info.os
+
+    def document(self) -> toml.TOMLDocument:
         """Return pyproject.toml document."""
-        cls.pkg_name = pkg_name
-        cls.python_version = python_version
-        cls.os = platform_info.os
-        cls.authors_info = authors_info
-        cls.src = src
         doc = toml.document()
         doc.add(toml.nl())
-        doc["build-system"] = cls._build_system()
-        doc["project"] = cls._project()
-        doc["tool"] = cls._tool()
+        doc["build-system"] = self._build_system()
+        doc["project"] = self._project()
+        doc["tool"] = self._tool()
         doc.add(toml.nl())
         return doc
 
-    @classmethod
-    def _build_system(cls) -> tomlkit.items.Table:
+    def dumps(self) -> str:
+        """Return pyproject.toml content, the same as `tomlkit.dumps(self.document())`."""
+        slots = {
+            "name": toml.item(self.pkg_name).as_string(),
+            "package_data_key": toml.key(self.pkg_name).as_string(),
+            "requires_python": toml.item(f">={self.python_version}").as_string(),
+            "authors": self._authors().as_string(),
+            "src": toml.item(self.src).as_string(),
+        }
+        return "".join(chunk if is_text else slots[chunk] for is_text, chunk in _template(self.os))
+
+    def _build_system(self) -> tomlkit.items.Table:
         build_system = toml.table()
         build_system["requires"] = ["setuptools", "setuptools-scm"]
         build_system["build-backend"] = "setuptools.build_meta"
         return build_system
 
-    @classmethod
-    def _project(cls) -> tomlkit.items.Table:
+    def _project(self) -> tomlkit.items.Table:
         project = toml.table()
-        project["name"] = cls.pkg_name
+        project["name"] = self.pkg_name
         project["description"] = ""
         project["readme"] = "README.md"
-        project["keywords"] = cls._keywords()
-        project["requires-python"] = f">={cls.python_version}"
-        project["dynamic"] = cls._dynamic()
+        project["keywords"] = self._keywords()
+        project["requires-python"] = f">={self.python_version}"
+        project["dynamic"] = self._dynamic()
         project.add(toml.nl())
-        project["authors"] = cls._authors()
-        project["classifiers"] = cls._classifiers()
-        project["optional-dependencies"] = cls._optional_dependencies()
-        project["urls"] = cls._urls()
-        project["scripts"] = cls._scripts()
-        project["gui-scripts"] = cls._gui_scripts()
+        project["authors"] = self._authors()
+        project["classifiers"] = self._classifiers()
+        project["optional-dependencies"] = self._optional_dependencies()
+        project["urls"] = self._urls()
+        project["scripts"] = self._scripts()
+        project["gui-scripts"] = self._gui_scripts()
         return project
 
-    @classmethod
-    def _keywords(cls) -> tomlkit.items.Array:
+    def _keywords(self) -> tomlkit.items.Array:
         return toml.array()
 
-    @classmethod
-    def _dynamic(cls) -> tomlkit.items.Array:
+    def _dynamic(self) -> tomlkit.items.Array:
         dynamic = toml.array()
         dynamic.multiline(multiline=True)
         dynamic.extend(["version", "dependencies"])
         return dynamic
 
-    @classmethod
-    def _authors(cls) -> tomlkit.items.Array:
+    def _authors(self) -> tomlkit.items.Array:
         authors = toml.array().multiline(multiline=True)
-        for author_info in cls.authors_info:
-            authors.add_line(cls._author(author_info), newline=True)
+        for author_info in self.authors_info:
+            authors.add_line(self._author(author_info), newline=True)
         return authors
 
-    @classmethod
-    def _author(cls, author_info: AuthorInfo) -> tomlkit.items.InlineTable:
+    def _author(self, author_info: AuthorInfo) -> tomlkit.items.InlineTable:
         author = toml.inline_table()
         name = author_info.get("name")
         if name is not None:
@@ -104,8 +120,7 @@ class PyprojectToml:
             author["email"] = email
         return author
 
-    @classmethod
-    def _classifiers(cls) -> tomlkit.items.Array:
+    def _classifiers(self) -> tomlkit.items.Array:
         classifiers = toml.array().multiline(multiline=True)
         classifiers.extend([
             "License :: OSI Approved :: MIT License",
@@ -115,15 +130,13 @@ class PyprojectToml:
         ])
         return classifiers
 
-    @classmethod
-    def _optional_dependencies(cls) -> tomlkit.items.Table:
+    def _optional_dependencies(self) -> tomlkit.items.Table:
         optional_dependencies = toml.table()
-        optional_dependencies["tests"] = cls._tests()
-        optional_dependencies["dev"] = cls._dev()
+        optional_dependencies["tests"] = self._tests()
+        optional_dependencies["dev"] = self._dev()
         return optional_dependencies
 
-    @classmethod
-    def _tests(cls) -> tomlkit.items.Array:
+    def _tests(self) -> tomlkit.items.Array:
         tests = toml.array().multiline(multiline=True)
         tests.extend([
             "coverage",
@@ -135,8 +148,7 @@ class PyprojectToml:
         ])
         return tests
 
-    @classmethod
-    def _dev(cls) -> tomlkit.items.Array:
+    def _dev(self) -> tomlkit.items.Array:
         dev = toml.array().multiline(multiline=True)
         dev.extend([
             "culting[tests]",
@@ -144,147 +156,130 @@ class PyprojectToml:
         ])
         return dev
 
-    @classmethod
-    def _urls(cls) -> tomlkit.items.Table:
+    def _urls(self) -> tomlkit.items.Table:
         urls = toml.table()
         urls.add(toml.comment('"Homepage" = ""'))
         urls.add(toml.comment('"Repository" = ""'))
         urls.add(toml.comment('"Documentation" = ""'))
         return urls
 
-    @classmethod
-    def _scripts(cls) -> tomlkit.items.Table:
+    def _scripts(self) -> tomlkit.items.Table:
         return toml.table()
 
-    @classmethod
-    def _gui_scripts(cls) -> tomlkit.items.Table:
+    def _gui_scripts(self) -> tomlkit.items.Table:
         return toml.table()
 
-    @classmethod
-    def _tool(cls) -> tomlkit.items.Table:
+    def _tool(self) -> tomlkit.items.Table:
         tool = toml.table()
-        tool["setuptools_scm"] = cls._setuptools_scm()
-        tool["setuptools"] = cls._setuptools()
-        tool["pytest"] = cls._pytest()
-        tool["coverage"] = cls._coverage()
-        tool["mypy"] = cls._mypy()
-        tool["pyright"] = cls._pyright()
-        tool["ruff"] = cls._ruff()
-        tool["culting"] = cls._culting()
+        tool["setuptools_scm"] = self._setuptools_scm()
+        tool["setuptools"] = self._setuptools()
+        tool["pytest"] = self._pytest()
+        tool["coverage"] = self._coverage()
+        tool["mypy"] = self._mypy()
+        tool["pyright"] = self._pyright()
+        tool["ruff"] = self._ruff()
+        tool["culting"] = self._culting()
         return tool
 
-    @classmethod
-    def _setuptools_scm(cls) -> tomlkit.items.Table:
+    def _setuptools_scm(self) -> tomlkit.items.Table:
         return toml.table()
 
-    @classmethod
-    def _setuptools(cls) -> tomlkit.items.Table:
+    def _setuptools(self) -> tomlkit.items.Table:
         setuptools = toml.table()
-        setuptools["package-data"] = cls._setuptools_package_data()
-        setuptools["dynamic"] = cls._setuptools_dynamic()
-        setuptools["packages"] = cls._setuptools_packages()
+        setuptools["package-data"] = self._setuptools_package_data()
+        setuptools["dynamic"] = self._setuptools_dynamic()
+        setuptools["packages"] = self._setuptools_packages()
         return setuptools
 
-    @classmethod
-    def _setuptools_package_data(cls) -> tomlkit.items.Table:
+    @property
+    def _package_data_key(self) -> str:
+        return self.pkg_name
+
+    def _setuptools_package_data(self) -> tomlkit.items.Table:
         package_data = toml.table()
-        package_data[cls.pkg_name] = ["py.typed"]
+        package_data[self._package_data_key] = ["py.typed"]
         return package_data
 
-    @classmethod
-    def _setuptools_dynamic(cls) -> tomlkit.items.Table:
+    def _setuptools_dynamic(self) -> tomlkit.items.Table:
         setuptools_dynamic = toml.table()
-        setuptools_dynamic["dependencies"] = cls._setuptools_dynamic_dependencies()
+        setuptools_dynamic["dependencies"] = self._setuptools_dynamic_dependencies()
         return setuptools_dynamic
 
-    @classmethod
-    def _setuptools_dynamic_dependencies(cls) -> tomlkit.items.InlineTable:
+    def _setuptools_dynamic_dependencies(self) -> tomlkit.items.InlineTable:
         dependencies = toml.inline_table()
         dependencies["file"] = ["requirements.lock"]
         return dependencies
 
-    @classmethod
-    def _setuptools_packages(cls) -> tomlkit.items.Table:
+    def _setuptools_packages(self) -> tomlkit.items.Table:
         setuptools_packages = toml.table()
-        setuptools_packages["find"] = cls._setuptools_packages_find()
+        setuptools_packages["find"] = self._setuptools_packages_find()
         return setuptools_packages
 
-    @classmethod
-    def _setuptools_packages_find(cls) -> tomlkit.items.Table:
+    def _setuptools_packages_find(self) -> tomlkit.items.Table:
         find = toml.table()
-        find["where"] = [cls.src]
+        find["where"] = [self.src]
         return find
 
-    @classmethod
-    def _pytest(cls) -> tomlkit.items.Table:
+    def _pytest(self) -> tomlkit.items.Table:
         pytest = toml.table()
-        pytest["ini_options"] = cls._pytest_ini_options()
+        pytest["ini_options"] = self._pytest_ini_options()
         return pytest
 
-    @classmethod
-    def _pytest_ini_options(cls) -> tomlkit.items.Table:
+    def _pytest_ini_options(self) -> tomlkit.items.Table:
         ini_options = toml.table()
         ini_options["addopts"] = "--strict-markers --no-header --tb=no --cov --cov-report term-missing"
         ini_options["testpaths"] = ["tests"]
         return ini_options
 
-    @classmethod
-    def _coverage(cls) -> tomlkit.items.Table:
+    def _coverage(self) -> tomlkit.items.Table:
         coverage = toml.table()
-        coverage["run"] = cls._coverage_run()
+        coverage["run"] = self._coverage_run()
         return coverage
 
-    @classmethod
-    def _coverage_run(cls) -> tomlkit.items.Table:
+    def _coverage_run(self) -> tomlkit.items.Table:
         coverage_run = toml.table()
         coverage_run["omit"] = ["tests/*"]
         return coverage_run
 
-    @classmethod
-    def _mypy(cls, os_: SupportedOs = platform_info.os) -> tomlkit.items.Table:
+    def _mypy(self) -> tomlkit.items.Table:
         mypy = toml.table()
         mypy["strict"] = True
-        if os_ == "linux":
-            mypy["python_executable"] = f"{cls.venv_name}/bin/python"
-        elif os_ == "win32":
-            mypy["python_executable"] = f"{cls.venv_name}/Scripts/python.exe"
-        mypy["exclude"] = cls._exclude()
+        if self.os == "linux":
+            mypy["python_executable"] = f"{self.venv_name}/bin/python"
+        elif self.os == "win32":
+            mypy["python_executable"] = f"{self.venv_name}/Scripts/python.exe"
+        mypy["exclude"] = self._exclude()
         return mypy
 
-    @classmethod
-    def _pyright(cls) -> tomlkit.items.Table:
+    def _pyright(self) -> tomlkit.items.Table:
         pyright = toml.table()
         pyright["venvPath"] = "."
-        pyright["venv"] = cls.venv_name
-        pyright["exclude"] = cls._exclude()
+        pyright["venv"] = self.venv_name
+        pyright["exclude"] = self._exclude()
         return pyright
 
-    @classmethod
-    def _ruff(cls) -> tomlkit.items.Table:
+    def _ruff(self) -> tomlkit.items.Table:
         ruff = toml.table()
         ruff["line-length"] = 120
         ruff["indent-width"] = 4
-        ruff["exclude"] = cls._exclude()
-        ruff["lint"] = cls._ruff_lint()
+        ruff["exclude"] = self._exclude()
+        ruff["lint"] = self._ruff_lint()
         return ruff
 
-    @classmethod
-    def _ruff_lint(cls) -> tomlkit.items.Table:
+    def _ruff_lint(self) -> tomlkit.items.Table:
         lint = toml.table()
-        lint["select"] = cls._ruff_lint_select()
-        lint["ignore"] = cls._ruff_lint_ignore()
-        lint["per-file-ignores"] = cls._ruff_lint_per_file_ignore()
-        lint["isort"] = cls._ruff_lint_isort()
+        lint["select"] = self._ruff_lint_select()
+        lint["ignore"] = self._ruff_lint_ignore()
+        lint["per-file-ignores"] = self._ruff_lint_per_file_ignore()
+        lint["isort"] = self._ruff_lint_isort()
         return lint
 
-    @classmethod
-    def _ruff_lint_select(cls) -> tomlkit.items.Array:
+    def _ruff_lint_select(self) -> tomlkit.items.Array:
         lint_select = toml.array().multiline(multiline=True)
         lint_select.extend(["ALL"])
         return lint_select
 
-    @classmethod
-    def _ruff_lint_ignore(cls) -> tomlkit.items.Array:
+    def _ruff_lint_ignore(self) -> tomlkit.items.Array:
         lint_ignore = toml.array().multiline(multiline=True)
         lint_ignore.add_line(
             "D203",
@@ -302,33 +297,61 @@ class PyprojectToml:
         )
         return lint_ignore
 
-    @classmethod
-    def _ruff_lint_per_file_ignore(cls) -> tomlkit.items.Table:
+    def _ruff_lint_per_file_ignore(self) -> tomlkit.items.Table:
         pattern = toml.array().multiline(multiline=True)
         pattern.add_line("S101", comment="Use of `assert` detected")
         ruff_lint_per_file_ignore = toml.table()
         ruff_lint_per_file_ignore["tests/**/*.py"] = pattern
         return ruff_lint_per_file_ignore
 
-    @classmethod
-    def _ruff_lint_isort(cls) -> tomlkit.items.Table:
+    def _ruff_lint_isort(self) -> tomlkit.items.Table:
         ruff_isort = toml.table()
-        ruff_isort["known-first-party"] = [cls.pkg_name]
+        ruff_isort["known-first-party"] = [self.pkg_name]
         ruff_isort["lines-after-imports"] = 2
         return ruff_isort
 
-    @classmethod
-    def _exclude(cls) -> tomlkit.items.Array:
+    def _exclude(self) -> tomlkit.items.Array:
         exclude = toml.array().multiline(multiline=True)
         exclude.extend([
             "__pycache__",
             ".git",
-            cls.venv_name,
+            self.venv_name,
         ])
         return exclude
 
-    @classmethod
-    def _culting(cls) -> tomlkit.items.Table:
+    def _culting(self) -> tomlkit.items.Table:
         return toml.table()
 
 
+class _Placeholders(PyprojectToml):
+    """Document with a placeholder in place of each project field."""
+
+    def __init__(self, os_: SupportedOs) -> None:
+        super().__init__("{name}", "{python_version}", [], "{src}", os_)
+
+    @property
+    def _package_data_key(self) -> str:
+        return "{package_data_key}"
+
+    def _authors(self) -> tomlkit.items.Array:
+        return t.cast(tomlkit.items.Array, toml.item("{authors}"))
+
+
+_PLACEHOLDERS = {
+    '"{name}"': "name",
+    '"{package_data_key}"': "package_data_key",
+    '">={python_version}"': "requires_python",
+    '"{authors}"': "authors",
+    '"{src}"': "src",
+}
+
+
+@functools.cache
+def _template(os_: SupportedOs) -> tuple[tuple[bool, str], ...]:
+    """Placeholders document split into text chunks and slot names."""
+    text = toml.dumps(_Placeholders(os_).document())
+    chunks = re.split(f"({'|'.join(map(re.escape, _PLACEHOLDERS))})", text)
+    return tuple(
+        (True, chunk) if i % 2 == 0 else (False, _PLACEHOLDERS[chunk])
+        for i, chunk in enumerate(chunks)
+    )
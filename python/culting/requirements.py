@@ -0,0 +1,212 @@
+"""Requirements.
+
+`requirements*.in` files as PEP 508 requirements, comments, pip options and URL or path lines kept as
+they are.
+"""
+
+import pathlib
+import re
+import typing as t
+
+
+_REQUIREMENT_RE = re.compile(
+    r"""
+    ^(?P<name>[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)\s*
+    (?:\[(?P<extras>[^\]]*)\])?\s*
+    (?:@\s*(?P<url>[^\s;]+)\s*|(?P<specifier>[^;@]*))
+    (?:;\s*(?P<marker>.*))?$
+    """,
+    re.VERBOSE,
+)
+_SPECIFIER_RE = re.compile(r"(?P<operator>~=|===|==|!=|<=|>=|<|>)\s*(?P<version>[A-Za-z0-9_.*+!-]+)")
+_URL_RE = re.compile(r"[A-Za-z][A-Za-z0-9+.-]*://|file:|[.~/\\]|[A-Za-z]:[/\\]")
+_OPTIONS_RE = re.compile(r"\s+(?=--?[A-Za-z])")
+_COMMENT_RE = re.compile(r"(^|\s+)#.*$")
+
+
+class RequirementError(ValueError):
+    """Invalid requirement."""
+
+
+def normalize_name(name: str) -> str:
+    """PEP 503 normalized name."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+class Requirement(t.NamedTuple):
+    """Requirement line, `name` is `None` for comments, blank lines, pip options and URL or path lines."""
+
+    line: str
+    name: str | None = None
+    extras: tuple[str, ...] = ()
+    specifier: str = ""
+    url: str = ""
+    marker: str = ""
+
+    @classmethod
+    def parse(cls, line: str) -> "Requirement":
+        """Parse a line."""
+        line = line.rstrip("\r\n")
+        text = _COMMENT_RE.sub("", line).strip()
+        if not text or text.startswith("-"):
+            return cls(line)
+        if _URL_RE.match(text):
+            # VCS, URL and path requirements are left to pip as they are
+            return cls(line, url=text)
+        # per-requirement options, like `--hash`, are not part of the specifier
+        requirement_text = _OPTIONS_RE.split(text, maxsplit=1)[0]
+        err_msg = f"Invalid requirement: '{text}'"
+        requirement_re = _REQUIREMENT_RE.match(requirement_text)
+        if requirement_re is None:
+            raise RequirementError(err_msg)
+        extras = (requirement_re.group("extras") or "").split(",")
+        specifier = (requirement_re.group("specifier") or "").strip()
+        if specifier.startswith("(") and specifier.endswith(")"):
+            specifier = specifier[1:-1].strip()
+        clauses = [_SPECIFIER_RE.fullmatch(clause.strip()) for clause in specifier.split(",")] if specifier else []
+        if not all(clauses):
+            raise RequirementError(err_msg)
+        return cls(
+            line=line,
+            name=normalize_name(requirement_re.group("name")),
+            extras=tuple(sorted(normalize_name(extra.strip()) for extra in extras if extra.strip())),
+            specifier=",".join(sorted(f"{clause['operator']}{clause['version']}" for clause in clauses if clause)),
+            url=requirement_re.group("url") or "",
+            marker=(requirement_re.group("marker") or "").strip(),
+        )
+
+
+def _block_key(block: list[Requirement]) -> tuple[str, str]:
+    return t.cast(str, block[-1].name), block[-1].line
+
+
+class RequirementsFile:
+    """Requirements file, indexed by normalized name."""
+
+    def __init__(self, path: pathlib.Path | str = "requirements.in") -> None:
+        """Init."""
+        self.path = pathlib.Path(path)
+        try:
+            self._text = self.path.read_text()
+        except FileNotFoundError:
+            self._text = ""
+        self.lines = [Requirement.parse(line) for line in self._text.splitlines()]
+        self._trailing_newline = not self._text or self._text.endswith("\n")
+        self._reindex()
+
+    def _reindex(self) -> None:
+        self._index: dict[str, list[Requirement]] = {}
+        for line in self.lines:
+            if line.name is not None:
+                self._index.setdefault(line.name, []).append(line)
+
+    def __contains__(self, name: str) -> bool:
+        """Whether a requirement named `name` is there."""
+        return normalize_name(name) in self._index
+
+    def __getitem__(self, name: str) -> Requirement:
+        """First requirement named `name`."""
+        return self._index[normalize_name(name)][0]
+
+    @property
+    def requirements(self) -> list[Requirement]:
+        """Requirements, comments and options left out."""
+        return [line for line in self.lines if line.name is not None]
+
+    def duplicates(self) -> dict[str, list[Requirement]]:
+        """Return the requirements listed more than once."""
+        return {name: lines for name, lines in self._index.items() if len(lines) > 1}
+
+    def conflicts(self) -> dict[str, list[Requirement]]:
+        """Return the requirements listed more than once, differently."""
+        return {
+            name: lines
+            for name, lines in self.duplicates().items()
+            if len({(line.extras, line.specifier, line.url, line.marker) for line in lines}) > 1
+        }
+
+    def add(self, line: str) -> Requirement:
+        """Add or replace a requirement."""
+        requirement = Requirement.parse(line)
+        if requirement.name is None:
+            err_msg = f"Invalid requirement: '{line}'"
+            raise RequirementError(err_msg)
+        existing = self._index.get(requirement.name)
+        if existing is None:
+            self.lines.append(requirement)
+        else:
+            index = self.lines.index(existing[0])
+            self.lines = [line for line in self.lines if line.name != requirement.name]
+            self.lines.insert(index, requirement)
+        self._reindex()
+        return requirement
+
+    def sort(self) -> None:
+        """Sort requirements by name within groups, comments right above a requirement move along with it.
+
+        Blank lines, pip options and URL or path lines stay in place and separate the groups.
+        """
+        lines: list[Requirement] = []
+        blocks: list[list[Requirement]] = []
+        block: list[Requirement] = []
+        for line in self.lines:
+            if line.name is not None:
+                blocks.append([*block, line])
+                block = []
+            elif line.line.strip().startswith("#"):
+                block.append(line)
+            else:
+                blocks.sort(key=_block_key)
+                lines.extend([*(_line for _block in blocks for _line in _block), *block, line])
+                blocks, block = [], []
+        blocks.sort(key=_block_key)
+        self.lines = [*lines, *(line for _block in blocks for line in _block), *block]
+
+    @property
+    def text(self) -> str:
+        """File content, ending with a newline if the file read did, or was empty."""
+        text = "\n".join(line.line for line in self.lines)
+        return f"{text}\n" if text and self._trailing_newline else text
+
+    def write(self) -> bool:
+        """Write the file only if its content changed, return whether it did."""
+        text = self.text
+        if text == self._text:
+            return False
+        self.path.write_text(text)
+        self._text = text
+        return True
+
+
+class Pin(t.NamedTuple):
+    """Exact pin of a lock file."""
+
+    name: str
+    version: str
+    hashes: tuple[str, ...] = ()
+
+    @property
+    def line(self) -> str:
+        """Requirements file line."""
+        return " ".join([f"{self.name}=={self.version}", *(f"--hash={_hash}" for _hash in self.hashes)])
+
+
+def pins(path: pathlib.Path | str = "requirements.lock") -> list[Pin] | None:
+    """Pins of a `pip-compile` lock file, `None` if not all of it is plain `name==version` pins.
+
+    Markers, URLs, editables and pip options other than `--hash` are left to pip.
+    """
+    text = re.sub(r"\\\n", " ", pathlib.Path(path).read_text())
+    _pins = []
+    for line in text.splitlines():
+        tokens = _COMMENT_RE.sub("", line).split()
+        if not tokens:
+            continue
+        hashes = tuple(token.removeprefix("--hash=") for token in tokens[1:] if token.startswith("--hash="))
+        if tokens[0].startswith("-") or len(hashes) != len(tokens) - 1:
+            return None
+        requirement = Requirement.parse(tokens[0])
+        if requirement.url or requirement.marker or not re.fullmatch(r"==[^,*]+", requirement.specifier):
+            return None
+        _pins.append(Pin(t.cast(str, requirement.name), requirement.specifier[2:], hashes))
+    return _pins
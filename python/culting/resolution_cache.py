@@ -0,0 +1,169 @@
+"""Resolution cache.
+
+`requirements.lock` files shared across projects, keyed by the normalized requirements, the
+interpreter and the index configuration.
+"""
+
+import hashlib
+import os
+import pathlib
+import platform
+import re
+import sys
+import time
+import typing as t
+
+from . import (
+    _atomic_write,
+    logger,
+    platform_info,
+    requirements,
+)
+
+
+RESOLUTION_CACHE_SIZE = 32 * 1024 * 1024
+
+_INDEX_ENV = ("PIP_INDEX_URL", "PIP_EXTRA_INDEX_URL", "PIP_FIND_LINKS", "PIP_NO_INDEX", "PIP_PRE")
+_LOCAL_OPTIONS = ("-r", "-c", "-e", "--requirement", "--constraint", "--editable")
+
+
+class Entry(t.NamedTuple):
+    """Cache entry."""
+
+    path: pathlib.Path
+    size: int
+    used: float
+
+
+def cache_dir() -> pathlib.Path:
+    """Resolution cache path."""
+    return platform_info.xdg_state_dir / "resolutions"
+
+
+def _pip_conf_paths(venv_dir: pathlib.Path) -> list[pathlib.Path]:
+    home = pathlib.Path.home()
+    return [
+        pathlib.Path("/etc/pip.conf"),
+        home / ".pip/pip.conf",
+        home / ".config/pip/pip.conf",
+        home / "AppData/Roaming/pip/pip.ini",
+        venv_dir / "pip.conf",
+        venv_dir / "pip.ini",
+    ]
+
+
+def _normalize(line: str) -> str | None:
+    line = re.sub(r"(^|\s)#.*$", "", line).strip()
+    if not line:
+        return None
+    if line.startswith("-"):
+        if line.split()[0].split("=")[0] in _LOCAL_OPTIONS:
+            raise ValueError(line)
+        return " ".join(line.split())
+    if "/" in line or "\\" in line:
+        raise ValueError(line)
+    name_re = re.match(r"([A-Za-z0-9][A-Za-z0-9._-]*)(.*)$", line)
+    if name_re is None:
+        raise ValueError(line)
+    name, rest = name_re.groups()
+    return requirements.normalize_name(name) + "".join(rest.split())
+
+
+def key(
+    requirements_in: pathlib.Path | str = "requirements.in",
+    pyvenv_cfg: pathlib.Path | str = ".venv/pyvenv.cfg",
+) -> str | None:
+    """Cache key, `None` when `requirements_in` refers to local files, or either file cannot be read."""
+    try:
+        lines = pathlib.Path(requirements_in).read_text().splitlines()
+        pyvenv_lines = pathlib.Path(pyvenv_cfg).read_text().splitlines()
+    except OSError as err:
+        logger.debug(f"resolution cache disabled: {err}")
+        return None
+    try:
+        requirements = sorted({_line for line in lines if (_line := _normalize(line)) is not None})
+    except ValueError as err:
+        logger.debug(f"resolution cache disabled by '{err}'")
+        return None
+    python_version = ""
+    for line in pyvenv_lines:
+        _key, _, value = line.partition("=")
+        if _key.strip() in ("version", "version_info"):
+            python_version = value.strip()
+    _hash = hashlib.sha256()
+    for part in (
+        *requirements,
+        python_version,
+        sys.platform,
+        platform.machine(),
+        *(f"{name}={os.environ.get(name, '')}" for name in _INDEX_ENV),
+    ):
+        _hash.update(f"{part}\0".encode())
+    for path in _pip_conf_paths(pathlib.Path(pyvenv_cfg).parent):
+        try:
+            _hash.update(path.read_bytes() + b"\0")
+        except OSError:
+            continue
+    return _hash.hexdigest()
+
+
+def get(key: str) -> str | None:
+    """Return the cached `requirements.lock` text, marked as recently used."""
+    path = cache_dir() / f"{key}.lock"
+    try:
+        text = path.read_text()
+        path.touch()
+    except OSError:
+        return None
+    return text
+
+
+def put(key: str, text: str, max_size: int = RESOLUTION_CACHE_SIZE) -> None:
+    """Cache `requirements.lock` text, evicting the least recently used entries above `max_size`."""
+    path = cache_dir() / f"{key}.lock"
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(path, text)
+    except OSError:
+        logger.debug(f"Cannot write {path}")
+        return
+    prune(max_size)
+
+
+def entries() -> list[Entry]:
+    """Cache entries, least recently used first."""
+    _entries = []
+    for path in cache_dir().glob("*.lock"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        _entries.append(Entry(path, stat.st_size, stat.st_mtime))
+    return sorted(_entries, key=lambda entry: entry.used)
+
+
+def prune(max_size: int = RESOLUTION_CACHE_SIZE) -> list[Entry]:
+    """Evict the least recently used entries until the cache fits `max_size` bytes, return them."""
+    _entries = entries()
+    size = sum(entry.size for entry in _entries)
+    evicted = []
+    for entry in _entries:
+        if size <= max_size:
+            break
+        entry.path.unlink(missing_ok=True)
+        size -= entry.size
+        evicted.append(entry)
+    return evicted
+
+
+def info() -> str:
+    """Cache summary."""
+    _entries = entries()
+    size = sum(entry.size for entry in _entries)
+    lines = [f"{cache_dir()}", f"{len(_entries)} entries, {size / 1024:.1f} KiB"]
+    lines.extend(
+        f"  {entry.path.stem[:16]}  {entry.size / 1024:6.1f} KiB  "
+        f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(entry.used))}"
+        for entry in reversed(_entries)
+    )
+    return "\n".join(lines)
@@ -0,0 +1,83 @@
+"""Runner.
+
+Every external command culting runs goes through the current runner: the subprocess one, or, for
+tests and benchmarks, a fake toolchain, a recording or a replay of one, from `tests.runners`.
+"""
+
+import contextlib
+import pathlib
+import shutil
+import subprocess
+import threading
+import typing as t
+
+from . import spans
+
+
+Cmd = t.Sequence[pathlib.Path | str]
+
+_READ_SIZE = 64 * 1024
+
+
+def _pump(pipe: t.IO[str], on_line: t.Callable[[str], None]) -> None:
+    # on Ctrl-C, `Popen.__exit__` closes the pipe under the stderr thread
+    with contextlib.suppress(ValueError, OSError):
+        for line in iter(lambda: pipe.readline(_READ_SIZE), ""):
+            on_line(line)
+    pipe.close()
+
+
+class Runner:
+    """Subprocess runner."""
+
+    def which(self, cmd: str | pathlib.Path) -> str | None:
+        """Return the executable path."""
+        return shutil.which(cmd)
+
+    def run(self, cmd: Cmd, cwd: pathlib.Path | None = None) -> subprocess.CompletedProcess[str]:
+        """Run `cmd` to completion, output captured."""
+        with spans.span("subprocess", pathlib.Path(cmd[0]).name) as span:
+            completed = subprocess.run(cmd, check=False, capture_output=True, text=True, cwd=cwd)
+            span["exit_code"] = completed.returncode
+        return completed
+
+    def stream(
+        self,
+        cmd: Cmd,
+        on_stdout: t.Callable[[str], None],
+        on_stderr: t.Callable[[str], None],
+        cwd: pathlib.Path | None = None,
+    ) -> int:
+        """Run `cmd` handing each stdout and stderr line to its callback as it comes, return the exit code."""
+        with (
+            spans.span("subprocess", pathlib.Path(cmd[0]).name) as span,
+            subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd=cwd) as proc,
+        ):
+            if proc.stdout is None or proc.stderr is None:
+                raise RuntimeError
+            stderr_thread = threading.Thread(target=_pump, args=(proc.stderr, on_stderr), daemon=True)
+            stderr_thread.start()
+            _pump(proc.stdout, on_stdout)
+            stderr_thread.join()
+            exit_code = proc.wait()
+            span["exit_code"] = exit_code
+            return exit_code
+
+
+_runner: Runner = Runner()
+
+
+def get() -> Runner:
+    """Return the current runner."""
+    return _runner
+
+
+@contextlib.contextmanager
+def use(runner: Runner) -> t.Iterator[Runner]:
+    """Set the current runner for the duration of the block."""
+    global _runner  # noqa: PLW0603
+    previous, _runner = _runner, runner
+    try:
+        yield runner
+    finally:
+        _runner = previous
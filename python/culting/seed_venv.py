@@ -0,0 +1,154 @@
+"""Seed venv.
+
+One venv per interpreter and seed requirements, kept in the XDG state dir with `pip-tools` already
+installed. New projects' `.venv` is a clone of it: files are reflinked, else hardlinked, else copied,
+except those naming the seed path, the `bin` scripts and `pyvenv.cfg`, rewritten for the project.
+Hardlinked files are shared with the seed: `pip` replaces files rather than editing them, so it is
+safe, and the seed's files are read-only so editing a clone's `site-packages` in place fails instead
+of changing every other clone.
+"""
+
+import contextlib
+import errno
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import typing as t
+
+from . import (
+    file_links,
+    platform_info,
+    runner,
+    spans,
+)
+
+
+SEED_REQUIREMENTS: tuple[str, ...] = (
+    "pip-tools==7.4.1",
+    "build==1.2.2.post1",
+    "click==8.1.8",
+    "packaging==24.2",
+    "pyproject-hooks==1.2.0",
+    "setuptools==75.8.0",
+    "wheel==0.45.1",
+)
+"""Installed in seeds, pinned with their dependencies so a seed is what its key says, a change makes
+new seeds."""
+
+_IDENTITY_CODE = "import sys; print(sys.executable); print(sys.version)"
+
+
+class SeedError(RuntimeError):
+    """Seed venv error."""
+
+
+class Interpreter(t.NamedTuple):
+    """Real interpreter behind a `python` command, pyenv shims resolved."""
+
+    executable: str
+    version: str
+
+
+def seeds_dir() -> pathlib.Path:
+    """Seeds dir."""
+    return platform_info.xdg_state_dir / "seeds"
+
+
+def interpreter(cwd: pathlib.Path) -> Interpreter | None:
+    """Interpreter `python` runs in `cwd`, `None` if it does not tell."""
+    completed = runner.get().run(["python", "-c", _IDENTITY_CODE], cwd)
+    lines = completed.stdout.splitlines()
+    if completed.returncode != 0 or len(lines) < 2 or not pathlib.Path(lines[0]).is_absolute():  # noqa: PLR2004
+        return None
+    return Interpreter(lines[0], lines[1])
+
+
+def key(_interpreter: Interpreter, requirements: t.Sequence[str] = SEED_REQUIREMENTS) -> str:
+    """Seed key."""
+    return hashlib.sha256(json.dumps([*_interpreter, platform_info.os, *requirements]).encode()).hexdigest()[:16]
+
+
+def _run(cmd: list[pathlib.Path | str], cwd: pathlib.Path) -> None:
+    completed = runner.get().run(cmd, cwd)
+    if completed.returncode != 0:
+        raise SeedError(completed.stderr.strip())
+
+
+def _venv_bin(venv_dir: pathlib.Path) -> pathlib.Path:
+    return venv_dir / ("Scripts" if platform_info.os == "win32" else "bin")
+
+
+def _build(_interpreter: Interpreter, requirements: t.Sequence[str], venv_dir: pathlib.Path) -> None:
+    cwd = venv_dir.parent
+    without_pip = [] if requirements else ["--without-pip"]
+    _run([_interpreter.executable, "-m", "venv", *without_pip, venv_dir.name], cwd)
+    if requirements:
+        venv_python = _venv_bin(venv_dir) / ("python.exe" if platform_info.os == "win32" else "python")
+        _run([venv_python, "-m", "pip", "install", *requirements], cwd)
+    prefix = str(venv_dir).encode()
+    fixups = [
+        str(path.relative_to(venv_dir))
+        for path in [venv_dir / "pyvenv.cfg", *_venv_bin(venv_dir).iterdir()]
+        if path.is_file() and not path.is_symlink() and prefix in path.read_bytes()
+    ]
+    if platform_info.os != "win32":
+        # directories stay writable, `pip` replaces and removes files in clones
+        for dirpath, _, filenames in os.walk(venv_dir):
+            for name in filenames:
+                path = pathlib.Path(dirpath) / name
+                if not path.is_symlink():
+                    path.chmod(path.stat().st_mode & ~0o222)
+    (venv_dir.parent / "seed.json").write_text(json.dumps({"prefix": str(venv_dir), "fixups": fixups}))
+
+
+def ensure(_interpreter: Interpreter, requirements: t.Sequence[str] = SEED_REQUIREMENTS) -> pathlib.Path:
+    """Seed dir for the interpreter, built if missing."""
+    seed_dir = seeds_dir() / key(_interpreter, requirements)
+    if (seed_dir / "seed.json").is_file():
+        return seed_dir
+    seeds_dir().mkdir(parents=True, exist_ok=True)
+    tmp_dir = seeds_dir() / f"{seed_dir.name}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir()
+    try:
+        # clones fix up the build path, the seed itself is never run from its final place
+        with spans.span("step", "seed_venv_build"):
+            _build(_interpreter, requirements, tmp_dir / "venv")
+        try:
+            tmp_dir.rename(seed_dir)
+        except OSError as err:
+            # built concurrently by another process
+            if err.errno not in (errno.EEXIST, errno.ENOTEMPTY):
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return seed_dir
+
+
+def clone(seed_dir: pathlib.Path, venv_dir: pathlib.Path) -> None:
+    """Clone the seed venv into `venv_dir`."""
+    meta = json.loads((seed_dir / "seed.json").read_text())
+    seed_venv = seed_dir / "venv"
+    fixups = set(meta["fixups"])
+    prefix, target = meta["prefix"].encode(), str(venv_dir.absolute()).encode()
+    link = file_links.Linker()
+    with spans.span("step", "seed_venv_clone"):
+        for dirpath, dirnames, filenames in os.walk(seed_venv):
+            src_dir = pathlib.Path(dirpath)
+            dst_dir = venv_dir / src_dir.relative_to(seed_venv)
+            dst_dir.mkdir(exist_ok=True)
+            for name in [*dirnames, *filenames]:
+                src = src_dir / name
+                dst = dst_dir / name
+                if src.is_symlink():
+                    dst.symlink_to(src.readlink())
+                    with contextlib.suppress(ValueError):
+                        dirnames.remove(name)
+                elif name in filenames and str(src.relative_to(seed_venv)) in fixups:
+                    dst.write_bytes(src.read_bytes().replace(prefix, target))
+                    # the clone's own copy, writable
+                    dst.chmod(src.stat().st_mode | 0o200)
+                elif name in filenames:
+                    link(src, dst)
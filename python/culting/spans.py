@@ -0,0 +1,67 @@
+"""Spans.
+
+Timings written as debug records to the JSONL log, their fields under `span`. With `CULTING_SPANS_FILE`
+set, as `culting profile` does, they are also appended there, one JSON object per line.
+"""
+
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+import typing as t
+
+from . import logger
+
+
+try:
+    import resource
+except ImportError:  # win32
+    resource = None  # type: ignore[assignment]
+
+
+Category = t.Literal["command", "step", "subprocess", "network", "render"]
+
+command: str | None = None
+"""Culting command the spans belong to, set by the CLI."""
+
+_lock = threading.Lock()
+
+
+def _peak_rss_kb() -> tuple[int | None, int | None]:
+    """Peak RSS of culting and of its largest child so far, `RUSAGE_CHILDREN` does not sum them."""
+    if resource is None:
+        return None, None
+    # bytes on macOS, KiB elsewhere
+    scale = 1024 if sys.platform == "darwin" else 1
+    return (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale,
+    )
+
+
+def emit(fields: dict[str, t.Any]) -> None:
+    """Write a span."""
+    logger.debug(f"{fields['name']} {fields['duration']:.3f}s", extra={"span": fields})
+    spans_file = os.environ.get("CULTING_SPANS_FILE")
+    if spans_file:
+        with _lock, open(spans_file, "a") as file:  # noqa: PTH123
+            file.write(json.dumps(fields) + "\n")
+
+
+@contextlib.contextmanager
+def span(category: Category, name: str, **fields: t.Any) -> t.Iterator[dict[str, t.Any]]:  # noqa: ANN401
+    """Time the block, the yielded dict takes extra fields such as `exit_code`.
+
+    `start` is the epoch time the block started at, so concurrent spans can be told apart.
+    """
+    _fields: dict[str, t.Any] = {"command": command, "category": category, "name": name, **fields}
+    _fields["start"] = time.time()
+    start = time.perf_counter()
+    try:
+        yield _fields
+    finally:
+        _fields["duration"] = time.perf_counter() - start
+        _fields["peak_rss_kb"], _fields["largest_child_peak_rss_kb"] = _peak_rss_kb()
+        emit(_fields)
@@ -0,0 +1,181 @@
+"""Stats.
+
+Command and step latencies from the spans in the JSONL log. The log rotates, so durations are folded
+into per month log-bucketed histograms kept in a small index next to it: each log file is read once,
+from where the last run stopped, and months of history outlive the rotated files.
+"""
+
+import json
+import math
+import mmap
+import os
+import pathlib
+import typing as t
+
+from . import _atomic_write, platform_info
+
+
+BUCKET_GROWTH = 1.05
+"""Histogram buckets are 5% wide, percentiles are that precise."""
+PERCENTILES = (50, 95, 99)
+TOTAL = "(total)"
+INDEX_VERSION = 1
+
+_SPAN_MARKER = b'"span": {'
+
+
+class Row(t.NamedTuple):
+    """Latency percentiles of a command or one of its steps, in seconds."""
+
+    command: str
+    step: str
+    samples: int
+    percentiles: tuple[float, ...]
+
+
+def index_path() -> pathlib.Path:
+    """Summary index path."""
+    return platform_info.xdg_state_dir / "stats.json"
+
+
+def log_paths() -> list[pathlib.Path]:
+    """Return the current and rotated log files, oldest first."""
+    logfile_path = platform_info.logfile_path
+    rotated = sorted(
+        logfile_path.parent.glob(f"{logfile_path.name}.*"),
+        key=lambda path: int(path.suffix[1:]) if path.suffix[1:].isdigit() else 0,
+        reverse=True,
+    )
+    return [*rotated, logfile_path]
+
+
+def _bucket(duration: float) -> int:
+    return math.ceil(math.log(max(duration, 1e-6)) / math.log(BUCKET_GROWTH))
+
+
+def _duration(bucket: int) -> float:
+    return BUCKET_GROWTH**bucket
+
+
+def _key(record: dict[str, t.Any]) -> str | None:
+    span = record.get("span")
+    if not isinstance(span, dict) or not span.get("command") or span.get("category") not in {"command", "step"}:
+        return None
+    step = TOTAL if span["category"] == "command" else span["name"]
+    return "\t".join((str(record.get("created", ""))[:7], span["command"], step))
+
+
+def _scan(path: pathlib.Path, offset: int, histograms: dict[str, dict[str, int]]) -> int:
+    """Fold the spans of the complete lines after `offset` into `histograms`, return the new offset."""
+    with path.open("rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size <= offset:
+            return size
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            end = data.rfind(b"\n", offset) + 1
+            while offset < end:
+                line_end = data.find(b"\n", offset, end) + 1
+                line = data[offset:line_end]
+                offset = line_end
+                if _SPAN_MARKER not in line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                key = _key(record)
+                if key is not None:
+                    histogram = histograms.setdefault(key, {})
+                    bucket = str(_bucket(record["span"]["duration"]))
+                    histogram[bucket] = histogram.get(bucket, 0) + 1
+            return end
+
+
+def _read_index() -> dict[str, t.Any]:
+    try:
+        index = json.loads(index_path().read_text())
+    except (FileNotFoundError, ValueError):
+        return {"version": INDEX_VERSION, "files": {}, "histograms": {}}
+    if index.get("version") != INDEX_VERSION:
+        return {"version": INDEX_VERSION, "files": {}, "histograms": {}}
+    return t.cast(dict[str, t.Any], index)
+
+
+def update() -> dict[str, dict[str, int]]:
+    """Scan what the log files got since the last update, return the histograms."""
+    index = _read_index()
+    files: dict[str, int] = {}
+    for path in log_paths():
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        # rotation renames, so a log file is the same file as long as its inode is
+        file_id = f"{stat.st_dev}:{stat.st_ino}"
+        offset = index["files"].get(file_id, 0)
+        files[file_id] = _scan(path, 0 if offset > stat.st_size else offset, index["histograms"])
+    if files != index["files"]:
+        index["files"] = files
+        index_path().parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(index_path(), json.dumps(index))
+    return t.cast(dict[str, dict[str, int]], index["histograms"])
+
+
+def _percentiles(histogram: dict[int, int], samples: int) -> tuple[float, ...]:
+    buckets = sorted(histogram.items())
+    percentiles = []
+    for percentile in PERCENTILES:
+        rank, seen = math.ceil(samples * percentile / 100), 0
+        for bucket, bucket_count in buckets:
+            seen += bucket_count
+            if seen >= rank:
+                percentiles.append(_duration(bucket))
+                break
+    return tuple(percentiles)
+
+
+def _row_order(item: tuple[tuple[str, str], t.Any]) -> tuple[str, bool, str]:
+    (command, step), _ = item
+    return command, step != TOTAL, step
+
+
+def rows(
+    histograms: dict[str, dict[str, int]],
+    command: str | None = None,
+    since: str | None = None,
+) -> list[Row]:
+    """Percentiles by command and step, months from `since` (`YYYY-MM`) on, commands totals first."""
+    merged: dict[tuple[str, str], dict[int, int]] = {}
+    for key, histogram in histograms.items():
+        month, _command, step = key.split("\t")
+        if (command is not None and _command != command) or (since is not None and month < since):
+            continue
+        _merged = merged.setdefault((_command, step), {})
+        for bucket, count in histogram.items():
+            _merged[int(bucket)] = _merged.get(int(bucket), 0) + count
+    _rows = []
+    for (_command, step), merged_histogram in sorted(merged.items(), key=_row_order):
+        samples = sum(merged_histogram.values())
+        _rows.append(Row(_command, step, samples, _percentiles(merged_histogram, samples)))
+    return _rows
+
+
+def render(_rows: list[Row]) -> str:
+    """Table, rich markup."""
+    if not _rows:
+        return "No timings logged yet."
+    header = ("command", "step", "n", *(f"p{percentile}" for percentile in PERCENTILES))
+    table = [
+        (row.command, row.step, str(row.samples), *(f"{duration:.3f}s" for duration in row.percentiles))
+        for row in _rows
+    ]
+    widths = [max(len(cells[column]) for cells in [header, *table]) for column in range(len(header))]
+    lines = [
+        "  ".join([
+            *(f"{cell:<{width}}" for cell, width in zip(cells[:2], widths[:2], strict=True)),
+            *(f"{cell:>{width}}" for cell, width in zip(cells[2:], widths[2:], strict=True)),
+        ])
+        for cells in [header, *table]
+    ]
+    lines[0] = f"[bold]{lines[0]}[/bold]"
+    return "\n".join(lines)
@@ -0,0 +1,63 @@
+"""Task graph."""
+
+import concurrent.futures
+import time
+import typing as t
+
+from . import spans
+
+
+class TaskGraph:
+    """Tasks run as soon as the tasks they come after are done, independent ones concurrently."""
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        """Init."""
+        self.max_workers = max_workers
+        self.tasks: dict[str, tuple[t.Callable[[], None], tuple[str, ...]]] = {}
+        self.timings: dict[str, float] = {}
+
+    def add(self, name: str, func: t.Callable[[], None], after: t.Iterable[str] = ()) -> None:
+        """Add task, `after` tasks must be already added."""
+        after = tuple(after)
+        unknown = [task for task in after if task not in self.tasks]
+        if unknown or name in self.tasks:
+            err_msg = f"Task '{name}' cannot be added after {unknown or after}."
+            raise ValueError(err_msg)
+        self.tasks[name] = (func, after)
+
+    def _timed(self, name: str, func: t.Callable[[], None]) -> None:
+        start = time.perf_counter()
+        try:
+            with spans.span("step", name):
+                func()
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+    def run(self) -> None:
+        """Run all tasks.
+
+        On the first failure no more tasks are started, the running ones are awaited and the error re-raised.
+        """
+        done: set[str] = set()
+        running: dict[concurrent.futures.Future[None], str] = {}
+        pending = dict(self.tasks)
+        error: BaseException | None = None
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                if error is None:
+                    for name, (func, after) in list(pending.items()):
+                        if done.issuperset(after):
+                            del pending[name]
+                            running[executor.submit(self._timed, name, func)] = name
+                if not running:
+                    break
+                finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    _error = future.exception()
+                    if _error is None:
+                        done.add(name)
+                    elif error is None:
+                        error = _error
+        if error is not None:
+            raise error
@@ -0,0 +1,131 @@
+"""Template cache."""
+
+import email.message
+import http.client
+import importlib.resources
+import json
+import pathlib
+import time
+import typing as t
+import urllib.error
+import urllib.request
+
+from . import (
+    _atomic_write,
+    config,
+    logger,
+    platform_info,
+    spans,
+)
+
+
+TEMPLATES_TTL = 7 * 86_400
+TIMEOUT = 10
+
+
+class _Meta(t.TypedDict, total=False):
+
+    url: str
+    etag: str
+    last_modified: str
+    checked: float
+
+
+def templates_dir() -> pathlib.Path:
+    """Return the cached templates path."""
+    return platform_info.xdg_state_dir / "templates"
+
+
+def bundled(name: str) -> str:
+    """Template shipped with culting."""
+    return (importlib.resources.files(__package__) / "templates" / name).read_text()
+
+
+def _read_meta(meta_path: pathlib.Path, url: str) -> _Meta:
+    try:
+        with meta_path.open("r") as file:
+            meta = t.cast(_Meta, json.load(file))
+    except (OSError, ValueError):
+        return {}
+    return meta if meta.get("url") == url else {}
+
+
+def _request(url: str, meta: _Meta) -> urllib.request.Request:
+    """Request, conditional on the validators of the cached copy, if any."""
+    request = urllib.request.Request(url)  # noqa: S310
+    if "etag" in meta:
+        request.add_header("If-None-Match", meta["etag"])
+    if "last_modified" in meta:
+        request.add_header("If-Modified-Since", meta["last_modified"])
+    return request
+
+
+def _download(request: urllib.request.Request, timeout: float) -> tuple[str | None, email.message.Message] | None:
+    """Response text, `None` if not modified, and headers, or `None` if the URL cannot be reached."""
+    url = request.full_url
+    try:
+        with spans.span("network", url), urllib.request.urlopen(request, timeout=timeout) as response:  # noqa: S310
+            return response.read().decode(), response.headers
+    except urllib.error.HTTPError as err:
+        if err.code == 304:  # noqa: PLR2004
+            return None, err.headers
+        logger.debug(f"{url} {err.code}, falling back")
+    except (OSError, ValueError, http.client.HTTPException) as err:
+        logger.debug(f"{url} unreachable, falling back: {err}")
+    return None
+
+
+def _meta(url: str, headers: email.message.Message) -> _Meta:
+    meta: _Meta = {"url": url, "checked": time.time()}
+    if headers.get("ETag"):
+        meta["etag"] = headers["ETag"]
+    if headers.get("Last-Modified"):
+        meta["last_modified"] = headers["Last-Modified"]
+    return meta
+
+
+def _store(cache_path: pathlib.Path, meta_path: pathlib.Path, text: str, meta: _Meta) -> None:
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(cache_path, text)
+        # the meta last, it is what marks the cached copy valid
+        _atomic_write(meta_path, json.dumps(meta))
+    except OSError:
+        logger.debug(f"Cannot write {cache_path}")
+
+
+def fetch(
+    url: str,
+    name: str,
+    *,
+    root: pathlib.Path | None = None,
+    ttl: float = TEMPLATES_TTL,
+    timeout: float = TIMEOUT,
+) -> str:
+    """Return template text.
+
+    A cached copy checked within `ttl` seconds is used as is, an older one is revalidated with
+    ETag/Last-Modified. Offline, or when `url` cannot be reached, the cached copy is used, if any,
+    otherwise the bundled one. Offline mode is that of the project in `root`, by default the current
+    one.
+    """
+    offline = config.offline((root or pathlib.Path()) / "pyproject.toml")
+    cache_path = templates_dir() / name
+    meta_path = cache_path.with_name(f"{name}.json")
+    meta = _read_meta(meta_path, url)
+    cached = cache_path.read_text() if meta and cache_path.is_file() else None
+    if cached is not None and (offline or time.time() - meta.get("checked", 0) < ttl):
+        return cached
+    if offline:
+        return bundled(name)
+    downloaded = _download(_request(url, meta if cached is not None else {}), timeout)
+    if downloaded is None:
+        return cached if cached is not None else bundled(name)
+    text, headers = downloaded
+    if text is None:
+        # not modified
+        if cached is None:
+            return bundled(name)
+        text = cached
+    _store(cache_path, meta_path, text, _meta(url, headers))
+    return text
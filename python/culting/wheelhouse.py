@@ -0,0 +1,276 @@
+"""Wheelhouse.
+
+Wheels a sync installs, downloaded ahead of `pip`, `PREFETCH_JOBS` at a time, into a wheelhouse in
+the XDG state dir shared by all projects, and checked against the lock's hashes and the index's.
+`pip` then installs them with `--no-index --find-links`, without index round trips of its own.
+
+The index is the one `pip config list` gives, else PyPI, read as a PEP 503 simple index. Indexes
+needing credentials, or `pip` options the prefetch does not follow, such as extra indexes, leave
+everything to `pip`. So do pins without a wheel for the venv's interpreter, that the index does not
+serve, or that neither the lock nor the index gives a sha256 hash of.
+"""
+
+import ast
+import concurrent.futures
+import hashlib
+import html.parser
+import http.client
+import json
+import netrc
+import os
+import pathlib
+import ssl
+import threading
+import typing as t
+import urllib.parse
+import urllib.request
+
+from . import (
+    _atomic_write,
+    distributions,
+    logger,
+    platform_info,
+    requirements,
+    runner,
+    spans,
+)
+
+
+PREFETCH_JOBS = 8
+TIMEOUT = 30
+DEFAULT_INDEX_URL = "https://pypi.org/simple"
+
+_TAGS_CODE = "from pip._vendor.packaging import tags; print(*tags.sys_tags())"
+_CHUNK_SIZE = 1024 * 1024
+# `pip install` reads these sections, the later ones winning
+_PIP_CONFIG_SECTIONS = ("global", "install", ":env:")
+_UNFOLLOWED_OPTIONS = frozenset({"extra-index-url", "find-links", "no-index", "client-cert", "trusted-host", "proxy"})
+
+
+class WheelhouseError(RuntimeError):
+    """Wheelhouse error."""
+
+
+class Index(t.NamedTuple):
+    """Simple index wheels are prefetched from."""
+
+    url: str
+    cert: str | None = None
+    """CA bundle, `pip`'s `cert` option, the default ones if `None`."""
+
+
+def wheelhouse_dir() -> pathlib.Path:
+    """Return the wheelhouse dir."""
+    return platform_info.xdg_state_dir / "wheelhouse"
+
+
+def _has_login(host: str | None) -> bool:
+    try:
+        return host is not None and netrc.netrc(os.environ.get("NETRC")).authenticators(host) is not None
+    except (OSError, netrc.NetrcParseError):
+        return False
+
+
+def pip_index(venv_python: pathlib.Path, root: pathlib.Path) -> Index | None:
+    """Return the index the venv's `pip` installs from, `None` if the prefetch leaves it to `pip`."""
+    completed = runner.get().run([venv_python, "-m", "pip", "config", "list"], root)
+    if completed.returncode != 0:
+        return None
+    sections: dict[str, dict[str, str]] = {}
+    for line in completed.stdout.splitlines():
+        key, _, value = line.partition("=")
+        section, _, option = key.rpartition(".")
+        try:
+            sections.setdefault(section, {})[option] = str(ast.literal_eval(value))
+        except (ValueError, SyntaxError):
+            continue
+    options = {
+        option: value for section in _PIP_CONFIG_SECTIONS for option, value in sections.get(section, {}).items()
+    }
+    unfollowed = sorted(_UNFOLLOWED_OPTIONS & options.keys())
+    if unfollowed:
+        logger.debug(f"wheel prefetch left to pip, configured with {', '.join(unfollowed)}")
+        return None
+    url = options.get("index-url", DEFAULT_INDEX_URL).rstrip("/")
+    split_url = urllib.parse.urlsplit(url)
+    if split_url.scheme not in ("http", "https") or "@" in split_url.netloc or _has_login(split_url.hostname):
+        logger.debug("wheel prefetch left to pip, the index is not plain HTTP or needs credentials")
+        return None
+    return Index(url, options.get("cert"))
+
+
+def supported_tags(venv_dir: pathlib.Path, venv_python: pathlib.Path) -> list[str] | None:
+    """Wheel tags the venv's interpreter supports, best first, `None` if it does not tell."""
+    cache_path = wheelhouse_dir() / "tags" / f"{distributions.interpreter_key(venv_dir)}.json"
+    try:
+        return t.cast(list[str], json.loads(cache_path.read_text()))
+    except (FileNotFoundError, ValueError):
+        pass
+    completed = runner.get().run([venv_python, "-c", _TAGS_CODE], venv_dir.parent)
+    tags = completed.stdout.split()
+    if completed.returncode != 0 or not tags or any(tag.count("-") != 2 for tag in tags):  # noqa: PLR2004
+        return None
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(cache_path, json.dumps(tags))
+    except OSError:
+        logger.debug(f"Cannot write {cache_path}")
+    return tags
+
+
+def _rank(filename: str, pin: requirements.Pin, ranks: dict[str, int]) -> int | None:
+    """Rank of the wheel's best tag, `None` if it is not a wheel of the pin for the interpreter."""
+    parts = filename.removesuffix(".whl").split("-")
+    try:
+        name, version = distributions.wheel_name(filename)
+    except ValueError:
+        return None
+    if not filename.endswith(".whl") or (name, version) != (pin.name, pin.version):
+        return None
+    pythons, abis, platforms = (part.split(".") for part in parts[-3:])
+    return min(
+        (
+            ranks[tag]
+            for tag in (f"{python}-{abi}-{platform}" for python in pythons for abi in abis for platform in platforms)
+            if tag in ranks
+        ),
+        default=None,
+    )
+
+
+def _best(filenames: t.Iterable[str], pin: requirements.Pin, ranks: dict[str, int]) -> str | None:
+    ranked = [(rank, filename) for filename in filenames if (rank := _rank(filename, pin, ranks)) is not None]
+    return min(ranked)[1] if ranked else None
+
+
+def _locked(pin: requirements.Pin) -> set[str]:
+    return {_hash.removeprefix("sha256:") for _hash in pin.hashes if _hash.startswith("sha256:")}
+
+
+def _verify(filename: str, digest: str, pin: requirements.Pin, index_digest: str | None) -> bool:
+    """Whether the sha256 matches the lock's hashes, if any, and the index's, if any."""
+    locked = _locked(pin)
+    if (locked and digest not in locked) or (index_digest is not None and digest != index_digest):
+        logger.debug(f"{filename} sha256 {digest} does not match")
+        return False
+    return True
+
+
+def _sha256(path: pathlib.Path) -> str:
+    with path.open("rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+class _Links(html.parser.HTMLParser):
+    """`href` of a simple index page's anchors."""
+
+    def __init__(self) -> None:
+        """Init."""
+        super().__init__()
+        self.hrefs: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        """Collect anchors' `href`."""
+        href = dict(attrs).get("href")
+        if tag == "a" and href:
+            self.hrefs.append(href)
+
+
+def _redacted(url: str) -> str:
+    """Return the URL without credentials, fit for logs."""
+    split_url = urllib.parse.urlsplit(url)
+    return split_url._replace(netloc=split_url.netloc.rpartition("@")[2]).geturl()
+
+
+def _download(
+    pin: requirements.Pin,
+    ranks: dict[str, int],
+    index: Index,
+    context: ssl.SSLContext,
+    timeout: float,
+) -> pathlib.Path | None:
+    page_url = f"{index.url}/{pin.name}/"
+    with (
+        spans.span("network", _redacted(page_url)),
+        urllib.request.urlopen(page_url, timeout=timeout, context=context) as response,  # noqa: S310
+    ):
+        links = _Links()
+        links.feed(response.read().decode())
+    urls = {}
+    for href in links.hrefs:
+        url, _, fragment = urllib.parse.urljoin(page_url, href).partition("#")
+        urls[pathlib.PurePosixPath(urllib.parse.unquote(urllib.parse.urlsplit(url).path)).name] = (url, fragment)
+    filename = _best(urls, pin, ranks)
+    if filename is None:
+        return None
+    url, fragment = urls[filename]
+    index_digest = fragment.removeprefix("sha256=") if fragment.startswith("sha256=") else None
+    if index_digest is None and not _locked(pin):
+        logger.debug(f"{filename} has no sha256 to check, left to pip")
+        return None
+    path = wheelhouse_dir() / filename
+    tmp_path = wheelhouse_dir() / f".{filename}.tmp-{os.getpid()}-{threading.get_ident()}"
+    _hash = hashlib.sha256()
+    try:
+        with (
+            spans.span("network", _redacted(url)),
+            urllib.request.urlopen(url, timeout=timeout, context=context) as response,  # noqa: S310
+            tmp_path.open("wb") as file,
+        ):
+            while chunk := response.read(_CHUNK_SIZE):
+                _hash.update(chunk)
+                file.write(chunk)
+        if not _verify(filename, _hash.hexdigest(), pin, index_digest):
+            err_msg = f"Hash mismatch for {filename} from {_redacted(url)}."
+            raise WheelhouseError(err_msg)
+        tmp_path.replace(path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return path
+
+
+def prefetch(  # noqa: PLR0913
+    pins: t.Sequence[requirements.Pin],
+    tags: t.Sequence[str],
+    index: Index,
+    *,
+    offline: bool = False,
+    jobs: int = PREFETCH_JOBS,
+    timeout: float = TIMEOUT,
+) -> dict[str, pathlib.Path]:
+    """Return the wheels of the pins in the wheelhouse, by name, downloading the missing ones unless offline.
+
+    Raise `WheelhouseError` if a download does not match its hashes.
+    """
+    wheelhouse_dir().mkdir(parents=True, exist_ok=True)
+    ranks = {tag: rank for rank, tag in enumerate(tags)}
+    local = [path.name for path in wheelhouse_dir().glob("*.whl")]
+    wheels = {}
+    missing = []
+    for pin in pins:
+        filename = _best(local, pin, ranks)
+        path = wheelhouse_dir() / filename if filename is not None else None
+        # the index's hash was checked on download, the lock's may have changed since
+        if path is not None and _verify(path.name, _sha256(path), pin, None):
+            wheels[pin.name] = path
+        else:
+            missing.append(pin)
+    if offline or not missing:
+        return wheels
+    try:
+        context = ssl.create_default_context(cafile=index.cert)
+    except OSError as err:
+        logger.debug(f"wheel prefetch left to pip, cannot load {index.cert}: {err}")
+        return wheels
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(jobs, len(missing))) as executor:
+        futures = {executor.submit(_download, pin, ranks, index, context, timeout): pin for pin in missing}
+        for future in concurrent.futures.as_completed(futures):
+            pin = futures[future]
+            try:
+                path = future.result()
+            except (OSError, ValueError, http.client.HTTPException) as err:
+                logger.debug(f"{pin.name}=={pin.version} not prefetched, left to pip: {err}")
+                continue
+            if path is not None:
+                wheels[pin.name] = path
+    return wheels
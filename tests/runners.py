@@ -0,0 +1,193 @@
+"""Runners for tests and benchmarks: a fake toolchain, a recording or a replay of one."""
+
+import collections
+import json
+import os
+import pathlib
+import shutil
+import subprocess
+import threading
+import time
+import typing as t
+
+from culting.runner import (
+    Cmd,
+    Runner,
+)
+
+
+Handler = t.Callable[[list[str], pathlib.Path], subprocess.CompletedProcess[str]]
+
+
+class RunnerError(RuntimeError):
+    """Runner error."""
+
+
+class _LinesRunner(Runner):
+    """Streams by running to completion first, for runners that do not really run anything."""
+
+    def stream(
+        self,
+        cmd: Cmd,
+        on_stdout: t.Callable[[str], None],
+        on_stderr: t.Callable[[str], None],
+        cwd: pathlib.Path | None = None,
+    ) -> int:
+        """Run `cmd`, then hand its output lines to the callbacks."""
+        completed = self.run(cmd, cwd)
+        for line in completed.stdout.splitlines(keepends=True):
+            on_stdout(line)
+        for line in completed.stderr.splitlines(keepends=True):
+            on_stderr(line)
+        return completed.returncode
+
+
+class RecordingRunner(_LinesRunner):
+    """Runs commands through `runner`, recording them for `ReplayRunner`."""
+
+    def __init__(self, runner: Runner | None = None) -> None:
+        """Init."""
+        self.runner = runner or Runner()
+        self.records: list[dict[str, t.Any]] = []
+        self._lock = threading.Lock()
+
+    def which(self, cmd: str | pathlib.Path) -> str | None:
+        """Return the executable path."""
+        return self.runner.which(cmd)
+
+    def run(self, cmd: Cmd, cwd: pathlib.Path | None = None) -> subprocess.CompletedProcess[str]:
+        """Run and record."""
+        start = time.perf_counter()
+        completed = self.runner.run(cmd, cwd)
+        record = {
+            "cmd": _normalize(cmd, cwd),
+            "returncode": completed.returncode,
+            "stdout": completed.stdout,
+            "stderr": completed.stderr,
+            "duration": time.perf_counter() - start,
+        }
+        with self._lock:
+            self.records.append(record)
+        return completed
+
+    def save(self, path: pathlib.Path | str) -> None:
+        """Write the records as JSONL."""
+        with pathlib.Path(path).open("w") as file:
+            file.writelines(json.dumps(record) + "\n" for record in self.records)
+
+
+def _normalize(cmd: Cmd, cwd: pathlib.Path | None) -> list[str]:
+    """Return `cmd` with the executable by name and the working directory as `{cwd}`, to match across machines."""
+    _cwd = str((cwd or pathlib.Path()).absolute())
+    return [pathlib.Path(cmd[0]).name, *(str(arg).replace(_cwd, "{cwd}") for arg in cmd[1:])]
+
+
+def _completed(
+    args: list[str],
+    returncode: int = 0,
+    stdout: str = "",
+    stderr: str = "",
+) -> subprocess.CompletedProcess[str]:
+    return subprocess.CompletedProcess(args, returncode, stdout, stderr)
+
+
+def _fake_pyenv(args: list[str], cwd: pathlib.Path) -> subprocess.CompletedProcess[str]:
+    if args[:1] == ["local"]:
+        (cwd / ".python-version").write_text(f"{args[1]}\n")
+    return _completed(args)
+
+
+def _fake_git(args: list[str], _cwd: pathlib.Path) -> subprocess.CompletedProcess[str]:
+    identity = {"user.name": "Fake", "user.email": "fake@example.com"}
+    if args[:1] == ["config"] and args[-1] in identity:
+        return _completed(args, stdout=f"{identity[args[-1]]}\n")
+    return _completed(args)
+
+
+def _fake_python(args: list[str], cwd: pathlib.Path) -> subprocess.CompletedProcess[str]:
+    if args[:2] == ["-m", "venv"]:
+        venv_bin = cwd / args[2] / ("Scripts" if os.name == "nt" else "bin")
+        venv_bin.mkdir(parents=True, exist_ok=True)
+        venv_python = venv_bin / ("python.exe" if os.name == "nt" else "python")
+        venv_python.write_text("#!/bin/sh\n")
+        venv_python.chmod(0o755)
+        (cwd / args[2] / "pyvenv.cfg").write_text("version = 3.13.0\n")
+    elif args[:3] == ["-m", "piptools", "compile"]:
+        output = args[args.index("-o") + 1]
+        requirements_in = next(arg for arg in args[4:] if arg.endswith(".in"))
+        lines = (cwd / requirements_in).read_text().splitlines()
+        (cwd / output).write_text("".join(f"{line.strip()}==0.0.0\n" for line in lines if line.strip()))
+    return _completed(args)
+
+
+FAKE_TOOLCHAIN: dict[str, Handler] = {
+    "pyenv": _fake_pyenv,
+    "git": _fake_git,
+    "python": _fake_python,
+}
+
+
+class FakeRunner(_LinesRunner):
+    """Fake toolchain, every command takes `latency` seconds.
+
+    `handlers` by executable name, on top of `FAKE_TOOLCHAIN`, get the arguments and the working
+    directory, and do the command file side effects.
+    """
+
+    def __init__(self, handlers: dict[str, Handler] | None = None, latency: float = 0.0) -> None:
+        """Init."""
+        self.handlers = {**FAKE_TOOLCHAIN, **(handlers or {})}
+        self.latency = latency
+
+    def which(self, cmd: str | pathlib.Path) -> str | None:
+        """Fake executables live nowhere, files like a `.venv` python have to be there."""
+        if pathlib.Path(cmd).name in self.handlers and not pathlib.Path(cmd).is_absolute():
+            return str(pathlib.Path("/fake/bin") / cmd)
+        return shutil.which(cmd)
+
+    def run(self, cmd: Cmd, cwd: pathlib.Path | None = None) -> subprocess.CompletedProcess[str]:
+        """Fake run."""
+        name = pathlib.Path(cmd[0]).name.removesuffix(".exe")
+        if name not in self.handlers:
+            err_msg = f"No fake for '{name}'"
+            raise RunnerError(err_msg)
+        completed = self.handlers[name]([str(arg) for arg in cmd[1:]], (cwd or pathlib.Path()).absolute())
+        time.sleep(self.latency)
+        return completed
+
+
+class ReplayRunner(FakeRunner):
+    """Replays a `RecordingRunner` recording, fake toolchain handlers still do the file side effects.
+
+    Commands take their recorded time, or `latency` seconds if given.
+    """
+
+    def __init__(
+        self,
+        path: pathlib.Path | str,
+        handlers: dict[str, Handler] | None = None,
+        latency: float | None = None,
+    ) -> None:
+        """Init."""
+        super().__init__(handlers, latency or 0.0)
+        self.replay_latency = latency
+        self.records: dict[str, collections.deque[dict[str, t.Any]]] = collections.defaultdict(collections.deque)
+        with pathlib.Path(path).open("r") as file:
+            for line in file:
+                record = json.loads(line)
+                self.records[json.dumps(record["cmd"])].append(record)
+        self._lock = threading.Lock()
+
+    def run(self, cmd: Cmd, cwd: pathlib.Path | None = None) -> subprocess.CompletedProcess[str]:
+        """Replay the next recorded run of `cmd`."""
+        key = json.dumps(_normalize(cmd, cwd))
+        with self._lock:
+            if not self.records[key]:
+                err_msg = f"No recorded run left for {key}"
+                raise RunnerError(err_msg)
+            record = self.records[key].popleft()
+        name = pathlib.Path(cmd[0]).name.removesuffix(".exe")
+        if name in self.handlers:
+            self.handlers[name]([str(arg) for arg in cmd[1:]], (cwd or pathlib.Path()).absolute())
+        time.sleep(record["duration"] if self.replay_latency is None else self.replay_latency)
+        return _completed([str(arg) for arg in cmd], record["returncode"], record["stdout"], record["stderr"])
@@ -0,0 +1,62 @@
+"""Local PEP 503 simple index for tests, serving files from a directory."""
+
+import contextlib
+import functools
+import hashlib
+import http.server
+import pathlib
+import threading
+import typing as t
+
+from culting import wheelhouse
+
+
+class SimpleIndex(http.server.ThreadingHTTPServer):
+    """Simple index server, recording the paths it was asked for."""
+
+    requests: list[str]
+    index: wheelhouse.Index
+
+
+class _Handler(http.server.SimpleHTTPRequestHandler):
+    server: SimpleIndex
+
+    def do_GET(self) -> None:
+        self.server.requests.append(self.path)
+        super().do_GET()
+
+    def log_message(self, *args: t.Any) -> None:
+        pass
+
+
+def publish(root: pathlib.Path, name: str, files: dict[str, bytes], *, hashes: bool = True) -> dict[str, str]:
+    """Serve the files under `/files/` and a simple index page of them, return their sha256.
+
+    The page links carry the sha256 as a `#sha256=` fragment unless `hashes` is false.
+    """
+    (root / "files").mkdir(exist_ok=True)
+    (root / "simple" / name).mkdir(parents=True)
+    digests = {}
+    anchors = []
+    for filename, content in files.items():
+        (root / "files" / filename).write_bytes(content)
+        digests[filename] = hashlib.sha256(content).hexdigest()
+        fragment = f"#sha256={digests[filename]}" if hashes else ""
+        anchors.append(f'<a href="../../files/{filename}{fragment}">{filename}</a>')
+    (root / "simple" / name / "index.html").write_text("<html><body>" + "<br>".join(anchors) + "</body></html>")
+    return digests
+
+
+@contextlib.contextmanager
+def serve(root: pathlib.Path) -> t.Iterator[SimpleIndex]:
+    """Serve `root`, its simple index under `/simple/`."""
+    server = SimpleIndex(("127.0.0.1", 0), functools.partial(_Handler, directory=str(root)))
+    server.requests = []
+    server.index = wheelhouse.Index(f"http://127.0.0.1:{server.server_address[1]}/simple")
+    thread = threading.Thread(target=functools.partial(server.serve_forever, poll_interval=0.01), daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,46 @@
+"""Test config."""
+
+import pathlib
+
+import pytest
+
+from culting import config
+
+
+@pytest.fixture
+def pyproject_path(tmp_path: pathlib.Path) -> pathlib.Path:
+    """`pyproject.toml` with a `[tool.culting]` table."""
+    path = tmp_path / "pyproject.toml"
+    path.write_text('[project]\nname = "demo"  # kept\n\n[tool.culting]\noffline = true\n')
+    return path
+
+
+def test_cached_until_changed(pyproject_path: pathlib.Path) -> None:
+    """Test the config is parsed once, then again once the file changed."""
+    assert config.load(pyproject_path) is config.load(pyproject_path)
+    assert config.load(pyproject_path).offline
+    pyproject_path.write_text("[tool.culting]\npip-upgrade-ttl = 60\n")
+    assert config.load(pyproject_path).pip_upgrade_ttl == 60
+    assert not config.load(pyproject_path).offline
+
+
+def test_defaults(tmp_path: pathlib.Path) -> None:
+    """Test a missing file or table means defaults."""
+    assert config.load(tmp_path / "pyproject.toml") == config.CultingConfig()
+    (tmp_path / "pyproject.toml").write_text('[project]\nname = "demo"\n')
+    assert config.load(tmp_path / "pyproject.toml") == config.CultingConfig()
+
+
+@pytest.mark.parametrize("table", ["pip-upgrade-ttl = -1", 'offline = "maybe"', "pip_upgrade_tll = 1"])
+def test_invalid(pyproject_path: pathlib.Path, table: str) -> None:
+    """Test invalid values and unknown keys are reported."""
+    pyproject_path.write_text(f"[tool.culting]\n{table}\n")
+    with pytest.raises(config.ConfigError, match=r"\[tool.culting\]"):
+        config.load(pyproject_path)
+
+
+def test_malformed(pyproject_path: pathlib.Path) -> None:
+    """Test a `pyproject.toml` that is not TOML is reported."""
+    pyproject_path.write_text("[tool.culting\n")
+    with pytest.raises(config.ConfigError, match="Invalid"):
+        config.load(pyproject_path)
@@ -0,0 +1,96 @@
+"""Test daemon."""
+
+import collections.abc
+import contextlib
+import os
+import pathlib
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from culting import daemon
+
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="Unix only")
+
+
+@pytest.fixture
+def server(
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> collections.abc.Iterator[subprocess.Popen[bytes]]:
+    """Daemon with a 5s idle timeout."""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("CULTING_DAEMON", "1")
+    with _serve("") as proc:
+        yield proc
+
+
+@contextlib.contextmanager
+def _serve(setup: str) -> collections.abc.Iterator[subprocess.Popen[bytes]]:
+    """Run a daemon with a 5s idle timeout, after `setup` code, until the caller is done with it."""
+    proc = subprocess.Popen([sys.executable, "-c", f"from culting import daemon; {setup}daemon.serve(idle_timeout=5)"])
+    for _ in range(100):
+        if daemon.status() is not None:
+            break
+        time.sleep(0.05)
+    try:
+        yield proc
+    finally:
+        daemon.stop()
+        proc.wait(timeout=5)
+
+
+def test_forward(server: subprocess.Popen[bytes], capfd: pytest.CaptureFixture[str]) -> None:
+    """Test invocations run in the daemon, output and exit code included."""
+    status = daemon.status()
+    assert status is not None
+    assert status["pid"] == server.pid
+    assert daemon.forward(["daemon"]) == 0
+    assert f"pid {server.pid}" in capfd.readouterr().out
+    assert daemon.forward(["nope"]) == 2
+    assert "No such command" in capfd.readouterr().out
+
+
+def test_crash(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch, capfd: pytest.CaptureFixture[str]) -> None:
+    """Test a command crashing in the daemon prints its traceback, as a direct run does."""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("CULTING_DAEMON", "1")
+    with _serve("daemon.status = lambda: 1 / 0; "):
+        assert daemon.forward(["daemon"]) == 1
+        err = capfd.readouterr().err
+        assert "Traceback" in err
+        assert "ZeroDivisionError" in err
+
+
+def test_bad_request(server: subprocess.Popen[bytes]) -> None:
+    """Test garbage and clients hanging up do not stop the daemon."""
+    for message in (b"garbage\n", b"[]\n", b""):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(str(daemon.socket_path()))
+            client.sendall(message)
+    status = daemon.status()
+    assert status is not None
+    assert status["pid"] == server.pid
+
+
+def test_stop(server: subprocess.Popen[bytes]) -> None:
+    """Test stopping removes the socket."""
+    assert daemon.stop()
+    server.wait(timeout=5)
+    assert not daemon.socket_path().exists()
+    assert daemon.status() is None
+
+
+def test_idle_timeout(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the daemon exits once idle."""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    subprocess.run(
+        [sys.executable, "-c", "from culting import daemon; daemon.serve(idle_timeout=0.2)"],
+        check=True,
+        timeout=30,
+    )
+    assert not daemon.socket_path().exists()
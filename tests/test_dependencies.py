@@ -0,0 +1,197 @@
+"""Test dependencies."""
+
+import pathlib
+import re
+import shutil
+
+import pytest
+
+from culting import wheelhouse
+from culting.click_commands import (
+    CommandError,
+    Dependencies,
+)
+
+from .simple_index import (
+    publish,
+    serve,
+)
+
+
+FAKE_PYTHON = """#!/bin/sh
+echo "$@" >> {calls}
+site_packages=.venv/lib/python3.13/site-packages
+case "$*" in
+"-c from pip._vendor.packaging import tags"*)
+    echo "$FAKE_TAGS";;
+"-m pip config list")
+    if [ -n "$FAKE_INDEX_URL" ]; then echo ":env:.index-url='$FAKE_INDEX_URL'"; fi;;
+*"piptools compile"*)
+    grep -q broken requirements.in && echo "No matching distribution" >&2 && exit 1
+    echo "rich==13.9.4" > requirements.lock
+    if grep -q click requirements.in; then echo "click==8.1.8" >> requirements.lock; fi;;
+*"pip install --no-deps"*)
+    for arg; do requirements_path=$arg; done
+    while read -r pin _; do
+        mkdir -p "$site_packages/${{pin%%==*}}-${{pin#*==}}.dist-info"
+    done < "$requirements_path";;
+*"pip uninstall -y"*)
+    shift 4
+    for name; do rm -rf "$site_packages/$name"-*.dist-info; done;;
+*"pip install -e"*)
+    mkdir -p "$site_packages/demo-0.1.dist-info"
+    echo "{{\\"url\\": \\"file://$PWD\\", \\"dir_info\\": {{\\"editable\\": true}}}}" \\
+        > "$site_packages/demo-0.1.dist-info/direct_url.json";;
+esac
+"""
+
+
+@pytest.fixture
+def calls(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """Project with a fake `.venv` python recording its calls."""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("CULTING_OFFLINE", "1")
+    venv_bin = tmp_path / ".venv" / "bin"
+    venv_bin.mkdir(parents=True)
+    _calls = tmp_path / "calls"
+    (venv_bin / "python").write_text(FAKE_PYTHON.format(calls=_calls))
+    (venv_bin / "python").chmod(0o755)
+    (tmp_path / ".venv" / "pyvenv.cfg").write_text("version = 3.13.0\n")
+    (tmp_path / "pyproject.toml").write_text("[project]\nname = 'demo'\n")
+    (tmp_path / "requirements.in").write_text("rich\n")
+    monkeypatch.chdir(tmp_path)
+    return _calls
+
+
+COMPILE = "-m piptools compile -o requirements.lock requirements.in --no-strip-extras"
+TAGS = "-c from pip._vendor.packaging import tags; print(*tags.sys_tags())"
+INSTALL = "-m pip install --no-deps -r requirements.txt"
+EDITABLE = "-m pip install -e .[dev]"
+SYNC = "-m piptools sync requirements.lock"
+
+
+def _calls(calls: pathlib.Path) -> list[str]:
+    """Commands the fake python ran since the last call, with temporary dirs left out."""
+    if not calls.exists():
+        return []
+    lines = [re.sub(r"-r \S*/", "-r ", line) for line in calls.read_text().splitlines()]
+    calls.unlink()
+    return lines
+
+
+def test_unchanged(calls: pathlib.Path) -> None:
+    """Test nothing runs on an unchanged project."""
+    Dependencies().pip_editable_mode()
+    assert _calls(calls) == [COMPILE, TAGS, INSTALL, EDITABLE]
+    Dependencies().pip_editable_mode()
+    assert _calls(calls) == []
+
+
+def test_drift(calls: pathlib.Path) -> None:
+    """Test what was removed from `.venv` behind culting's back is installed again."""
+    Dependencies().pip_editable_mode()
+    _calls(calls)
+    site_packages = pathlib.Path(".venv/lib/python3.13/site-packages")
+    (site_packages / "rich-13.9.4.dist-info").rmdir()
+    Dependencies().pip_editable_mode()
+    assert _calls(calls) == [TAGS, INSTALL]
+    for dist_info in site_packages.glob("demo-*.dist-info"):
+        shutil.rmtree(dist_info)
+    Dependencies().pip_editable_mode()
+    assert _calls(calls) == [EDITABLE]
+
+
+def test_force(calls: pathlib.Path) -> None:
+    """Test `force` compiles and installs the project again."""
+    Dependencies().pip_editable_mode()
+    _calls(calls)
+    Dependencies(force=True).pip_editable_mode()
+    assert _calls(calls) == [COMPILE, EDITABLE]
+
+
+def test_sync_delta(calls: pathlib.Path) -> None:
+    """Test only what differs from `requirements.lock` is installed or uninstalled."""
+    site_packages = pathlib.Path(".venv/lib/python3.13/site-packages")
+    (site_packages / "rich-13.9.4.dist-info").mkdir(parents=True)
+    Dependencies().pip_editable_mode()
+    assert _calls(calls) == [COMPILE, EDITABLE]
+    (site_packages / "click-8.1.7.dist-info").mkdir()
+    (site_packages / "setuptools-75.0.0.dist-info").mkdir()
+    (site_packages / "demo-0.1.dist-info/METADATA").write_text(
+        "Name: demo\nRequires-Dist: pytest; extra == 'dev'\nProvides-Extra: dev\n",
+    )
+    (site_packages / "pytest-8.3.4.dist-info").mkdir()
+    Dependencies(force=True).pip_editable_mode()
+    assert _calls(calls) == [COMPILE, "-m pip uninstall -y click", EDITABLE]
+
+
+def test_prefetch(calls: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test wheels are downloaded ahead of pip, which installs them without the index, unserved pins left to it."""
+    monkeypatch.delenv("CULTING_OFFLINE")
+    monkeypatch.setenv("FAKE_TAGS", "py3-none-any")
+    pathlib.Path("requirements.in").write_text("rich\nclick\n")
+    root = pathlib.Path("index")
+    root.mkdir()
+    publish(root, "rich", {"rich-13.9.4-py3-none-any.whl": b"rich"})
+    pathlib.Path(".venv/culting-pip-upgrade").touch()
+    with serve(root) as server:
+        monkeypatch.setenv("FAKE_INDEX_URL", server.index.url)
+        Dependencies().pip_editable_mode()
+    assert sorted(server.requests) == ["/files/rich-13.9.4-py3-none-any.whl", "/simple/click/", "/simple/rich/"]
+    assert (wheelhouse.wheelhouse_dir() / "rich-13.9.4-py3-none-any.whl").read_bytes() == b"rich"
+    assert _calls(calls) == [
+        COMPILE,
+        TAGS,
+        "-m pip config list",
+        f"-m pip install --no-deps --no-index --find-links {wheelhouse.wheelhouse_dir()} -r prefetched.txt",
+        INSTALL,
+        EDITABLE,
+    ]
+
+
+def test_legacy(calls: pathlib.Path) -> None:
+    """Test a `.venv` with `.egg-info` installs, not read in process, is left to pip-sync, when changed."""
+    site_packages = pathlib.Path(".venv/lib/python3.13/site-packages")
+    (site_packages / "legacy-1.0-py3.13.egg-info").mkdir(parents=True)
+    Dependencies().pip_editable_mode()
+    assert _calls(calls) == [COMPILE, SYNC, EDITABLE]
+    Dependencies().pip_editable_mode()
+    assert _calls(calls) == []
+
+
+def test_changed_requirements(calls: pathlib.Path) -> None:
+    """Test a changed `requirements.in` compiles again, the same lock skips the sync."""
+    Dependencies().pip_editable_mode()
+    _calls(calls)
+    pathlib.Path("requirements.in").write_text("rich>=13\n")
+    Dependencies().pip_editable_mode()
+    assert _calls(calls) == [COMPILE]
+
+
+def test_resolution_cache(calls: pathlib.Path) -> None:
+    """Test a requirement set resolved before, even as spelled differently, is not compiled again."""
+    Dependencies().pip_editable_mode()
+    _calls(calls)
+    pathlib.Path("requirements.lock").unlink()
+    pathlib.Path("requirements.in").write_text("# same requirements\nRich  \n")
+    Dependencies().pip_editable_mode()
+    assert _calls(calls) == []
+    assert pathlib.Path("requirements.lock").read_text() == "rich==13.9.4\n"
+
+
+def test_add_batch(calls: pathlib.Path) -> None:
+    """Test libraries are added with one compile and one sync."""
+    added = Dependencies().add(("click>=8", "tomlkit", "Rich[jupyter]"))
+    assert added == ["click>=8", "tomlkit", "Rich[jupyter]"]
+    assert pathlib.Path("requirements.in").read_text() == "Rich[jupyter]\nclick>=8\ntomlkit\n"
+    assert _calls(calls) == [COMPILE, TAGS, INSTALL, EDITABLE]
+
+
+def test_add_rollback(calls: pathlib.Path) -> None:
+    """Test `requirements.in` is restored when the resolution fails."""
+    Dependencies().pip_editable_mode()
+    _calls(calls)
+    with pytest.raises(CommandError, match="No matching distribution"):
+        Dependencies().add(("click", "broken"))
+    assert pathlib.Path("requirements.in").read_text() == "rich\n"
+    assert pathlib.Path("requirements.lock").read_text() == "rich==13.9.4\n"
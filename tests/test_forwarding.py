@@ -0,0 +1,77 @@
+"""Test forwarded commands."""
+
+import os
+import pathlib
+import subprocess
+import sys
+
+import pytest
+from click.testing import CliRunner
+
+from culting import cli as cli_module
+from culting.cli import cli
+
+
+@pytest.fixture
+def project_dir(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """Project with a `.venv` pointing to the running interpreter."""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    venv_bin = tmp_path / ".venv" / "bin"
+    venv_bin.mkdir(parents=True)
+    (venv_bin / "python").symlink_to(sys.executable)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_panel(project_dir: pathlib.Path) -> None:
+    """Test output shown in a panel."""
+    _ = project_dir
+    result = CliRunner().invoke(cli, ["python", "-c", "print('[bold]hello[/bold]')"])
+    assert result.exit_code == 0
+    assert "Python Out" in result.output
+    assert "[bold]hello[/bold]" in result.output
+
+
+def test_panel_capped(project_dir: pathlib.Path) -> None:
+    """Test the panel keeps only the last lines."""
+    _ = project_dir
+    lines = cli_module.PANEL_MAX_LINES + 10
+    result = CliRunner().invoke(cli, ["python", "-c", f"for i in range({lines}): print(f'line-{{i}}')"])
+    assert result.exit_code == 0
+    assert "10 lines hidden" in result.output
+    assert "line-9 " not in result.output
+    assert f"line-{lines - 1}" in result.output
+
+
+def test_panel_error(project_dir: pathlib.Path) -> None:
+    """Test stderr shown on failure."""
+    _ = project_dir
+    result = CliRunner().invoke(cli, ["python", "-c", "import sys; sys.exit('boom')"])
+    assert result.exit_code == 1
+    assert "Python Error" in result.output
+    assert "boom" in result.output
+
+
+def test_stream(project_dir: pathlib.Path) -> None:
+    """Test streamed output."""
+    _ = project_dir
+    code = "import sys; print('out'); print('err', file=sys.stderr)"
+    result = CliRunner().invoke(cli, ["--stream", "python", "-c", code])
+    assert result.exit_code == 0
+    assert "Python Out" not in result.output
+    assert "out\n" in result.output
+    assert "err\n" in result.output
+
+
+def test_raw(project_dir: pathlib.Path) -> None:
+    """Test culting is replaced by the forwarded command."""
+    _ = project_dir
+    code = "import os, sys; print(os.getppid()); sys.exit(3)"
+    _out = subprocess.run(
+        [sys.executable, "-m", "culting", "--raw", "python", "-c", code],
+        check=False,
+        capture_output=True,
+        text=True,
+    )
+    assert _out.returncode == 3
+    assert _out.stdout == f"{os.getpid()}\n"
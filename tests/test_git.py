@@ -0,0 +1,51 @@
+"""Test git."""
+
+import collections.abc
+import pathlib
+import shutil
+import subprocess
+
+import pytest
+
+from culting import git, runner
+
+from .runners import FakeRunner
+
+
+def test_in_process_needs_real_runner() -> None:
+    """Test fake toolchains keep running `git` as a command."""
+    with runner.use(FakeRunner()):
+        assert not git.in_process()
+
+
+@pytest.fixture
+def home(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> collections.abc.Iterator[pathlib.Path]:
+    """Empty home, for `git` and `libgit2`, which reads `HOME` once, maybe before the test changes it."""
+    pygit2 = pytest.importorskip("pygit2")
+    _home = tmp_path / "home"
+    _home.mkdir()
+    monkeypatch.setenv("HOME", str(_home))
+    level = pygit2.enums.ConfigLevel.GLOBAL
+    previous = pygit2.settings.search_path[level]
+    pygit2.settings.search_path[level] = str(_home)
+    yield _home
+    pygit2.settings.search_path[level] = previous
+
+
+def test_init(tmp_path: pathlib.Path, home: pathlib.Path) -> None:
+    """Test the repository is the one `git` would make."""
+    (home / ".gitconfig").write_text("[user]\n\tname = Jane\n\temail = jane@example.com\n")
+    project_dir = tmp_path / "demo"
+    project_dir.mkdir()
+    (project_dir / "README.md").write_text("# demo")
+    identity = git.init(project_dir, "README.md", "Add README.md", "v0.1.0", "Release version 0.1.0")
+    assert identity == ("Jane", "jane@example.com")
+
+    def _git(*args: str) -> str:
+        git_path = shutil.which("git")
+        assert git_path is not None
+        return subprocess.run([git_path, *args], cwd=project_dir, check=True, capture_output=True, text=True).stdout
+
+    assert _git("log", "--format=%an <%ae> %s") == "Jane <jane@example.com> Add README.md\n"
+    assert _git("cat-file", "-t", "v0.1.0") == "tag\n"
+    assert _git("status", "--porcelain") == ""
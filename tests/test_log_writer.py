@@ -0,0 +1,46 @@
+"""Test log writer."""
+
+import json
+import logging
+import pathlib
+
+from pj_logging import JsonlFormatter
+
+from culting.log_writer import BatchRotatingFileHandler, QueuedHandler
+
+
+def _queued_logger(path: pathlib.Path, max_bytes: int = 0) -> tuple[logging.Logger, QueuedHandler]:
+    file_handler = BatchRotatingFileHandler(path, maxBytes=max_bytes, backupCount=100, delay=True)
+    file_handler.setFormatter(JsonlFormatter())
+    handler = QueuedHandler(file_handler)
+    _logger = logging.getLogger(f"test_log_writer.{path.name}.{max_bytes}")
+    _logger.propagate = False
+    _logger.addHandler(handler)
+    return _logger, handler
+
+
+def test_flush(tmp_path: pathlib.Path) -> None:
+    """Test records, extra fields and exceptions included, are written once flushed."""
+    _logger, handler = _queued_logger(tmp_path / "culting.log")
+    _logger.warning("step %s", "init_git", extra={"span": {"duration": 1.0}})
+    try:
+        raise ValueError("boom")  # noqa: EM101, TRY301
+    except ValueError:
+        _logger.exception("failed")
+    handler.flush()
+    records = [json.loads(line) for line in (tmp_path / "culting.log").read_text().splitlines()]
+    assert records[0]["message"] == "step init_git"
+    assert records[0]["span"] == {"duration": 1.0}
+    assert "ValueError: boom" in records[1]["exc_info"]
+    handler.close()
+
+
+def test_close_rotates_off_the_caller(tmp_path: pathlib.Path) -> None:
+    """Test rotation happens and nothing is lost on close."""
+    _logger, handler = _queued_logger(tmp_path / "culting.log", max_bytes=1_000)
+    for i in range(100):
+        _logger.warning("record %d", i)
+    handler.close()
+    lines = [line for path in tmp_path.glob("culting.log*") for line in path.read_text().splitlines()]
+    assert len(list(tmp_path.glob("culting.log*"))) > 1
+    assert sorted(json.loads(line)["message"] for line in lines) == sorted(f"record {i}" for i in range(100))
@@ -0,0 +1,118 @@
+"""Test new."""
+
+import concurrent.futures
+import functools
+import multiprocessing
+import os
+import pathlib
+import re
+import time
+import typing as t
+
+import pytest
+from click.testing import CliRunner
+
+from culting import (
+    click_commands,
+    runner,
+)
+from culting.cli import cli
+from culting.click_commands import (
+    CommandError,
+    new_projects,
+)
+
+from .runners import FakeRunner
+
+
+@pytest.fixture
+def root(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """Directory for new projects, no `pyenv` on PATH."""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("PATH", str(tmp_path / "bin"))
+    _root = tmp_path / "projects"
+    _root.mkdir()
+    return _root
+
+
+def test_manifest_report(root: pathlib.Path) -> None:
+    """Test each project gets its own report and failed ones are rolled back."""
+    manifest = root.parent / "manifest.toml"
+    manifest.write_text('python-version = "3.13"\n[[project]]\nname = "svc-a"\n[[project]]\nname = "Bad"\n')
+    reports = new_projects(manifest, root, jobs=2)
+    assert [report.project_name for report in reports] == ["svc-a", "Bad"]
+    # `pyenv` and `git` steps run concurrently, either fails first, `git` on `pygit2` for want of an identity
+    assert reports[0].error in {
+        "pyenv not found.",
+        "git not found.",
+        "Author identity unknown, set git config user.name and user.email.",
+    }
+    assert reports[1].error is not None
+    assert "PEP 8" in reports[1].error
+    assert list(root.iterdir()) == []
+
+
+@pytest.fixture
+def fork(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Workers forked whatever the platform default, so they inherit the test's runner and patches."""
+    monkeypatch.setattr(
+        concurrent.futures,
+        "ProcessPoolExecutor",
+        functools.partial(concurrent.futures.ProcessPoolExecutor, mp_context=multiprocessing.get_context("fork")),
+    )
+
+
+@pytest.mark.usefixtures("fork")
+def test_manifest_created(root: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the projects are created concurrently, each in its own dir, and reported with their timing."""
+    monkeypatch.setenv("CULTING_OFFLINE", "1")
+    monkeypatch.chdir(root)
+    names = ["svc-a", "svc-b", "svc-c"]
+    manifest = root.parent / "manifest.toml"
+    manifest.write_text('python-version = "3.13"\n' + "".join(f'[[project]]\nname = "{name}"\n' for name in names))
+    start = time.perf_counter()
+    with runner.use(FakeRunner(latency=0.1)):
+        result = CliRunner().invoke(cli, ["new", "--from", str(manifest), "-j", "3"])
+    elapsed = time.perf_counter() - start
+    assert result.exit_code == 0, result.output
+    reported = dict(re.findall(r"✓ (\S+)  (\d+\.\d)s", result.output))
+    assert list(reported) == names
+    assert "3 created, 0 failed." in result.output
+    for name in names:
+        assert (root / name / "README.md").read_text() == f"# {name}"
+        assert (root / name / "pyproject.toml").is_file()
+    # each project waits on its commands, the three at once
+    assert elapsed < sum(float(duration) for duration in reported.values())
+
+
+@pytest.mark.usefixtures("fork")
+def test_manifest_crash(root: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test a worker dying is reported as a failed project."""
+
+    def crash(*_args: t.Any, **_kwargs: t.Any) -> None:
+        os._exit(1)
+
+    monkeypatch.setattr(click_commands, "NewProject", crash)
+    manifest = root.parent / "manifest.toml"
+    manifest.write_text('python-version = "3.13"\n[[project]]\nname = "svc-a"\n')
+    [report] = new_projects(manifest, root, jobs=1)
+    assert report.project_name == "svc-a"
+    assert report.error is not None
+    assert "terminated abruptly" in report.error
+
+
+def test_manifest_jobs(root: pathlib.Path) -> None:
+    """Test `--jobs` is at least 1."""
+    manifest = root.parent / "manifest.toml"
+    manifest.write_text('python-version = "3.13"\n[[project]]\nname = "svc-a"\n')
+    result = CliRunner().invoke(cli, ["new", "--from", str(manifest), "-j", "0"])
+    assert result.exit_code == 2
+    assert "0 is not in the range x>=1" in result.output
+
+
+def test_manifest_invalid(root: pathlib.Path) -> None:
+    """Test projects need a name and a python version."""
+    manifest = root.parent / "manifest.toml"
+    manifest.write_text('[[project]]\nname = "svc-a"\n')
+    with pytest.raises(CommandError, match="python-version"):
+        new_projects(manifest, root)
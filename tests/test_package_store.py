@@ -0,0 +1,151 @@
+"""Test package store."""
+
+import hashlib
+import pathlib
+import shutil
+import subprocess
+import sys
+import zipfile
+
+import pytest
+
+from culting import distributions, package_store
+from culting.requirements import Pin
+
+
+@pytest.fixture(autouse=True)
+def _home(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+
+
+def _wheel(wheelhouse: pathlib.Path, version: str) -> pathlib.Path:
+    wheel = wheelhouse / f"demo-{version}-py3-none-any.whl"
+    dist_info = f"demo-{version}.dist-info"
+    with zipfile.ZipFile(wheel, "w") as zip_file:
+        zip_file.writestr("demo/__init__.py", f"VERSION = {version!r}\n\ndef main():\n    print(VERSION)\n")
+        zip_file.writestr(f"demo/v{version[0]}.py", "")
+        zip_file.writestr(f"demo-{version}.data/scripts/demo-script", "#!python\nimport demo\nprint(demo.VERSION)\n")
+        zip_file.writestr(f"{dist_info}/METADATA", f"Metadata-Version: 2.1\nName: demo\nVersion: {version}\n")
+        zip_file.writestr(f"{dist_info}/entry_points.txt", "[console_scripts]\ndemo = demo:main\n")
+        zip_file.writestr(f"{dist_info}/RECORD", "")
+    return wheel
+
+
+def _venv(path: pathlib.Path) -> pathlib.Path:
+    subprocess.run([sys.executable, "-m", "venv", "--without-pip", path], check=True)
+    return path
+
+
+def _output(*cmd: pathlib.Path | str) -> str:
+    return subprocess.run(cmd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def test_sync(tmp_path: pathlib.Path) -> None:
+    """Test wheels are fetched once, hardlinked into venvs, upgraded and removed."""
+    fetched: list[list[Pin]] = []
+    uninstalled: list[list[str]] = []
+    installed: list[list[Pin]] = []
+
+    def fetch(pins: list[Pin], wheelhouse: pathlib.Path) -> None:
+        fetched.append(pins)
+        for pin in pins:
+            _wheel(wheelhouse, pin.version)
+
+    venv_dirs = [_venv(tmp_path / "a"), _venv(tmp_path / "b")]
+    site_packages = distributions.site_packages(venv_dirs[0])
+    assert site_packages is not None
+    (site_packages / "other-1.0.dist-info").mkdir()
+    for venv_dir in venv_dirs:
+        package_store.sync(venv_dir, [Pin("demo", "1.0")], fetch, uninstalled.append, installed.append)
+        assert _output(venv_dir / "bin/demo") == "1.0"
+        assert _output(venv_dir / "bin/demo-script") == "1.0"
+    assert fetched == [[Pin("demo", "1.0")]]
+    assert uninstalled == [["other"]]
+    (site_packages / "other-1.0.dist-info").rmdir()
+    init_py = site_packages / "demo/__init__.py"
+    assert init_py.stat().st_nlink == 3
+
+    delta = package_store.sync(venv_dirs[0], [Pin("demo", "2.0")], fetch, uninstalled.append, installed.append)
+    assert [distribution.version for distribution in delta.remove] == ["1.0"]
+    assert _output(venv_dirs[0] / "bin/demo") == "2.0"
+    assert not (site_packages / "demo/v1.py").exists()
+    assert not package_store.sync(venv_dirs[0], [Pin("demo", "2.0")], fetch, uninstalled.append, installed.append)
+
+    package_store.sync(venv_dirs[0], [], fetch, uninstalled.append, installed.append)
+    assert not (site_packages / "demo").exists()
+    assert not (venv_dirs[0] / "bin/demo").exists()
+    assert distributions.installed(venv_dirs[0]) == {}
+    assert installed == []
+
+
+def test_sync_hashes(tmp_path: pathlib.Path) -> None:
+    """Test an entry is only linked for a lock matching the wheel it was unpacked from, pip gets the others."""
+    fetched: list[list[Pin]] = []
+    uninstalled: list[list[str]] = []
+    installed: list[list[Pin]] = []
+
+    def fetch(pins: list[Pin], wheelhouse: pathlib.Path) -> None:
+        fetched.append(pins)
+        shutil.copy(wheel, wheelhouse)
+
+    wheel = _wheel(tmp_path, "1.0")
+    digest = hashlib.sha256(wheel.read_bytes()).hexdigest()
+    venv_dirs = [_venv(tmp_path / "a"), _venv(tmp_path / "b"), _venv(tmp_path / "c")]
+    package_store.sync(venv_dirs[0], [Pin("demo", "1.0")], fetch, uninstalled.append, installed.append)
+    hashed = Pin("demo", "1.0", (f"sha256:{digest}",))
+    package_store.sync(venv_dirs[1], [hashed], fetch, uninstalled.append, installed.append)
+    assert len(fetched) == 1
+    assert installed == []
+    other = Pin("demo", "1.0", ("sha256:" + "0" * 64,))
+    package_store.sync(venv_dirs[2], [other], fetch, uninstalled.append, installed.append)
+    assert len(fetched) == 2
+    assert installed == [[other]]
+    assert distributions.installed(venv_dirs[2]) == {}
+
+
+def test_sync_sdist(tmp_path: pathlib.Path) -> None:
+    """Test a pin whose wheel is built from its sdist, never matching the lock's hashes, is left to pip."""
+    uninstalled: list[list[str]] = []
+    installed: list[list[Pin]] = []
+
+    def fetch(_pins: list[Pin], wheelhouse: pathlib.Path) -> None:
+        # `pip wheel` downloads the one wheel, builds the other from the sdist
+        shutil.copy(wheel, wheelhouse)
+        built = wheelhouse / "built-1.0-py3-none-any.whl"
+        with zipfile.ZipFile(built, "w") as zip_file:
+            zip_file.writestr("built-1.0.dist-info/METADATA", "Metadata-Version: 2.1\nName: built\nVersion: 1.0\n")
+
+    wheel = _wheel(tmp_path, "1.0")
+    digest = hashlib.sha256(wheel.read_bytes()).hexdigest()
+    sdist = Pin("built", "1.0", ("sha256:" + hashlib.sha256(b"built-1.0.tar.gz").hexdigest(),))
+    venv_dir = _venv(tmp_path / "venv")
+    pins = [Pin("demo", "1.0", (f"sha256:{digest}",)), sdist]
+    package_store.sync(venv_dir, pins, fetch, uninstalled.append, installed.append)
+    assert installed == [[sdist]]
+    assert list(distributions.installed(venv_dir)) == ["demo"]
+    assert [entry.name for entry in package_store.entries()] == ["demo-1.0-py3-none-any"]
+
+
+def test_gc(tmp_path: pathlib.Path) -> None:
+    """Test entries go once no venv shares their files anymore."""
+    wheelhouse = tmp_path / "wheelhouse"
+    wheelhouse.mkdir()
+    entries = [package_store.import_wheel(_wheel(wheelhouse, version)) for version in ("1.0", "2.0")]
+    venv_dirs = [_venv(tmp_path / "a"), _venv(tmp_path / "b")]
+    for venv_dir in venv_dirs:
+        package_store.link(entries[0], venv_dir)
+    package_store.link(entries[1], venv_dirs[1])
+    assert [entry.refs for entry in package_store.entries()] == [2, 1]
+
+    shutil.rmtree(venv_dirs[1])
+    assert [entry.name for entry in package_store.gc()] == [entries[1]]
+    assert [(entry.name, entry.refs) for entry in package_store.entries()] == [(entries[0], 1)]
+
+
+def test_unsafe_wheel(tmp_path: pathlib.Path) -> None:
+    """Test wheels writing outside their entry are refused."""
+    wheel = tmp_path / "evil-1.0-py3-none-any.whl"
+    with zipfile.ZipFile(wheel, "w") as zip_file:
+        zip_file.writestr("../evil.py", "")
+    with pytest.raises(package_store.StoreError, match="Unsafe path"):
+        package_store.import_wheel(wheel)
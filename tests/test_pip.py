@@ -0,0 +1,47 @@
+"""Test pip."""
+
+import pathlib
+
+import pytest
+
+from culting import pip
+
+
+@pytest.fixture
+def calls(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """Project with a fake `.venv` python recording its calls."""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.delenv("CULTING_OFFLINE", raising=False)
+    venv_bin = tmp_path / ".venv" / "bin"
+    venv_bin.mkdir(parents=True)
+    _calls = tmp_path / "calls"
+    (venv_bin / "python").write_text(f'#!/bin/sh\necho "$@" >> {_calls}\n')
+    (venv_bin / "python").chmod(0o755)
+    monkeypatch.chdir(tmp_path)
+    return _calls
+
+
+def _count(calls: pathlib.Path) -> int:
+    return len(calls.read_text().splitlines()) if calls.exists() else 0
+
+
+def test_upgrade_ttl(calls: pathlib.Path) -> None:
+    """Test the upgrade is skipped within the TTL."""
+    pip.upgrade()
+    pip.upgrade()
+    assert _count(calls) == 1
+
+
+def test_upgrade_ttl_config(calls: pathlib.Path) -> None:
+    """Test `[tool.culting] pip-upgrade-ttl`."""
+    pathlib.Path("pyproject.toml").write_text("[tool.culting]\npip-upgrade-ttl = 0\n")
+    pip.upgrade()
+    pip.upgrade()
+    assert _count(calls) == 2
+
+
+def test_upgrade_offline(calls: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test offline mode skips the upgrade."""
+    monkeypatch.setenv("CULTING_OFFLINE", "1")
+    pip.upgrade()
+    assert _count(calls) == 0
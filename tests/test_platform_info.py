@@ -0,0 +1,79 @@
+"""Test PlatformInfo."""
+
+import concurrent.futures
+import json
+import pathlib
+
+import pytest
+
+from culting import (
+    ExecutableNotFoundError,
+    PlatformInfo,
+)
+
+
+@pytest.fixture
+def bin_dir(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """Isolated HOME and PATH with a fake `git`."""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.chdir(tmp_path)
+    _bin_dir = tmp_path / "bin"
+    _bin_dir.mkdir()
+    git = _bin_dir / "git"
+    git.write_text("#!/bin/sh\n")
+    git.chmod(0o755)
+    monkeypatch.setenv("PATH", str(_bin_dir))
+    return _bin_dir
+
+
+def test_which_cache_persisted(bin_dir: pathlib.Path) -> None:
+    """Test resolved paths are written under the state dir and reused."""
+    platform_info = PlatformInfo()
+    assert platform_info.git == bin_dir / "git"
+    with platform_info.which_cache_path.open("r") as file:
+        _cache = json.load(file)
+    assert list(_cache.values()) == [{"git": str(bin_dir / "git")}]
+    assert PlatformInfo().git == bin_dir / "git"
+
+
+def test_which_cache_missing_file(bin_dir: pathlib.Path) -> None:
+    """Test entries pointing to removed files are resolved again."""
+    platform_info = PlatformInfo()
+    assert platform_info.git == bin_dir / "git"
+    (bin_dir / "git").unlink()
+    with pytest.raises(ExecutableNotFoundError):
+        _ = platform_info.git
+
+
+def test_which_cache_path_key(bin_dir: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test a different PATH does not reuse entries."""
+    platform_info = PlatformInfo()
+    assert platform_info.git == bin_dir / "git"
+    other_bin_dir = bin_dir.parent / "other"
+    other_bin_dir.mkdir()
+    (other_bin_dir / "git").write_text("#!/bin/sh\n")
+    (other_bin_dir / "git").chmod(0o755)
+    monkeypatch.setenv("PATH", str(other_bin_dir))
+    assert platform_info.git == other_bin_dir / "git"
+
+
+def test_which_cache_threads(bin_dir: pathlib.Path) -> None:
+    """Test executables resolved from many threads at once keep the cache whole."""
+    (bin_dir / "pyenv").write_text("#!/bin/sh\n")
+    (bin_dir / "pyenv").chmod(0o755)
+    roots = []
+    for i in range(16):
+        venv_bin = bin_dir.parent / f"project-{i}" / ".venv/bin"
+        venv_bin.mkdir(parents=True)
+        (venv_bin / "python").write_text("#!/bin/sh\n")
+        (venv_bin / "python").chmod(0o755)
+        roots.append(venv_bin.parent.parent)
+    platform_info = PlatformInfo()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        pythons = list(executor.map(platform_info.venv_python_in, roots))
+        tools = list(executor.map(lambda _: (platform_info.git, platform_info.python_manager), range(16)))
+    assert pythons == [(root / ".venv/bin/python").absolute() for root in roots]
+    assert set(tools) == {(bin_dir / "git", bin_dir / "pyenv")}
+    with platform_info.which_cache_path.open("r") as file:
+        assert len(json.load(file)) == PlatformInfo.which_cache_size
+    assert list(bin_dir.parent.glob("home/**/*.tmp")) == []
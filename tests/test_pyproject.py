@@ -0,0 +1,39 @@
+"""Test pyproject."""
+
+import concurrent.futures
+import typing as t
+
+import pytest
+import tomlkit as toml
+
+from culting.pyproject import AuthorInfo, PyprojectToml
+
+
+@pytest.mark.parametrize("os_", ["linux", "win32"])
+@pytest.mark.parametrize(("pkg_name", "python_version", "authors_info", "src"), [
+    ("demo", "3.13", [{"name": "Fake", "email": "fake@example.com"}], "src"),
+    ("my.pkg_x", "3.9", [], "lib"),
+    ("ünï", "3.12", [{"name": 'A "q"', "email": "a@x"}, {"name": "{src}", "email": "c@x"}], "{name}"),
+])
+def test_dumps_matches_document(
+    os_: t.Literal["linux", "win32"],
+    pkg_name: str,
+    python_version: str,
+    authors_info: list[AuthorInfo],
+    src: str,
+) -> None:
+    """Test the template renders exactly the document."""
+    _pyproject = PyprojectToml(pkg_name, python_version, authors_info, src, os_)
+    assert _pyproject.dumps() == toml.dumps(_pyproject.document())
+
+
+def test_concurrent() -> None:
+    """Test projects rendered concurrently keep their own fields."""
+    def render(i: int) -> str:
+        return PyprojectToml(f"project-{i}", "3.13", [{"name": f"author-{i}", "email": "a@x"}]).dumps()
+
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        for i, text in enumerate(executor.map(render, range(64))):
+            project = toml.loads(text).unwrap()["project"]
+            assert project["name"] == f"project-{i}"
+            assert project["authors"][0]["name"] == f"author-{i}"
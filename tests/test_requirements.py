@@ -0,0 +1,92 @@
+"""Test requirements."""
+
+import pathlib
+
+import pytest
+
+from culting.requirements import (
+    Pin,
+    Requirement,
+    RequirementError,
+    RequirementsFile,
+    pins,
+)
+
+
+def test_parse() -> None:
+    """Test PEP 508 requirements parsing."""
+    requirement = Requirement.parse('Pydantic_Core[Email, timezone] >=2.0, <3 ; python_version >= "3.11"  # pinned')
+    assert requirement.name == "pydantic-core"
+    assert requirement.extras == ("email", "timezone")
+    assert requirement.specifier == "<3,>=2.0"
+    assert requirement.marker == 'python_version >= "3.11"'
+    assert Requirement.parse("pkg @ https://example.com/pkg.whl").url == "https://example.com/pkg.whl"
+    assert Requirement.parse("# comment").name is None
+    assert Requirement.parse("--index-url https://example.com").name is None
+    assert Requirement.parse("click==8.1.7 --hash=sha256:aa").specifier == "==8.1.7"
+    vcs = Requirement.parse("git+https://github.com/pallets/click#egg=click")
+    assert (vcs.name, vcs.url) == (None, "git+https://github.com/pallets/click#egg=click")
+    for line in ("=bad", "rich foo bar", "rich>=13,"):
+        with pytest.raises(RequirementError):
+            Requirement.parse(line)
+
+
+def test_file(tmp_path: pathlib.Path) -> None:
+    """Test lookup, duplicates and conflicts."""
+    path = tmp_path / "requirements.in"
+    path.write_text("rich\nrich-click>=1.8\nRich_Click>=1.8\nPyYAML\npyyaml<7\n")
+    requirements_file = RequirementsFile(path)
+    assert "rich_click" in requirements_file
+    assert requirements_file["RICH-CLICK"].specifier == ">=1.8"
+    assert set(requirements_file.duplicates()) == {"rich-click", "pyyaml"}
+    assert set(requirements_file.conflicts()) == {"pyyaml"}
+
+
+def test_sort_write(tmp_path: pathlib.Path) -> None:
+    """Test sorting keeps comments with their requirement, unchanged files are not written."""
+    path = tmp_path / "requirements.in"
+    path.write_text("# header\n\n--index-url https://example.com\n# ui\nrich\n# cli\nclick\n")
+    requirements_file = RequirementsFile(path)
+    requirements_file.sort()
+    assert requirements_file.write()
+    assert path.read_text() == "# header\n\n--index-url https://example.com\n# cli\nclick\n# ui\nrich\n"
+    requirements_file = RequirementsFile(path)
+    requirements_file.sort()
+    assert not requirements_file.write()
+
+
+def test_sort_groups(tmp_path: pathlib.Path) -> None:
+    """Test blank lines, pip options and URL lines stay in place, a missing final newline is kept."""
+    path = tmp_path / "requirements.in"
+    text = "rich\nclick\n\ntomlkit\n--pre\n# pinned\npydantic\n./local\nattrs\nblack"
+    path.write_text(text)
+    requirements_file = RequirementsFile(path)
+    requirements_file.sort()
+    assert requirements_file.text == "click\nrich\n\ntomlkit\n--pre\n# pinned\npydantic\n./local\nattrs\nblack"
+    path.write_text("click\nrich")
+    requirements_file = RequirementsFile(path)
+    requirements_file.sort()
+    assert not requirements_file.write()
+
+
+def test_add(tmp_path: pathlib.Path) -> None:
+    """Test adding replaces the existing requirement in place."""
+    path = tmp_path / "requirements.in"
+    path.write_text("click\nrich\ntomlkit\n")
+    requirements_file = RequirementsFile(path)
+    requirements_file.add("Rich>=13")
+    requirements_file.add("pydantic")
+    assert requirements_file.text == "click\nRich>=13\ntomlkit\npydantic\n"
+
+
+def test_pins(tmp_path: pathlib.Path) -> None:
+    """Test lock file pins, `None` as soon as a line is more than a pin."""
+    path = tmp_path / "requirements.lock"
+    path.write_text(
+        "# via pip-compile\nclick==8.1.7 \\\n    --hash=sha256:aa \\\n    --hash=sha256:bb\n    # via rich-click\n"
+        "Rich_Click[dev]==1.8.5\n",
+    )
+    assert pins(path) == [Pin("click", "8.1.7", ("sha256:aa", "sha256:bb")), Pin("rich-click", "1.8.5")]
+    for line in ("click==8.1.7 ; python_version < '3.12'", "-e .", "click>=8", "click==8.*"):
+        path.write_text(f"{line}\n")
+        assert pins(path) is None
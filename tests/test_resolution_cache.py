@@ -0,0 +1,41 @@
+"""Test resolution cache."""
+
+import os
+import pathlib
+
+import pytest
+
+from culting import resolution_cache
+
+
+@pytest.fixture(autouse=True)
+def _home(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.chdir(tmp_path)
+
+
+def test_prune_lru() -> None:
+    """Test the least recently used entries are evicted first."""
+    for i, key in enumerate(["a", "b", "c"]):
+        resolution_cache.put(key, "x" * 100)
+        os.utime(resolution_cache.cache_dir() / f"{key}.lock", (i, i))
+    assert resolution_cache.get("a") is not None
+    resolution_cache.put("d", "x" * 100, max_size=300)
+    assert [entry.path.stem for entry in resolution_cache.entries()] == ["c", "a", "d"]
+
+
+def test_key_local_files() -> None:
+    """Test requirements referring to local files are not cached."""
+    pathlib.Path(".venv").mkdir()
+    pathlib.Path(".venv/pyvenv.cfg").write_text("version = 3.13.0\n")
+    pathlib.Path("requirements.in").write_text("rich\n")
+    assert resolution_cache.key() is not None
+    pathlib.Path("requirements.in").write_text("rich\n-r other.in\n")
+    assert resolution_cache.key() is None
+
+
+def test_key_missing_files() -> None:
+    """Test a project without `requirements.in` or `.venv` has no key."""
+    assert resolution_cache.key() is None
+    pathlib.Path("requirements.in").write_text("rich\n")
+    assert resolution_cache.key() is None
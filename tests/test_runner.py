@@ -0,0 +1,64 @@
+"""Test runner."""
+
+import pathlib
+
+import pytest
+
+from culting import runner
+from culting.click_commands import NewProject
+
+from .runners import (
+    FakeRunner,
+    RecordingRunner,
+    ReplayRunner,
+    RunnerError,
+)
+
+
+@pytest.fixture
+def root(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """Directory for new projects, offline, nothing on PATH."""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("PATH", str(tmp_path / "bin"))
+    monkeypatch.setenv("CULTING_OFFLINE", "1")
+    _root = tmp_path / "projects"
+    _root.mkdir()
+    return _root
+
+
+def test_new_fake_toolchain(root: pathlib.Path) -> None:
+    """Test `culting new` end to end with the fake toolchain."""
+    with runner.use(FakeRunner()):
+        new_project = NewProject(root, project_name="demo", python_version="3.13", src="src")
+    project_dir = root / "demo"
+    assert (project_dir / ".python-version").read_text() == "3.13\n"
+    assert 'email = "fake@example.com"' in (project_dir / "pyproject.toml").read_text()
+    assert (project_dir / "requirements.lock").is_file()
+    assert (project_dir / ".venv/culting-sync.sha256").is_file()
+    assert set(new_project.timings) == {
+        "set_python",
+        "init_git",
+        "fetch_gitignore",
+        "init_venv",
+        "set_files",
+        "install",
+    }
+
+
+def test_record_replay(root: pathlib.Path) -> None:
+    """Test a recorded `culting new` replays in another directory."""
+    recording = RecordingRunner(FakeRunner())
+    with runner.use(recording):
+        NewProject(root, project_name="recorded", python_version="3.13", src="src")
+    recording.save(root.parent / "recording.jsonl")
+    replay = ReplayRunner(root.parent / "recording.jsonl", latency=0)
+    with runner.use(replay):
+        NewProject(root, project_name="replayed", python_version="3.13", src="src")
+    assert (root / "replayed" / "requirements.lock").is_file()
+
+
+def test_replay_unexpected(tmp_path: pathlib.Path) -> None:
+    """Test commands missing from the recording fail."""
+    (tmp_path / "recording.jsonl").write_text("")
+    with pytest.raises(RunnerError, match="No recorded run"):
+        ReplayRunner(tmp_path / "recording.jsonl").run(["git", "status"])
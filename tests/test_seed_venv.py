@@ -0,0 +1,43 @@
+"""Test seed venv."""
+
+import pathlib
+import subprocess
+
+import pytest
+
+from culting import seed_venv
+
+
+@pytest.fixture(autouse=True)
+def _home(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+
+
+def test_clone(tmp_path: pathlib.Path) -> None:
+    """Test a clone is a working venv of its own, and the seed is built once."""
+    interpreter = seed_venv.interpreter(tmp_path)
+    assert interpreter is not None
+    seed_dir = seed_venv.ensure(interpreter, requirements=())
+    assert seed_venv.ensure(interpreter, requirements=()) == seed_dir
+    assert list(seed_venv.seeds_dir().iterdir()) == [seed_dir]
+    venv_dir = tmp_path / "project/.venv"
+    venv_dir.parent.mkdir()
+    seed_venv.clone(seed_dir, venv_dir)
+    prefix = subprocess.run(
+        [venv_dir / "bin/python", "-c", "import sys; print(sys.prefix)"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+    assert prefix == str(venv_dir)
+    assert str(venv_dir) in (venv_dir / "bin/activate").read_text()
+    assert str(seed_dir) not in (venv_dir / "bin/activate").read_text()
+    assert not (seed_dir / "venv/pyvenv.cfg").stat().st_mode & 0o222
+    assert (venv_dir / "pyvenv.cfg").stat().st_mode & 0o200
+
+
+def test_key() -> None:
+    """Test seeds are rebuilt for another interpreter or other requirements."""
+    interpreter = seed_venv.Interpreter("/usr/bin/python3", "3.13.0")
+    assert seed_venv.key(interpreter) != seed_venv.key(interpreter, ("pip-tools==7.4.0",))
+    assert seed_venv.key(interpreter) != seed_venv.key(interpreter._replace(version="3.13.1"))
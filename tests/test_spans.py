@@ -0,0 +1,64 @@
+"""Test spans."""
+
+import json
+import pathlib
+
+import pytest
+
+from culting import profiling, spans
+from culting.task_graph import TaskGraph
+
+
+def test_spans_file(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test task graph steps are written to `CULTING_SPANS_FILE`."""
+    spans_path = tmp_path / "spans.jsonl"
+    monkeypatch.setenv("CULTING_SPANS_FILE", str(spans_path))
+    monkeypatch.setattr(spans, "command", "new")
+    graph = TaskGraph()
+    graph.add("a", lambda: None)
+    graph.run()
+    with spans.span("subprocess", "git") as span:
+        span["exit_code"] = 0
+    records = [json.loads(line) for line in spans_path.read_text().splitlines()]
+    assert [(record["command"], record["category"], record["name"]) for record in records] == [
+        ("new", "step", "a"),
+        ("new", "subprocess", "git"),
+    ]
+    assert records[1]["exit_code"] == 0
+    assert records[0]["duration"] >= 0
+
+
+def test_import_time() -> None:
+    """Test only top-level imports count."""
+    assert profiling.import_time("import time: self [us] | cumulative | imported package\n") is None
+    assert profiling.import_time("import time:       120 |       3000 | culting.cli\n") == 0.003
+    assert profiling.import_time("import time:       120 |       3000 |   rich_click\n") is None
+    assert profiling.import_time("Error: oops\n") is None
+
+
+def test_breakdown() -> None:
+    """Test spans are summed by category, the rest left to `other`."""
+    breakdown = profiling.breakdown(2.0, 0.5, [
+        {"category": "step", "name": "init_git", "start": 0.0, "duration": 0.4},
+        {"category": "subprocess", "name": "git", "start": 0.0, "duration": 0.3},
+        {"category": "subprocess", "name": "python", "start": 0.3, "duration": 0.2},
+        {"category": "network", "name": "https://example.com", "start": 0.5, "duration": 0.5},
+    ])
+    assert breakdown.categories["subprocess"] == pytest.approx(0.5)
+    assert breakdown.overlap == 0
+    assert breakdown.other == pytest.approx(0.5)
+    assert breakdown.steps == [("init_git", 0.4)]
+    assert "init_git" in breakdown.render()
+
+
+def test_breakdown_concurrent() -> None:
+    """Test concurrent spans count once per category, time shared across categories as `overlap`."""
+    breakdown = profiling.breakdown(2.0, 0.5, [
+        {"category": "subprocess", "name": "git", "start": 0.0, "duration": 0.3},
+        {"category": "subprocess", "name": "python", "start": 0.1, "duration": 0.2},
+        {"category": "network", "name": "https://example.com", "start": 0.2, "duration": 0.5},
+    ])
+    assert breakdown.categories["subprocess"] == pytest.approx(0.3)
+    assert breakdown.overlap == pytest.approx(0.1)
+    assert breakdown.other == pytest.approx(0.8)
+    assert "overlap" in breakdown.render()
@@ -0,0 +1,69 @@
+"""Test startup.
+
+What each startup path imports, its timing is left to `python -m benchmarks`.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+
+HEAVY = [
+    "culting.click_commands",
+    "culting.config",
+    "pj_logging",
+    "pydantic",
+    "rich",
+    "rich_click",
+    "subprocess",
+    "tomlkit",
+    "urllib.request",
+]
+
+FORWARDED_COMMANDS = ["git", "python", "pip", "pip-compile", "pip-sync"]
+
+_MODULES_CODE = (
+    "import atexit, runpy, sys; "
+    "atexit.register(lambda: print(*sorted(sys.modules), file=sys.__stderr__)); "
+    "sys.argv = ['culting', *sys.argv[1:]]; "
+    "runpy.run_module('culting', run_name='__main__', alter_sys=True)"
+)
+
+
+def _imported(*args: str) -> set[str]:
+    """Modules loaded by the end of `culting ARGS`."""
+    _out = subprocess.run([sys.executable, "-c", _MODULES_CODE, *args], check=True, capture_output=True, text=True)
+    return set(_out.stderr.strip().splitlines()[-1].split())
+
+
+def test_lazy_imports() -> None:
+    """Test importing the CLI leaves heavy modules alone."""
+    heavy = [
+        "culting.click_commands",
+        "importlib.metadata",
+        "pj_logging",
+        "rich.panel",
+        "subprocess",
+        "tomlkit",
+        "urllib.request",
+    ]
+    code = f"import sys, culting.cli; print([m for m in {heavy!r} if m in sys.modules])"
+    _out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    assert _out.stdout.strip() == "[]"
+
+
+def test_version_imports() -> None:
+    """Test `--version` imports none of the heavy modules."""
+    assert _imported("--version") & set(HEAVY) == set()
+
+
+def test_help_imports() -> None:
+    """Test `--help` renders with `rich_click` only."""
+    assert _imported("--help") & set(HEAVY) == {"rich", "rich_click"}
+
+
+@pytest.mark.parametrize("cmd", FORWARDED_COMMANDS)
+def test_forwarded_command_imports(cmd: str) -> None:
+    """Test forwarded commands' help needs neither the commands nor the project config."""
+    assert _imported(cmd, "--hidden") & set(HEAVY) == {"pj_logging", "rich", "rich_click"}
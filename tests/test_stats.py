@@ -0,0 +1,44 @@
+"""Test stats."""
+
+import json
+import pathlib
+
+import pytest
+
+from culting import platform_info, stats
+
+
+@pytest.fixture(autouse=True)
+def _home(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    platform_info.xdg_state_dir.mkdir(parents=True)
+
+
+def _log(path: pathlib.Path, *spans: tuple[str, str, str, float]) -> None:
+    with path.open("a") as file:
+        for created, category, name, duration in spans:
+            span = {"command": "new", "category": category, "name": name, "duration": duration}
+            file.write(json.dumps({"message": name, "created": created, "span": span}) + "\n")
+
+
+def test_percentiles() -> None:
+    """Test percentiles by command and step, within a bucket."""
+    _log(platform_info.logfile_path, *(("2026-10-01T00:00:00", "step", "init_git", i / 100) for i in range(1, 101)))
+    _log(platform_info.logfile_path, ("2026-10-01T00:00:00", "command", "new", 2.0))
+    rows = stats.rows(stats.update())
+    assert [(row.command, row.step, row.samples) for row in rows] == [("new", stats.TOTAL, 1), ("new", "init_git", 100)]
+    assert rows[1].percentiles == pytest.approx((0.5, 0.95, 0.99), rel=stats.BUCKET_GROWTH - 1)
+
+
+def test_incremental_and_rotation() -> None:
+    """Test lines are counted once, across rotations, and history outlives the rotated files."""
+    logfile_path = platform_info.logfile_path
+    _log(logfile_path, ("2026-09-01T00:00:00", "step", "init_git", 1.0))
+    stats.update()
+    logfile_path.rename(logfile_path.with_name("culting.log.1"))
+    _log(logfile_path, ("2026-10-01T00:00:00", "step", "init_git", 1.0))
+    stats.update()
+    logfile_path.with_name("culting.log.1").unlink()
+    histograms = stats.update()
+    assert [row.samples for row in stats.rows(histograms)] == [2]
+    assert [row.samples for row in stats.rows(histograms, since="2026-10")] == [1]
@@ -0,0 +1,54 @@
+"""Test task graph."""
+
+import threading
+
+import pytest
+
+from culting.task_graph import TaskGraph
+
+
+def test_order() -> None:
+    """Test tasks run after their dependencies."""
+    order: list[str] = []
+    graph = TaskGraph()
+    graph.add("a", lambda: order.append("a"))
+    graph.add("b", lambda: order.append("b"), after=["a"])
+    graph.add("c", lambda: order.append("c"), after=["a", "b"])
+    graph.run()
+    assert order == ["a", "b", "c"]
+    assert set(graph.timings) == {"a", "b", "c"}
+
+
+def test_concurrent() -> None:
+    """Test independent tasks run concurrently."""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def wait() -> None:
+        barrier.wait()
+
+    graph = TaskGraph()
+    graph.add("a", wait)
+    graph.add("b", wait)
+    graph.run()
+
+
+def test_failure() -> None:
+    """Test dependents of a failed task do not run."""
+    ran: list[str] = []
+
+    def fail() -> None:
+        raise RuntimeError
+
+    graph = TaskGraph()
+    graph.add("a", fail)
+    graph.add("b", lambda: ran.append("b"), after=["a"])
+    with pytest.raises(RuntimeError):
+        graph.run()
+    assert ran == []
+
+
+def test_unknown_dependency() -> None:
+    """Test dependencies must be added first."""
+    graph = TaskGraph()
+    with pytest.raises(ValueError, match="cannot be added"):
+        graph.add("a", lambda: None, after=["b"])
@@ -0,0 +1,99 @@
+"""Test template cache."""
+
+import collections.abc
+import http.server
+import pathlib
+import socket
+import threading
+
+import pytest
+
+from culting import template_cache
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+
+    body = b"__pycache__/\n"
+    etag = '"v1"'
+    requests: list[str | None] = []  # noqa: RUF012
+
+    def do_GET(self) -> None:
+        self.requests.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args: object) -> None:
+        _ = args
+
+
+@pytest.fixture
+def url(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> collections.abc.Iterator[str]:
+    """Local HTTP stand-in serving a template."""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.delenv("CULTING_OFFLINE", raising=False)
+    _Handler.requests = []
+    server = http.server.HTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/Python.gitignore"
+    server.shutdown()
+    server.server_close()
+
+
+def test_ttl(url: str) -> None:
+    """Test the cached copy is used within the TTL."""
+    assert template_cache.fetch(url, "Python.gitignore") == "__pycache__/\n"
+    assert template_cache.fetch(url, "Python.gitignore") == "__pycache__/\n"
+    assert _Handler.requests == [None]
+
+
+def test_revalidation(url: str) -> None:
+    """Test an expired cached copy is revalidated with its ETag."""
+    template_cache.fetch(url, "Python.gitignore", ttl=0)
+    assert template_cache.fetch(url, "Python.gitignore", ttl=0) == "__pycache__/\n"
+    assert _Handler.requests == [None, '"v1"']
+
+
+def test_offline(url: str, tmp_path: pathlib.Path) -> None:
+    """Test offline mode, read from the project in `root`, uses the bundled copy."""
+    (tmp_path / "pyproject.toml").write_text("[tool.culting]\noffline = true\n")
+    text = template_cache.fetch(url, "Python.gitignore", root=tmp_path)
+    assert text == template_cache.bundled("Python.gitignore")
+    assert _Handler.requests == []
+
+
+def test_unreachable(url: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test unreachable URLs fall back to the bundled copy."""
+    template_cache.fetch(url, "Python.gitignore")
+    unreachable = "http://127.0.0.1:9/Python.gitignore"
+    assert template_cache.fetch(unreachable, "Python.gitignore", ttl=0) == template_cache.bundled("Python.gitignore")
+    monkeypatch.setenv("CULTING_OFFLINE", "1")
+    assert template_cache.fetch(url, "Python.gitignore", ttl=0) == "__pycache__/\n"
+
+
+def test_bad_response(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test a server not speaking HTTP falls back like an unreachable one."""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.delenv("CULTING_OFFLINE", raising=False)
+    server = socket.create_server(("127.0.0.1", 0))
+
+    def serve() -> None:
+        conn, _ = server.accept()
+        with conn:
+            conn.recv(1024)
+            conn.sendall(b"garbage\r\n\r\n")
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.getsockname()[1]}/Python.gitignore"
+    with server:
+        text = template_cache.fetch(url, "Python.gitignore", root=tmp_path)
+    assert text == template_cache.bundled("Python.gitignore")
+    thread.join()
+